@@ -0,0 +1,73 @@
+# QCryptoWidget/benchmarks/bench_quotes.py
+"""
+End-to-end quote latency against a local stub server.
+
+Compares the old single-request path (one fresh connection, every symbol in
+one query string) with the pooled, chunked CoinApiClient.
+
+Usage:
+    python benchmarks/bench_quotes.py [--latency 0.05] [--per-symbol 0.0002] [--repeat 5]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from widget.api.coin_api import CoinApiClient, parse_quotes  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+SIZES = [10, 100, 1000]
+
+
+def legacy_fetch(url: str, codes):
+    """The pre-client request: one unpooled GET carrying every symbol."""
+    params = {'symbol': ",".join(codes), 'convert': 'USD'}
+    headers = {'Accepts': 'application/json', 'X-CMC_PRO_API_KEY': 'bench'}
+    try:
+        response = requests.get(url, headers=headers, params=params, timeout=10)
+        response.raise_for_status()
+        return parse_quotes(response.json(), codes)
+    except requests.exceptions.RequestException:
+        return None
+
+
+def time_call(fn, repeat: int):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.05, help="Per-response stub latency in seconds")
+    parser.add_argument('--per-symbol', type=float, default=0.0002, help="Extra stub latency per symbol")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-url', type=int, default=8192, help="Stub rejects longer request paths with 414")
+    args = parser.parse_args()
+
+    with StubServer(latency=args.latency, per_symbol_latency=args.per_symbol,
+                    max_url_length=args.max_url) as stub:
+        client = CoinApiClient('bench', base_url=stub.url)
+        print(f"{'symbols':>8} {'legacy (ms)':>12} {'client (ms)':>12} {'legacy ok':>10}")
+        for size in SIZES:
+            codes = [f"C{i:04d}" for i in range(size)]
+            legacy_time, legacy_result = time_call(lambda: legacy_fetch(stub.url, codes), args.repeat)
+            client_time, client_result = time_call(lambda: client.get_current_prices(codes), args.repeat)
+            assert client_result is not None and len(client_result) == size
+            legacy_ok = legacy_result is not None and len(legacy_result) == size
+            print(f"{size:>8} {legacy_time * 1000:>12.1f} {client_time * 1000:>12.1f} {str(legacy_ok):>10}")
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,259 @@
+# QCryptoWidget/benchmarks/payloads.py
+"""
+Builds benchmark inputs of any size from the fixture payloads in fixtures/.
+
+The fixtures hold one CoinMarketCap quotes/latest entry and a month of
+Binance daily klines in the exact shape the APIs return; the helpers here
+scale them up deterministically so every run parses the same bytes.
+"""
+
+import copy
+import json
+import random
+from pathlib import Path
+from typing import Dict, List, Optional
+
+FIXTURE_DIR = Path(__file__).resolve().parent / "fixtures"
+
+ALARM_TYPES = ["Price above", "Price below", "% increase (24h)", "% decrease (24h)"]
+
+_cmc_entry = None
+_kline_rows = None
+
+
+def _load(name: str):
+    with open(FIXTURE_DIR / name, 'r') as f:
+        return json.load(f)
+
+
+def coin_codes(count: int) -> List[str]:
+    """Returns `count` distinct, CMC-looking coin codes."""
+    return [f"C{i:04d}" for i in range(count)]
+
+
+# Auxiliary fields quotes/latest returns unless `aux` selects others
+CMC_QUOTES_AUX = ("num_market_pairs", "cmc_rank", "date_added", "tags", "platform",
+                  "max_supply", "circulating_supply", "total_supply", "is_active", "is_fiat")
+
+
+def cmc_quote_entry(code: str, index: int = 0, aux: Optional[List[str]] = None) -> Dict:
+    """
+    Returns the fixture quote entry re-labelled and re-priced for one coin.
+
+    `aux` emulates the API's aux parameter: default auxiliary fields not listed are dropped.
+    """
+    global _cmc_entry
+    if _cmc_entry is None:
+        _cmc_entry = _load("cmc_quote_entry.json")
+    entry = copy.deepcopy(_cmc_entry)
+    if aux is not None:
+        for field in CMC_QUOTES_AUX:
+            if field not in aux:
+                entry.pop(field, None)
+    entry['id'] = index + 1
+    entry['name'] = code.title()
+    entry['symbol'] = code
+    entry['slug'] = code.lower()
+    if 'cmc_rank' in entry:
+        entry['cmc_rank'] = index + 1
+    usd = entry['quote']['USD']
+    usd['price'] = usd['price'] / (index + 1)
+    usd['percent_change_24h'] = (index % 21) - 10.0 + 0.123
+    usd['percent_change_7d'] = (index % 13) - 6.0 + 0.456
+    return entry
+
+
+def _cmc_status(credit_count: int) -> Dict:
+    return {
+        'timestamp': "2025-09-01T12:00:00.000Z",
+        'error_code': 0,
+        'error_message': None,
+        'elapsed': 21,
+        'credit_count': credit_count,
+        'notice': None,
+    }
+
+
+def cmc_quotes_payload(codes: List[str], aux: Optional[List[str]] = None) -> Dict:
+    """Returns a full quotes/latest response body for the codes."""
+    return {
+        'status': _cmc_status(max(1, (len(codes) + 99) // 100)),
+        'data': {code: cmc_quote_entry(code, i, aux) for i, code in enumerate(codes)},
+    }
+
+
+def cmc_quotes_by_id_payload(ids: List[int], aux: Optional[List[str]] = None) -> Dict:
+    """
+    Returns a quotes/latest response for an id=... request, keyed by id.
+
+    Ids match cmc_map(): id n is coin C{n-1:04d}.
+    """
+    return {
+        'status': _cmc_status(max(1, (len(ids) + 99) // 100)),
+        'data': {str(coin_id): cmc_quote_entry(f"C{coin_id - 1:04d}", coin_id - 1, aux) for coin_id in ids},
+    }
+
+
+def cmc_map(count: int, start: int = 1, limit: int = 5000) -> Dict:
+    """
+    Returns one page of a /cryptocurrency/map response listing `count` assets.
+
+    Asset n (1-based id and rank) is C{n-1:04d}, the codes coin_codes() returns.
+    """
+    entries = [{
+        'id': n,
+        'rank': n,
+        'name': f"C{n - 1:04d}".title(),
+        'symbol': f"C{n - 1:04d}",
+        'slug': f"c{n - 1:04d}",
+        'is_active': 1,
+        'first_historical_data': "2018-01-01T00:00:00.000Z",
+        'last_historical_data': "2025-09-01T12:00:00.000Z",
+        'platform': None,
+    } for n in range(start, min(count, start + limit - 1) + 1)]
+    return {'status': _cmc_status(1), 'data': entries}
+
+
+def binance_klines(count: int, start_ms: int = None, step_ms: int = 86_400_000) -> List[List]:
+    """
+    Returns `count` klines in Binance's row format, cycling the fixture's rows.
+
+    Args:
+        count (int): Number of rows.
+        start_ms (int, optional): Open time of the first row. Defaults to the fixture's.
+        step_ms (int): Milliseconds between rows.
+    """
+    global _kline_rows
+    if _kline_rows is None:
+        _kline_rows = _load("binance_klines_1d.json")
+    if start_ms is None:
+        start_ms = _kline_rows[0][0]
+    rows = []
+    for i in range(count):
+        row = list(_kline_rows[i % len(_kline_rows)])
+        row[0] = start_ms + i * step_ms
+        row[6] = row[0] + step_ms - 1
+        rows.append(row)
+    return rows
+
+
+def price_data(codes: List[str], seed: int = 0) -> Dict[str, Dict]:
+    """Returns parsed quotes, as parse_quotes produces them, with seeded random prices."""
+    rng = random.Random(seed)
+    return {
+        code: {
+            'price': rng.uniform(0.0001, 100000),
+            'percent_change_24h': rng.uniform(-15, 15),
+            'percent_change_7d': rng.uniform(-30, 30),
+            'slug': code.lower(),
+        }
+        for code in codes
+    }
+
+
+def alarms(count: int, codes: List[str], seed: int = 0) -> List[Dict]:
+    """Returns `count` alarms of every legacy type spread over the codes."""
+    rng = random.Random(seed)
+    result = []
+    for i in range(count):
+        alarm_type = ALARM_TYPES[i % len(ALARM_TYPES)]
+        if alarm_type.startswith("Price"):
+            threshold = round(rng.uniform(0.0001, 100000), 4)
+        else:
+            threshold = round(rng.uniform(0.5, 15), 2)
+        result.append({'coin': codes[i % len(codes)], 'type': alarm_type, 'threshold': threshold})
+    return result
+
+
+def rule_alarms(count: int, codes: List[str], seed: int = 0) -> List[Dict]:
+    """Returns `count` multi-coin and compound rule alarms (none a single threshold) over the codes."""
+    rng = random.Random(seed)
+    result = []
+    for i in range(count):
+        coin, other = codes[i % len(codes)], codes[(i * 7 + 1) % len(codes)]
+        if i % 2:
+            rule = f"{coin} / {other} < {rng.uniform(0.5, 20):.4f}"
+        else:
+            rule = f"{coin} > {rng.uniform(0.0001, 100000):.4f} and pct({coin}, 24h) > {rng.uniform(-5, 5):.2f}"
+        result.append({'coin': coin, 'rule': rule})
+    return result
+
+
+# Units per USD served by the stub's reference-rate endpoint
+FX_PER_USD = {"EUR": 0.92, "GBP": 0.79, "JPY": 147.3, "CHF": 0.88}
+
+
+def fx_latest(currencies: List[str]) -> Dict:
+    """Returns a Frankfurter-style /latest?from=USD response for the currencies it knows."""
+    return {'amount': 1.0, 'base': "USD", 'date': "2025-09-01",
+            'rates': {code: FX_PER_USD[code] for code in currencies if code in FX_PER_USD}}
+
+
+def binance_ticker(symbol: str, index: int = 0, kind: str = "FULL") -> Dict:
+    """
+    Returns one Binance ticker entry for a symbol.
+
+    Args:
+        kind (str): "FULL" or "MINI" (ticker/24hr types) or "PRICE" (ticker/price).
+    """
+    price = 1000.0 / (index + 1) + 0.123456
+    change = (index % 21) - 10.0 + 0.123
+    if kind == "PRICE":
+        return {'symbol': symbol, 'price': f"{price:.8f}"}
+    if kind == "MINI":
+        return {
+            'symbol': symbol,
+            'openPrice': f"{price / (1 + change / 100):.8f}",
+            'highPrice': f"{price * 1.03:.8f}",
+            'lowPrice': f"{price * 0.97:.8f}",
+            'lastPrice': f"{price:.8f}",
+            'volume': "12345.67800000",
+            'quoteVolume': f"{price * 12345.678:.8f}",
+            'openTime': 1756641600000,
+            'closeTime': 1756728000000,
+            'firstId': 1,
+            'lastId': 1000,
+            'count': 1000,
+        }
+    return {
+        'symbol': symbol,
+        'priceChange': f"{price * change / 100:.8f}",
+        'priceChangePercent': f"{change:.3f}",
+        'weightedAvgPrice': f"{price:.8f}",
+        'prevClosePrice': f"{price / (1 + change / 100):.8f}",
+        'lastPrice': f"{price:.8f}",
+        'lastQty': "0.01200000",
+        'bidPrice': f"{price * 0.9999:.8f}",
+        'bidQty': "1.50000000",
+        'askPrice': f"{price * 1.0001:.8f}",
+        'askQty': "2.10000000",
+        'openPrice': f"{price / (1 + change / 100):.8f}",
+        'highPrice': f"{price * 1.03:.8f}",
+        'lowPrice': f"{price * 0.97:.8f}",
+        'volume': "12345.67800000",
+        'quoteVolume': f"{price * 12345.678:.8f}",
+        'openTime': 1756641600000,
+        'closeTime': 1756728000000,
+        'firstId': 1,
+        'lastId': 1000,
+        'count': 1000,
+    }
+
+
+def binance_exchange_info(codes: List[str], bridged_every: int = 10) -> Dict:
+    """
+    Returns an exchangeInfo response listing USDT pairs for the codes.
+
+    Every `bridged_every`-th code only trades against BTC, so it has to be
+    priced through BTCUSDT.
+    """
+    def pair(base: str, quote: str) -> Dict:
+        return {'symbol': base + quote, 'status': 'TRADING', 'baseAsset': base, 'quoteAsset': quote}
+
+    symbols = [pair("BTC", "USDT")]
+    for i, code in enumerate(codes):
+        if code in ("BTC", "USDT"):
+            continue
+        bridged = bridged_every and i % bridged_every == bridged_every - 1
+        symbols.append(pair(code, "BTC" if bridged else "USDT"))
+    return {'timezone': 'UTC', 'serverTime': 1756728000000, 'rateLimits': [], 'symbols': symbols}
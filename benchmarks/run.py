@@ -0,0 +1,492 @@
+# QCryptoWidget/benchmarks/run.py
+"""
+Micro-benchmarks for the widget's hot paths. No network access is needed:
+inputs come from the fixture payloads and the local stub server.
+
+Cases:
+    quotes.parse       parse_quotes on a decoded quotes/latest body
+    quotes.fetch       CoinApiClient.get_current_prices against the stub (HTTP + JSON + parse)
+    quotes.fetch_ids   the same, requesting coins by CoinMarketCap id (trimmed aux fields)
+    quotes.outage      ProviderRouter.get_prices while the source is down and its circuit breaker open
+    klines.parse       parse_klines on a decoded klines body
+    klines.fetch       get_chart_data against the stub, without a cache
+    tickers.parse      parse_binance_tickers + combine_routes on a MINI ticker/24hr body
+    tickers.fetch      BinanceTickerProvider.get_prices against the stub (bulk symbols=[...])
+    symbols.load       loading the cached CoinMarketCap map and resolving a watchlist to ids
+    fx.convert         re-denominating a watchlist's USD quotes in BTC (price and changes)
+    hub.fanout         PriceHub.publish of 100 quotes to 1-1000 clients sharing 10 distinct watchlists
+    display.update     the widget's price table refresh + repaint, sparklines included (offscreen Qt)
+    snapshot.update    writing a fetch into the widget's PriceSnapshot in place and diffing it with the last one
+    sparkline.render   rendering one sparkline from 1 day to 3 months of minute data
+    alarms.check       AlarmEngine.evaluate on a price move touching every coin
+    alarms.rules       the same for compound and multi-coin rules (e.g. ETH/BTC < 0.03)
+    alarms.load/save   load_alarms / save_alarms on large alarm files
+    indicators.batch   every batch indicator over 500 candles per coin
+    indicators.update  IndicatorState.update with one new candle per coin
+
+Usage:
+    python benchmarks/run.py                          # run everything
+    python benchmarks/run.py -k alarms                # only cases whose name contains "alarms"
+    python benchmarks/run.py --save baselines/mine.json
+    python benchmarks/run.py --compare baselines/mine.json [--threshold 0.25]
+
+--compare exits with status 1 when any case is slower than the baseline by
+more than the threshold, so it can gate CI or a pre-push hook.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import timeit
+from pathlib import Path
+from typing import Callable, Dict, List
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+sys.path.insert(0, str(BENCH_DIR))
+
+import payloads  # noqa: E402
+from stub_server import StubServer  # noqa: E402
+
+# name -> (setup function, sizes); setup(size) returns the callable to time
+CASES: Dict[str, tuple] = {}
+
+
+def case(name: str, sizes: List[int]):
+    """Registers a benchmark case run once per size."""
+    def register(setup: Callable[[int], Callable[[], object]]):
+        CASES[name] = (setup, sizes)
+        return setup
+    return register
+
+
+class _Resources:
+    """Shared fixtures that are expensive to create, built on first use."""
+    stub = None
+    app = None
+    widgets = []
+    tmp_dir = None
+
+    @classmethod
+    def stub_server(cls) -> StubServer:
+        if cls.stub is None:
+            cls.stub = StubServer().__enter__()
+        return cls.stub
+
+    @classmethod
+    def qt_app(cls):
+        if cls.app is None:
+            os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+            from PySide6.QtWidgets import QApplication
+            cls.app = QApplication.instance() or QApplication([])
+        return cls.app
+
+    @classmethod
+    def temp_dir(cls) -> Path:
+        if cls.tmp_dir is None:
+            cls.tmp_dir = tempfile.TemporaryDirectory(prefix="qcw-bench-")
+        return Path(cls.tmp_dir.name)
+
+    @classmethod
+    def close(cls):
+        # Tear widgets down while the QApplication is still alive
+        for widget in cls.widgets:
+            widget.close()
+            widget.deleteLater()
+        cls.widgets.clear()
+        if cls.app is not None:
+            cls.app.processEvents()
+        if cls.stub is not None:
+            cls.stub.__exit__(None, None, None)
+        if cls.tmp_dir is not None:
+            cls.tmp_dir.cleanup()
+
+
+# --- Cases ---
+
+@case("quotes.parse", [10, 100, 1000, 5000])
+def bench_quotes_parse(size: int):
+    from widget.api.coin_api import parse_quotes
+    codes = payloads.coin_codes(size)
+    body = json.loads(json.dumps(payloads.cmc_quotes_payload(codes)))
+    return lambda: parse_quotes(body, codes)
+
+
+@case("quotes.fetch", [10, 100, 1000, 5000])
+def bench_quotes_fetch(size: int):
+    from widget.api.coin_api import CoinApiClient
+    client = CoinApiClient('bench', base_url=_Resources.stub_server().url)
+    codes = payloads.coin_codes(size)
+    assert len(client.get_current_prices(codes)) == size
+    return lambda: client.get_current_prices(codes)
+
+
+@case("quotes.fetch_ids", [10, 100, 1000, 5000])
+def bench_quotes_fetch_ids(size: int):
+    from widget.api.coin_api import CoinApiClient
+    client = CoinApiClient('bench', base_url=_Resources.stub_server().url)
+    codes = payloads.coin_codes(size)
+    ids = {code: i + 1 for i, code in enumerate(codes)}
+    assert len(client.get_current_prices(codes, ids)) == size
+    return lambda: client.get_current_prices(codes, ids)
+
+
+@case("quotes.outage", [10, 100, 1000])
+def bench_quotes_outage(size: int):
+    from widget.api.coin_api import CoinApiClient
+    from widget.api.providers import CmcProvider, ProviderRouter
+    from widget.api.resilience import CircuitBreaker
+    stub = _Resources.stub_server()
+    provider = CmcProvider('bench')
+    provider.client = CoinApiClient('bench', base_url=stub.url, timeout=1)
+    router = ProviderRouter([provider], sleep=lambda seconds: None)
+    # Long pause, so no half-open probe happens while timing
+    router.breakers[provider.name] = CircuitBreaker(provider.name, open_seconds=3600)
+    codes = payloads.coin_codes(size)
+    stub.set_faults(error_rate=1.0)
+    try:
+        assert router.get_prices(codes) is None  # Trips the breaker
+    finally:
+        stub.set_faults()
+    assert router.retry_in() > 0
+    return lambda: router.get_prices(codes)
+
+
+@case("klines.parse", [30, 365, 1000])
+def bench_klines_parse(size: int):
+    from widget.api.kline_cache import parse_klines
+    body = json.loads(json.dumps(payloads.binance_klines(size)))
+    return lambda: parse_klines(body)
+
+
+@case("klines.fetch", [30, 365, 1000])
+def bench_klines_fetch(size: int):
+    from widget.api import coin_api
+    coin_api.BINANCE_API_URL = _Resources.stub_server().klines_url
+    timestamps, _ = coin_api.get_chart_data("BTC", interval_days=size)
+    assert len(timestamps) == size
+    return lambda: coin_api.get_chart_data("BTC", interval_days=size)
+
+
+@case("tickers.parse", [10, 100, 1000])
+def bench_tickers_parse(size: int):
+    from widget.api.binance_symbols import Route
+    from widget.api.providers import combine_routes, parse_binance_tickers
+    codes = payloads.coin_codes(size)
+    # Every tenth coin is priced through BTC, as in the stub's exchangeInfo
+    routes = {code: Route(code + "BTC", "BTCUSDT") if i % 10 == 9 else Route(code + "USDT")
+              for i, code in enumerate(codes)}
+    symbols = sorted({symbol for route in routes.values() for symbol in route if symbol})
+    body = json.loads(json.dumps([payloads.binance_ticker(s, i, "MINI") for i, s in enumerate(symbols)]))
+    return lambda: combine_routes(routes, parse_binance_tickers(body))
+
+
+@case("tickers.fetch", [10, 100, 1000])
+def bench_tickers_fetch(size: int):
+    from widget.api.binance_symbols import BinanceSymbolIndex
+    from widget.api.providers import BinanceTickerProvider
+    stub = _Resources.stub_server()
+    index = BinanceSymbolIndex(_Resources.temp_dir() / "binance_symbols.json", api_root=stub.binance_root)
+    provider = BinanceTickerProvider(api_root=stub.binance_root, index=index)
+    codes = payloads.coin_codes(size)
+    assert len(provider.get_prices(codes)) == size
+    return lambda: provider.get_prices(codes)
+
+
+@case("symbols.load", [1000, 10000, 30000])
+def bench_symbols_load(size: int):
+    from widget.api.symbol_index import SymbolIndex, build_columns
+    from widget.data.persistence import atomic_write_json
+    path = _Resources.temp_dir() / f"cmc-map-{size}.json"
+    atomic_write_json(path, {'fetched': 0, **build_columns(payloads.cmc_map(size, limit=size)['data'])}, indent=None)
+    codes = payloads.coin_codes(min(size, 100))
+
+    def load():
+        return SymbolIndex(path).ids_for(codes)
+    assert len(load()) == len(codes)
+    return load
+
+
+@case("fx.convert", [10, 100, 1000, 5000])
+def bench_fx_convert(size: int):
+    from widget.api.fx_rates import convert_quotes
+    data = payloads.price_data(payloads.coin_codes(size))
+    reference = {'percent_change_24h': 1.5, 'percent_change_7d': -3.0}
+    return lambda: convert_quotes(data, 108000.0, reference)
+
+
+class _NullWriter:
+    """Stands in for a hub client's StreamWriter; the bytes go nowhere."""
+
+    class transport:
+        @staticmethod
+        def is_closing():
+            return False
+
+        @staticmethod
+        def get_write_buffer_size():
+            return 0
+
+    def write(self, data: bytes):
+        pass
+
+
+@case("hub.fanout", [1, 10, 100, 1000])
+def bench_hub_fanout(size: int):
+    from widget.data.persistence import atomic_write_json
+    from widget.hub.server import PriceHub, _Subscriber
+    root = _Resources.temp_dir()
+    codes = payloads.coin_codes(100)
+    prices = payloads.price_data(codes)
+    replay_file = root / "hub-replay.json"
+    atomic_write_json(replay_file, prices, indent=None)
+    config = {'root_path': root, 'api_key': None, 'price_providers': ['replay'], 'replay_file': replay_file,
+              'daily_credits': 0, 'monthly_credits': 0, 'min_refresh_seconds': 60,
+              'quote_cache_dir': root, 'quote_cache_ttl': 60}
+    hub = PriceHub(config, str(root / "bench-hub.sock"))
+    # Watchlists of 20 coins, overlapping; clients on the same list share one serialized message
+    watchlists = [codes[start:start + 20] for start in range(0, 100, 10)]
+    for i in range(size):
+        hub.subscribe(_Subscriber(_NullWriter()), watchlists[i % len(watchlists)])
+    return lambda: hub.publish(prices)
+
+
+@case("display.update", [100, 500, 2000])
+def bench_display_update(size: int):
+    """Mirrors QCryptoWidget.update_price_display plus the repaint it triggers."""
+    _Resources.qt_app()
+    from PySide6.QtTest import QTest
+    from PySide6.QtWidgets import QTableView
+    from widget.data.history_db import PriceHistory
+    from widget.data.price_snapshot import PriceSnapshot
+    from widget.ui.price_model import PriceTableModel, PriceDelegate
+    from widget.ui.sparkline import SparklineCache
+    from widget.ui.widget import PRICE_ROW_HEIGHT, MAX_VISIBLE_PRICE_ROWS
+
+    codes = payloads.coin_codes(size)
+    snapshots = [payloads.price_data(codes, seed) for seed in range(4)]
+    # A day of 15-minute random-walk history per coin for the sparklines
+    history = PriceHistory(_Resources.temp_dir() / f"history-{size}.db")
+    now = time.time()
+    walk = _random_closes(size, 96)
+    for step in range(96):
+        history.record({code: {'price': walk[row, step]} for row, code in enumerate(codes)},
+                       now - 86400 + step * 900)
+    sparklines = SparklineCache(history)
+
+    model = PriceTableModel()
+    view = QTableView()
+    view.setModel(model)
+    view.setItemDelegate(PriceDelegate(view, sparklines))
+    view.verticalHeader().setDefaultSectionSize(PRICE_ROW_HEIGHT)
+    view.resize(420, MAX_VISIBLE_PRICE_ROWS * PRICE_ROW_HEIGHT + 2)
+    view.show()
+    _Resources.widgets.append(view)
+    # repaint() is a no-op until the window has been exposed
+    QTest.qWaitForWindowExposed(view)
+
+    prices = PriceSnapshot.from_quotes(snapshots[0])
+    model.set_prices(codes, prices, "24h")
+    # The first paint starts loading the visible rows' sparklines in the background
+    view.viewport().repaint()
+    while sparklines.loading:
+        QTest.qWait(5)
+    state = {'i': 0}
+
+    def refresh():
+        state['i'] += 1
+        quotes = snapshots[state['i'] % len(snapshots)]
+        prices.update(quotes)
+        sparklines.append(quotes, now + state['i'])
+        model.set_prices(codes, prices, "24h")
+        view.viewport().repaint()
+    return refresh
+
+
+@case("snapshot.update", [100, 1000, 5000])
+def bench_snapshot_update(size: int):
+    from widget.data.price_snapshot import PriceSnapshot
+    codes = payloads.coin_codes(size)
+    fetches = [payloads.price_data(codes, seed) for seed in range(4)]
+    prices = PriceSnapshot.from_quotes(fetches[0], ticks=64)
+    state = {'i': 0, 'previous': prices.copy(ticks=False)}
+
+    def refresh():
+        state['i'] += 1
+        prices.update(fetches[state['i'] % len(fetches)], ts=state['i'])
+        changed = prices.diff(state['previous'])
+        state['previous'] = prices.copy(ticks=False)
+        return changed
+    return refresh
+
+
+@case("sparkline.render", [1440, 43200, 129600])
+def bench_sparkline_render(size: int):
+    _Resources.qt_app()
+    import numpy as np
+    from widget.ui.sparkline import render_sparkline
+    ts = np.arange(size) * 60.0
+    prices = _random_closes(1, size)[0]
+    return lambda: render_sparkline(ts, prices, 80, 34)
+
+
+@case("alarms.check", [1000, 10000, 100000])
+def bench_alarms_check(size: int):
+    from widget.alarms.engine import AlarmEngine
+    codes = payloads.coin_codes(200)
+    alarms = payloads.alarms(size, codes)
+    engine = AlarmEngine(alarms)
+    snapshots = [payloads.price_data(codes, seed) for seed in range(8)]
+    state = {'i': 0}
+
+    def check():
+        state['i'] += 1
+        return engine.evaluate(snapshots[state['i'] % len(snapshots)], now=state['i'] * 3600.0)
+    return check
+
+
+@case("alarms.rules", [1000, 10000, 100000])
+def bench_alarms_rules(size: int):
+    from widget.alarms.engine import AlarmEngine
+    codes = payloads.coin_codes(200)
+    engine = AlarmEngine(payloads.rule_alarms(size, codes))
+    snapshots = [payloads.price_data(codes, seed) for seed in range(8)]
+    state = {'i': 0}
+
+    def check():
+        state['i'] += 1
+        return engine.evaluate(snapshots[state['i'] % len(snapshots)], now=state['i'] * 3600.0)
+    return check
+
+
+@case("alarms.save", [1000, 10000, 100000])
+def bench_alarms_save(size: int):
+    from widget.data.alarm_db import save_alarms
+    path = _Resources.temp_dir() / f"alarms-save-{size}.json"
+    alarms = payloads.alarms(size, payloads.coin_codes(200))
+    return lambda: save_alarms(path, alarms)
+
+
+@case("alarms.load", [1000, 10000, 100000])
+def bench_alarms_load(size: int):
+    from widget.data.alarm_db import load_alarms, save_alarms
+    path = _Resources.temp_dir() / f"alarms-load-{size}.json"
+    save_alarms(path, payloads.alarms(size, payloads.coin_codes(200)))
+    assert len(load_alarms(path)) == size
+    return lambda: load_alarms(path)
+
+
+def _random_closes(coins: int, candles: int):
+    import numpy as np
+    rng = np.random.default_rng(0)
+    return np.exp(np.cumsum(rng.normal(0, 0.02, (coins, candles)), axis=1)) * 100
+
+
+@case("indicators.batch", [10, 100, 500])
+def bench_indicators_batch(size: int):
+    from widget.analytics import indicators
+    closes = _random_closes(size, 500)
+
+    def compute():
+        return (indicators.sma(closes), indicators.ema(closes), indicators.rolling_volatility(closes),
+                indicators.rsi(closes), indicators.drawdown(closes), indicators.pct_change(closes))
+    return compute
+
+
+@case("indicators.update", [10, 100, 500])
+def bench_indicators_update(size: int):
+    from widget.analytics.indicators import IndicatorState
+    closes = _random_closes(size, 100)
+    state = IndicatorState.from_history(payloads.coin_codes(size), closes)
+    ticks = closes[:, -10:].T.copy()
+    counter = {'i': 0}
+
+    def update():
+        counter['i'] += 1
+        state.update(ticks[counter['i'] % len(ticks)])
+        return state.values()
+    return update
+
+
+# --- Runner ---
+
+def measure(fn: Callable[[], object], repeat: int, min_time: float) -> float:
+    """Returns the best per-call time in seconds over `repeat` timed batches."""
+    timer = timeit.Timer(fn)
+    number = 1
+    while True:
+        if timer.timeit(number) >= min_time or number >= 1_000_000:
+            break
+        number *= 2
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def format_time(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:8.1f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:8.2f} ms"
+    return f"{seconds:8.3f} s "
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-k', dest='pattern', default="", help="Only run cases whose name contains this")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed batches per case (best is kept)")
+    parser.add_argument('--min-time', type=float, default=0.2, help="Minimum seconds per timed batch")
+    parser.add_argument('--save', help="Write results to this JSON baseline file")
+    parser.add_argument('--compare', help="Compare against this JSON baseline file")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="Relative slowdown vs. the baseline that counts as a regression")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f).get('results', {})
+
+    results = {}
+    regressions = []
+    print(f"{'case':<24} {'size':>7} {'time/call':>12} {'baseline':>12} {'change':>8}")
+    try:
+        for name, (setup, sizes) in CASES.items():
+            if args.pattern not in name:
+                continue
+            for size in sizes:
+                key = f"{name}[{size}]"
+                seconds = measure(setup(size), args.repeat, args.min_time)
+                results[key] = seconds
+                line = f"{name:<24} {size:>7} {format_time(seconds):>12}"
+                if key in baseline:
+                    change = seconds / baseline[key] - 1
+                    flag = "  REGRESSION" if change > args.threshold else ""
+                    if flag:
+                        regressions.append(key)
+                    line += f" {format_time(baseline[key]):>12} {change:>+7.0%}{flag}"
+                print(line, flush=True)
+    finally:
+        _Resources.close()
+
+    if args.save:
+        report = {
+            'created': time.strftime("%Y-%m-%dT%H:%M:%S"),
+            'machine': {'python': platform.python_version(), 'platform': platform.platform(),
+                        'processor': platform.processor() or platform.machine()},
+            'results': results,
+        }
+        Path(args.save).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"Saved {len(results)} results to {args.save}")
+
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+# QCryptoWidget/benchmarks/stub_server.py
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, Optional
+from urllib.parse import parse_qs, urlparse
+
+from payloads import (binance_exchange_info, binance_klines, binance_ticker, cmc_map, cmc_quotes_by_id_payload,
+                      cmc_quotes_payload, coin_codes, fx_latest)
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def do_GET(self):
+        server = self.server
+        if server.max_url_length and len(self.path) > server.max_url_length:
+            self._send(414, {'status': {'error_code': 414, 'error_message': 'URI Too Long'}})
+            return
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path.endswith("/klines"):
+            self._send_klines(query)
+            return
+        if url.path.endswith("/ticker/24hr"):
+            self._send_tickers(query, query.get('type', ['FULL'])[0])
+            return
+        if url.path.endswith("/ticker/price"):
+            self._send_tickers(query, "PRICE")
+            return
+        if url.path.endswith("/exchangeInfo"):
+            server.requests['exchangeInfo'] += 1
+            self._send(200, binance_exchange_info(coin_codes(server.exchange_coins)))
+            return
+        if url.path.endswith("/fx/latest"):
+            self._send(200, fx_latest(query.get('to', [''])[0].split(',')))
+            return
+        if url.path.endswith("/map"):
+            server.requests['map'] += 1
+            start = int(query.get('start', ['1'])[0])
+            limit = int(query.get('limit', ['5000'])[0])
+            self._send(200, cmc_map(server.map_coins, start, limit))
+            return
+        server.requests['quotes'] += 1
+        if self._inject_fault():
+            return
+        aux = query['aux'][0].split(',') if 'aux' in query else None
+        if 'id' in query:
+            ids = [int(i) for i in query['id'][0].split(',') if i]
+            delay = server.latency + server.per_symbol_latency * len(ids)
+            if delay:
+                time.sleep(delay)
+            self._send(200, cmc_quotes_by_id_payload(ids, aux))
+            return
+        codes = [c for c in query.get('symbol', [''])[0].split(',') if c]
+        delay = server.latency + server.per_symbol_latency * len(codes)
+        if delay:
+            time.sleep(delay)
+        self._send(200, cmc_quotes_payload(codes, aux))
+
+    def _send_klines(self, query: Dict):
+        limit = int(query.get('limit', ['500'])[0])
+        start_time = query.get('startTime', [None])[0]
+        if start_time is None:
+            rows = binance_klines(limit, start_ms=int(time.time() // 86400 - limit + 1) * 86_400_000)
+        else:
+            today = int(time.time() // 86400) * 86_400_000
+            count = max(0, min(limit, (today - int(start_time)) // 86_400_000 + 1))
+            rows = binance_klines(count, start_ms=int(start_time))
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        self._send(200, rows)
+
+    def _send_tickers(self, query: Dict, kind: str):
+        self.server.requests['ticker'] += 1
+        if self._inject_fault():
+            return
+        symbols = json.loads(query.get('symbols', ['[]'])[0])
+        if self.server.delisted.intersection(symbols):
+            self._send(400, {'code': -1121, 'msg': 'Invalid symbol.'})
+            return
+        delay = self.server.latency + self.server.per_symbol_latency * len(symbols)
+        if delay:
+            time.sleep(delay)
+        self._send(200, [binance_ticker(symbol, i, kind) for i, symbol in enumerate(symbols)])
+
+    def _inject_fault(self) -> bool:
+        # Fails the request with HTTP 503 (after `stall` seconds) at the configured error rate
+        server = self.server
+        with server.fault_lock:
+            failed = server.error_rate > 0 and server.fault_random.random() < server.error_rate
+            if failed:
+                server.requests['faults'] += 1
+        if not failed:
+            return False
+        if server.stall:
+            time.sleep(server.stall)
+        try:
+            self._send(503, {'status': {'error_code': 503, 'error_message': 'Service Unavailable'}})
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # The client timed out while we stalled
+        return True
+
+    def _send(self, status: int, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer:
+    """
+    A local CoinMarketCap (quotes/latest, map), Binance (klines, ticker/24hr,
+    ticker/price, exchangeInfo) and reference exchange rate (/fx/latest)
+    stand-in served from a background thread.
+
+    Args:
+        latency (float): Seconds added to every response to emulate network round trips.
+        per_symbol_latency (float): Extra seconds per requested symbol, emulating server-side work.
+        max_url_length (int, optional): Requests with a longer path get HTTP 414.
+        exchange_coins (int): Number of coin codes (C0000, ...) exchangeInfo lists.
+        map_coins (int): Number of assets /cryptocurrency/map lists (C0000 has id 1, ...).
+        error_rate (float): Fraction of quote and ticker requests answered with HTTP 503.
+        stall (float): Seconds a failing request waits before answering (e.g. past the client timeout).
+        seed (int): Seed for choosing which requests fail, so runs are repeatable.
+        delisted (Iterable[str]): Symbols the ticker endpoints reject (Binance error -1121),
+            failing the whole request, though exchangeInfo still lists them.
+
+    The fault settings can be changed while the server runs with set_faults().
+    """
+
+    def __init__(self, latency: float = 0.0, per_symbol_latency: float = 0.0,
+                 max_url_length: Optional[int] = None, exchange_coins: int = 5000,
+                 map_coins: int = 9000, error_rate: float = 0.0, stall: float = 0.0, seed: int = 0,
+                 delisted: Iterable[str] = ()):
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self.httpd.per_symbol_latency = per_symbol_latency
+        self.httpd.max_url_length = max_url_length
+        self.httpd.exchange_coins = exchange_coins
+        self.httpd.map_coins = map_coins
+        self.httpd.delisted = set(delisted)
+        self.httpd.fault_lock = threading.Lock()
+        self.httpd.fault_random = random.Random(seed)
+        self.set_faults(error_rate, stall)
+        # Requests served, by endpoint ('faults' counts the injected failures)
+        self.httpd.requests = {'quotes': 0, 'ticker': 0, 'exchangeInfo': 0, 'map': 0, 'faults': 0}
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}/v1/cryptocurrency/quotes/latest"
+
+    @property
+    def klines_url(self) -> str:
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}/api/v3/klines"
+
+    @property
+    def binance_root(self) -> str:
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}/api/v3"
+
+    @property
+    def fx_url(self) -> str:
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}/fx/latest"
+
+    def set_faults(self, error_rate: float = 0.0, stall: float = 0.0):
+        """Sets the fraction of quote/ticker requests that fail and how long they stall first."""
+        with self.httpd.fault_lock:
+            self.httpd.error_rate = error_rate
+            self.httpd.stall = stall
+
+    @property
+    def requests(self) -> Dict[str, int]:
+        return self.httpd.requests
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
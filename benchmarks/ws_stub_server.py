@@ -0,0 +1,89 @@
+# QCryptoWidget/benchmarks/ws_stub_server.py
+"""
+A local stand-in for Binance's combined ticker WebSocket stream.
+
+Every client gets a random-walk 24hrTicker message per subscribed symbol at
+the requested rate. Point the widget at it with:
+
+    PRICE_STREAM=true
+    PRICE_STREAM_URL=ws://127.0.0.1:9443/stream
+
+Usage:
+    python benchmarks/ws_stub_server.py [--port 9443] [--rate 10]
+"""
+
+import argparse
+import json
+import random
+import sys
+from urllib.parse import parse_qs
+
+from PySide6.QtCore import QCoreApplication, QObject, QTimer
+from PySide6.QtNetwork import QHostAddress
+from PySide6.QtWebSockets import QWebSocketServer
+
+
+class TickerStubServer(QObject):
+    """Serves random-walk ticker messages to every connected client."""
+
+    def __init__(self, port: int = 0, rate: float = 10, parent=None):
+        super().__init__(parent)
+        self.server = QWebSocketServer("ticker-stub", QWebSocketServer.SslMode.NonSecureMode, self)
+        if not self.server.listen(QHostAddress.SpecialAddress.LocalHost, port):
+            raise RuntimeError(self.server.errorString())
+        self.server.newConnection.connect(self._on_new_connection)
+        self.clients = []
+        self.prices = {}
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self._tick)
+        self.timer.start(max(1, int(1000 / rate)))
+
+    @property
+    def url(self) -> str:
+        return f"ws://127.0.0.1:{self.server.serverPort()}/stream"
+
+    def _on_new_connection(self):
+        socket = self.server.nextPendingConnection()
+        query = parse_qs(socket.requestUrl().query())
+        streams = query.get('streams', [''])[0].split('/')
+        symbols = [s.split('@')[0].upper() for s in streams if s]
+        self.clients.append((socket, symbols))
+        socket.disconnected.connect(lambda s=socket: self._drop(s))
+
+    def _drop(self, socket):
+        # Sockets are children of the server, which frees them on shutdown
+        self.clients = [(s, symbols) for s, symbols in self.clients if s is not socket]
+
+    def _tick(self):
+        for socket, symbols in self.clients:
+            for symbol in symbols:
+                price = self.prices.get(symbol, 100.0) * (1 + random.uniform(-0.001, 0.001))
+                self.prices[symbol] = price
+                message = {
+                    'stream': f"{symbol.lower()}@ticker",
+                    'data': {'e': '24hrTicker', 's': symbol, 'c': f"{price:.8f}",
+                             'P': f"{random.uniform(-5, 5):.3f}"},
+                }
+                socket.sendTextMessage(json.dumps(message))
+
+    def close(self):
+        """Disconnects every client, e.g. to exercise the REST fallback."""
+        clients, self.clients = self.clients, []
+        for socket, _ in clients:
+            socket.close()
+        self.server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=9443)
+    parser.add_argument('--rate', type=float, default=10, help="Messages per symbol per second")
+    args = parser.parse_args()
+    app = QCoreApplication(sys.argv)
+    server = TickerStubServer(args.port, args.rate)
+    print(f"Serving ticker stream on {server.url}")
+    sys.exit(app.exec())
+
+
+if __name__ == '__main__':
+    main()
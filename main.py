@@ -1,24 +1,36 @@
 # QCryptoWidget/main.py
 import sys
-from PySide6.QtWidgets import QApplication
 
-# This import will now work because of Step 2
-from widget.ui.widget import QCryptoWidget
+PROFILE_FLAG = "--profile-startup"
 
 def main():
     """
     The main entry point for the application.
     """
+    profiler = None
+    if PROFILE_FLAG in sys.argv:
+        sys.argv.remove(PROFILE_FLAG)
+        from widget.diagnostics.startup import StartupProfiler
+        profiler = StartupProfiler()
+
+    from PySide6.QtWidgets import QApplication
+    # This import will now work because of Step 2
+    from widget.ui.widget import QCryptoWidget
+    if profiler:
+        profiler.mark("imports")
+
     app = QApplication(sys.argv)
     
     # Prevents the app from closing when the last window is hidden
     app.setQuitOnLastWindowClosed(False)
+    if profiler:
+        profiler.mark("qapplication")
 
-    widget = QCryptoWidget()
+    widget = QCryptoWidget(profiler=profiler)
     widget.show()
     
     sys.exit(app.exec())
 
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
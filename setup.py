@@ -1,20 +1,26 @@
 # QCryptoWidget/setup.py
 
-from setuptools import setup, find_packages
+from setuptools import setup, find_namespace_packages
 
 setup(
     name="QCryptoWidget",
     version="1.0",
-    packages=find_packages(where="src"),
+    # Subpackages have no __init__.py, so they are found as namespace packages
+    packages=find_namespace_packages(where="src", include=["widget", "widget.*"],
+                                      exclude=["*.__pycache__"]),
     package_dir={"": "src"},
     entry_points={
         "gui_scripts": [
             "crypto_widget = widget.main:main",
-        ]
+        ],
+        "console_scripts": [
+            "qcryptowidget-daemon = widget.daemon.daemon:main",
+            "qcryptowidget-hub = widget.hub.server:main",
+        ],
     },
     install_requires=[
         "PySide6>=6.5.0",
-        "pyqtgraph>=0.13.0",
+        "numpy>=1.24.0",
         "python-dotenv>=1.0.0",
         "requests>=2.30.0",
     ],
@@ -0,0 +1,286 @@
+# QCryptoWidget/src/widget/alarms/engine.py
+
+import logging
+import time
+from bisect import bisect_left, bisect_right
+from typing import Callable, Dict, List, Optional, Tuple
+
+from widget.alarms.rules import RULE_FIELDS, RuleError, compile_rule, legacy_rule, rule_text
+
+logger = logging.getLogger(__name__)
+
+ABOVE = 1
+BELOW = -1
+
+
+def alarm_key(alarm: Dict) -> str:
+    """Returns the stable identifier used to persist an alarm's trigger state."""
+    if 'rule' in alarm:
+        return alarm['rule']
+    return f"{alarm['coin']}|{alarm['type']}|{float(alarm['threshold'])!r}"
+
+
+def migrate_alarms(alarms: List[Dict], state: Optional[Dict[str, Dict]] = None) -> int:
+    """
+    Converts pre-rules alarms ({'coin', 'type', 'threshold'}) to rules, in place.
+
+    Trigger state saved under an alarm's old key is moved to its new key, so
+    converted alarms don't fire again.
+
+    Args:
+        alarms (List[Dict]): Alarms as loaded from alarms.json.
+        state (Dict, optional): Trigger state as loaded from alarm_state.json, updated in place.
+
+    Returns:
+        int: The number of alarms converted (0 means nothing needs saving).
+    """
+    converted = 0
+    for alarm in alarms:
+        if 'rule' in alarm or 'type' not in alarm:
+            continue
+        try:
+            old_key = alarm_key(alarm)
+            rule = compile_rule(legacy_rule(alarm))
+        except (RuleError, KeyError, TypeError, ValueError) as e:
+            logger.warning("Could not convert alarm %s: %s", alarm, e)
+            continue
+        rest = {field: value for field, value in alarm.items() if field not in ('coin', 'type', 'threshold')}
+        alarm.clear()
+        alarm.update({'coin': rule.coins[0], 'rule': rule.source, **rest})
+        if state is not None and old_key in state:
+            state[alarm_key(alarm)] = state.pop(old_key)
+        converted += 1
+    return converted
+
+
+class _Trigger:
+    """Compiled form of one alarm."""
+    __slots__ = ("alarm", "key", "level", "rearm_level", "cooldown", "armed", "last_fired")
+
+    def __init__(self, alarm: Dict, key: str, level: float, rearm_level: float, cooldown: float):
+        self.alarm = alarm
+        self.key = key
+        self.level = level
+        self.rearm_level = rearm_level
+        self.cooldown = cooldown
+        self.armed = True
+        self.last_fired = 0.0
+
+
+class _RuleTrigger(_Trigger):
+    """Compiled form of an alarm whose rule isn't a single threshold."""
+    __slots__ = ("evaluate",)
+
+    def __init__(self, alarm: Dict, key: str, evaluate: Callable[[Dict[str, Dict]], Optional[bool]],
+                 cooldown: float):
+        super().__init__(alarm, key, 0.0, 0.0, cooldown)
+        self.evaluate = evaluate
+
+
+class _ThresholdIndex:
+    """Triggers for one (coin, metric, direction), sorted by level and by re-arm level."""
+    __slots__ = ("levels", "triggers", "rearm_levels", "rearm_triggers")
+
+    def __init__(self, triggers: List[_Trigger]):
+        by_level = sorted(triggers, key=lambda t: t.level)
+        self.levels = [t.level for t in by_level]
+        self.triggers = by_level
+        by_rearm = sorted(triggers, key=lambda t: t.rearm_level)
+        self.rearm_levels = [t.rearm_level for t in by_rearm]
+        self.rearm_triggers = by_rearm
+
+
+class AlarmEngine:
+    """
+    Edge-triggered evaluation of alarm rules (see widget.alarms.rules).
+
+    An alarm fires once when its condition becomes true and is then disarmed
+    until the condition is false again. Single-threshold rules ("BTC > 65000",
+    "pct(SOL, 7d) < -10") go into per-coin sorted threshold arrays: each price
+    update locates the crossed thresholds with bisect, so the cost per update
+    depends on the number of crossings, not the number of alarms. Other rules
+    are indexed by the coins they read and only re-evaluated when one of those
+    coins' values changed.
+
+    Optional alarm fields:
+        hysteresis (float): Distance, in the alarm's units, the value must move
+            back before a single-threshold alarm re-arms. Defaults to 0.
+        cooldown (float): Minimum seconds between two firings. Defaults to 0.
+    """
+
+    def __init__(self, alarms: List[Dict], state: Optional[Dict] = None):
+        """
+        Args:
+            alarms (List[Dict]): The alarm dictionaries to compile.
+            state (Dict, optional): Trigger state previously returned by export_state().
+        """
+        self._index: Dict[str, Dict[Tuple[str, int], _ThresholdIndex]] = {}
+        self._triggers: List[_Trigger] = []
+        self._last_values: Dict[Tuple[str, str], float] = {}
+        # coin -> rule triggers reading it, and the values the rules last saw per coin
+        self._rules_by_coin: Dict[str, List[_RuleTrigger]] = {}
+        self._last_inputs: Dict[str, Tuple] = {}
+        self.dirty = False
+        self.compile(alarms, state)
+
+    def compile(self, alarms: List[Dict], state: Optional[Dict] = None):
+        """
+        Rebuilds the index for a new alarm list, keeping the state of unchanged alarms.
+
+        Args:
+            alarms (List[Dict]): The alarm dictionaries to compile.
+            state (Dict, optional): Trigger state to restore. Defaults to the current state.
+        """
+        if state is None:
+            state = self.export_state()
+        groups: Dict[str, Dict[Tuple[str, int], List[_Trigger]]] = {}
+        rules_by_coin: Dict[str, List[_RuleTrigger]] = {}
+        triggers = []
+        for alarm in alarms:
+            try:
+                rule = compile_rule(rule_text(alarm))
+                key = alarm_key(alarm)
+            except (RuleError, KeyError, TypeError, ValueError) as e:
+                logger.warning("Skipping alarm %s: %s", alarm.get('rule') or alarm.get('type'), e)
+                continue
+            cooldown = float(alarm.get('cooldown', 0) or 0)
+            threshold = rule.threshold
+            if threshold is not None:
+                direction = ABOVE if threshold.op == ">" else BELOW
+                hysteresis = abs(float(alarm.get('hysteresis', 0) or 0))
+                trigger = _Trigger(alarm, key, threshold.level, threshold.level - direction * hysteresis, cooldown)
+                groups.setdefault(threshold.coin, {}).setdefault((threshold.field, direction), []).append(trigger)
+            else:
+                trigger = _RuleTrigger(alarm, key, rule.evaluate, cooldown)
+                for coin in rule.coins:
+                    rules_by_coin.setdefault(coin, []).append(trigger)
+            saved = state.get(trigger.key)
+            if saved:
+                trigger.armed = saved.get('armed', True)
+                trigger.last_fired = saved.get('last_fired', 0.0)
+            triggers.append(trigger)
+
+        self._triggers = triggers
+        self._index = {
+            coin: {group: _ThresholdIndex(members) for group, members in by_group.items()}
+            for coin, by_group in groups.items()
+        }
+        self._rules_by_coin = rules_by_coin
+        # Re-evaluate every alarm against the next update, so newly added alarms
+        # whose condition already holds fire once
+        self._last_values.clear()
+        self._last_inputs.clear()
+
+    def evaluate(self, price_data: Dict[str, Dict], now: Optional[float] = None) -> List[Dict]:
+        """
+        Feeds a price update through the engine.
+
+        Args:
+            price_data (Dict[str, Dict]): Latest prices keyed by coin code.
+            now (float, optional): Current UNIX time. Defaults to time.time().
+
+        Returns:
+            List[Dict]: The alarms that fired on this update.
+        """
+        if now is None:
+            now = time.time()
+        fired = []
+        for coin, groups in self._index.items():
+            data = price_data.get(coin)
+            if data is None:
+                continue
+            for (metric, direction), index in groups.items():
+                value = data.get(metric)
+                if value is None:
+                    continue
+                prev = self._last_values.get((coin, metric))
+                if direction == ABOVE:
+                    self._rearm_above(index, prev, value)
+                    candidates = self._crossed_above(index, prev, value)
+                else:
+                    self._rearm_below(index, prev, value)
+                    candidates = self._crossed_below(index, prev, value)
+                for trigger in candidates:
+                    if self._fire(trigger, now):
+                        fired.append(trigger.alarm)
+            for metric in {metric for metric, _ in groups}:
+                if data.get(metric) is not None:
+                    self._last_values[(coin, metric)] = data[metric]
+        if self._rules_by_coin:
+            fired.extend(self._evaluate_rules(price_data, now))
+        return fired
+
+    def _evaluate_rules(self, price_data: Dict[str, Dict], now: float) -> List[Dict]:
+        # Rules reading at least one coin whose values changed, each evaluated once
+        pending: Dict[int, _RuleTrigger] = {}
+        for coin, triggers in self._rules_by_coin.items():
+            data = price_data.get(coin)
+            if data is None:
+                continue
+            inputs = tuple(data.get(field) for field in RULE_FIELDS)
+            if self._last_inputs.get(coin) == inputs:
+                continue
+            self._last_inputs[coin] = inputs
+            for trigger in triggers:
+                pending[id(trigger)] = trigger
+
+        fired = []
+        for trigger in pending.values():
+            result = trigger.evaluate(price_data)
+            if result is None:
+                continue  # Some coin has no data yet
+            if result:
+                # Armed triggers fire; one held back by its cooldown fires on a later update
+                if self._fire(trigger, now):
+                    fired.append(trigger.alarm)
+            elif not trigger.armed:
+                trigger.armed = True
+                self.dirty = True
+        return fired
+
+    def _fire(self, trigger: _Trigger, now: float) -> bool:
+        if not trigger.armed:
+            return False
+        if trigger.cooldown and trigger.last_fired and now - trigger.last_fired < trigger.cooldown:
+            return False  # Stay armed; the next crossing after the cooldown fires
+        trigger.armed = False
+        trigger.last_fired = now
+        self.dirty = True
+        return True
+
+    def _rearm(self, triggers: List[_Trigger]):
+        for trigger in triggers:
+            if not trigger.armed:
+                trigger.armed = True
+                self.dirty = True
+
+    @staticmethod
+    def _crossed_above(index: _ThresholdIndex, prev: Optional[float], value: float) -> List[_Trigger]:
+        # Condition value > level became true: prev <= level < value
+        start = 0 if prev is None else bisect_left(index.levels, prev)
+        return index.triggers[start:bisect_left(index.levels, value)]
+
+    @staticmethod
+    def _crossed_below(index: _ThresholdIndex, prev: Optional[float], value: float) -> List[_Trigger]:
+        # Condition value < level became true: value < level <= prev
+        end = len(index.levels) if prev is None else bisect_right(index.levels, prev)
+        return index.triggers[bisect_right(index.levels, value):end]
+
+    def _rearm_above(self, index: _ThresholdIndex, prev: Optional[float], value: float):
+        # Re-arm once value <= level - hysteresis
+        end = len(index.rearm_levels) if prev is None else bisect_left(index.rearm_levels, prev)
+        self._rearm(index.rearm_triggers[bisect_left(index.rearm_levels, value):end])
+
+    def _rearm_below(self, index: _ThresholdIndex, prev: Optional[float], value: float):
+        # Re-arm once value >= level + hysteresis
+        start = 0 if prev is None else bisect_right(index.rearm_levels, prev)
+        self._rearm(index.rearm_triggers[start:bisect_right(index.rearm_levels, value)])
+
+    def export_state(self) -> Dict[str, Dict]:
+        """
+        Returns the trigger state of every compiled alarm, suitable for saving as JSON.
+        """
+        return {
+            trigger.key: {'armed': trigger.armed, 'last_fired': trigger.last_fired}
+            for trigger in self._triggers
+        }
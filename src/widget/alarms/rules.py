@@ -0,0 +1,524 @@
+# QCryptoWidget/src/widget/alarms/rules.py
+"""
+A small expression language for alarm rules.
+
+Examples:
+    BTC > 120000
+    ETH/BTC < 0.03
+    pct(SOL, 7d) > 20
+    BTC > 120000 and pct(BTC, 24h) > 3
+    not (price(ETH) >= 2000 or pct(ETH, 24h) < -10)
+
+A bare coin code (or price(X)) is the coin's USD price; pct(X, 24h) and
+pct(X, 7d) are its percent changes. Numbers support + - * / and the usual
+comparisons; conditions combine with and / or / not.
+
+compile_rule() parses a rule once into a tree of closures, which evaluate
+against the price dictionaries the providers return. A value that is
+missing (e.g. a coin without data yet) makes the result unknown (None)
+rather than false, so rules never fire on incomplete data.
+"""
+
+import re
+from functools import lru_cache
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# pct() period -> price data field
+PERIODS = {
+    "24h": 'percent_change_24h',
+    "7d": 'percent_change_7d',
+}
+METRIC_PRICE = 'price'
+
+# The fields rules can read; a coin whose fields are unchanged can't change a rule's result
+RULE_FIELDS = (METRIC_PRICE,) + tuple(PERIODS.values())
+
+# The fixed alarm types used before rules, as (field, comparison); kept to migrate alarms.json
+ALARM_TYPES = {
+    "Price above": (METRIC_PRICE, ">"),
+    "Price below": (METRIC_PRICE, "<"),
+    "% increase (24h)": ('percent_change_24h', ">"),
+    "% decrease (24h)": ('percent_change_24h', "<"),
+}
+
+_TOKEN = re.compile(r"""(?:
+    (?P<number>(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?(?![A-Za-z0-9_]))
+  | (?P<name>[A-Za-z0-9_]+)
+  | (?P<op><=|>=|==|!=|<|>|\+|-|\*|/|\(|\)|,)
+)""", re.VERBOSE)
+
+_COMPARISONS = {
+    "<": lambda a, b: a < b,
+    "<=": lambda a, b: a <= b,
+    ">": lambda a, b: a > b,
+    ">=": lambda a, b: a >= b,
+    "==": lambda a, b: a == b,
+    "!=": lambda a, b: a != b,
+}
+_ARITHMETIC = {
+    "+": lambda a, b: a + b,
+    "-": lambda a, b: a - b,
+    "*": lambda a, b: a * b,
+    "/": lambda a, b: a / b if b else None,
+}
+_FLIPPED = {"<": ">", ">": "<", "<=": ">=", ">=": "<=", "==": "==", "!=": "!="}
+_KEYWORDS = {"AND", "OR", "NOT", "PCT", "PRICE"}
+
+# Binding strength, for printing without redundant parentheses
+_PREC_OR, _PREC_AND, _PREC_NOT, _PREC_COMPARE, _PREC_SUM, _PREC_TERM, _PREC_UNARY, _PREC_ATOM = range(1, 9)
+
+Evaluator = Callable[[Dict[str, Dict]], object]
+
+
+class RuleError(ValueError):
+    """A rule that doesn't parse; `position` is the 0-based column of the problem, if known."""
+
+    def __init__(self, message: str, position: Optional[int] = None):
+        super().__init__(message if position is None else f"{message} (at column {position + 1})")
+        self.position = position
+
+
+class Threshold(NamedTuple):
+    """A rule of the form `metric > level` or `metric < level` on one coin."""
+    coin: str
+    field: str
+    op: str
+    level: float
+
+
+class Rule(NamedTuple):
+    """
+    A compiled rule.
+
+    Attributes:
+        source (str): The rule in canonical form (upper-case codes, normalized spacing).
+        coins (Tuple[str, ...]): The coins the rule reads, in order of appearance.
+        evaluate (Callable): price_data -> True, False, or None when data is missing.
+        threshold (Threshold, optional): Set for single-threshold rules, which the
+            alarm engine evaluates with bisect instead of calling `evaluate`.
+    """
+    source: str
+    coins: Tuple[str, ...]
+    evaluate: Callable[[Dict[str, Dict]], Optional[bool]]
+    threshold: Optional[Threshold]
+
+
+# --- Syntax tree ---
+
+class _Node:
+    boolean = False
+    prec = _PREC_ATOM
+
+    def source(self) -> str:
+        raise NotImplementedError
+
+    def compile(self) -> Evaluator:
+        raise NotImplementedError
+
+    def wrapped(self, prec: int) -> str:
+        text = self.source()
+        return f"({text})" if self.prec < prec else text
+
+
+class _Number(_Node):
+    def __init__(self, value: float):
+        self.value = value
+
+    def source(self) -> str:
+        return format_number(self.value)
+
+    def compile(self) -> Evaluator:
+        value = self.value
+        return lambda price_data: value
+
+
+class _Metric(_Node):
+    def __init__(self, coin: str, field: str):
+        self.coin = coin
+        self.field = field
+
+    def source(self) -> str:
+        if self.field == METRIC_PRICE:
+            return self.coin
+        period = next(name for name, field in PERIODS.items() if field == self.field)
+        return f"pct({self.coin}, {period})"
+
+    def compile(self) -> Evaluator:
+        coin, field = self.coin, self.field
+
+        def metric(price_data):
+            data = price_data.get(coin)
+            return data.get(field) if data else None
+        return metric
+
+
+class _Negate(_Node):
+    prec = _PREC_UNARY
+
+    def __init__(self, operand: _Node):
+        self.operand = operand
+
+    def source(self) -> str:
+        return "-" + self.operand.wrapped(_PREC_UNARY)
+
+    def compile(self) -> Evaluator:
+        operand = self.operand.compile()
+
+        def negate(price_data):
+            value = operand(price_data)
+            return None if value is None else -value
+        return negate
+
+
+class _Arithmetic(_Node):
+    def __init__(self, op: str, left: _Node, right: _Node):
+        self.op = op
+        self.left = left
+        self.right = right
+        self.prec = _PREC_SUM if op in "+-" else _PREC_TERM
+
+    def source(self) -> str:
+        # Left-associative: the right operand needs parentheses at equal precedence
+        return f"{self.left.wrapped(self.prec)} {self.op} {self.right.wrapped(self.prec + 1)}"
+
+    def compile(self) -> Evaluator:
+        left, right, apply = self.left.compile(), self.right.compile(), _ARITHMETIC[self.op]
+
+        def arithmetic(price_data):
+            a = left(price_data)
+            if a is None:
+                return None
+            b = right(price_data)
+            return None if b is None else apply(a, b)
+        return arithmetic
+
+
+class _Compare(_Node):
+    boolean = True
+    prec = _PREC_COMPARE
+
+    def __init__(self, op: str, left: _Node, right: _Node):
+        self.op = op
+        self.left = left
+        self.right = right
+
+    def source(self) -> str:
+        return f"{self.left.wrapped(_PREC_SUM)} {self.op} {self.right.wrapped(_PREC_SUM)}"
+
+    def compile(self) -> Evaluator:
+        left, right, apply = self.left.compile(), self.right.compile(), _COMPARISONS[self.op]
+
+        def compare(price_data):
+            a = left(price_data)
+            if a is None:
+                return None
+            b = right(price_data)
+            return None if b is None else apply(a, b)
+        return compare
+
+    def threshold(self) -> Optional[Threshold]:
+        metric, number, op = self.left, self.right, self.op
+        if isinstance(metric, _Number):
+            metric, number, op = number, metric, _FLIPPED[op]
+        if op in ("<", ">") and isinstance(metric, _Metric) and isinstance(number, _Number):
+            return Threshold(metric.coin, metric.field, op, number.value)
+        return None
+
+
+class _Not(_Node):
+    boolean = True
+    prec = _PREC_NOT
+
+    def __init__(self, operand: _Node):
+        self.operand = operand
+
+    def source(self) -> str:
+        return "not " + self.operand.wrapped(_PREC_NOT)
+
+    def compile(self) -> Evaluator:
+        operand = self.operand.compile()
+
+        def negate(price_data):
+            value = operand(price_data)
+            return None if value is None else not value
+        return negate
+
+
+class _Logical(_Node):
+    boolean = True
+
+    def __init__(self, op: str, operands: List[_Node]):
+        self.op = op
+        self.operands = operands
+        self.prec = _PREC_AND if op == "and" else _PREC_OR
+
+    def source(self) -> str:
+        return f" {self.op} ".join(operand.wrapped(self.prec + 1) for operand in self.operands)
+
+    def compile(self) -> Evaluator:
+        operands = [operand.compile() for operand in self.operands]
+        # Short-circuits on the deciding value; otherwise unknown if any operand was unknown
+        decisive = self.op == "or"
+
+        def logical(price_data):
+            unknown = False
+            for operand in operands:
+                value = operand(price_data)
+                if value is None:
+                    unknown = True
+                elif value == decisive:
+                    return decisive
+            return None if unknown else not decisive
+        return logical
+
+
+# --- Parser ---
+
+class _Parser:
+    """Recursive-descent parser; one method per precedence level."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = self._tokenize(text)
+        self.pos = 0
+        self.coins: List[str] = []
+
+    @staticmethod
+    def _tokenize(text: str) -> List[Tuple[str, str, int]]:
+        tokens = []
+        pos = 0
+        while True:
+            while pos < len(text) and text[pos].isspace():
+                pos += 1
+            if pos == len(text):
+                tokens.append(("end", "", pos))
+                return tokens
+            match = _TOKEN.match(text, pos)
+            if not match or not match.lastgroup:
+                raise RuleError(f"Unexpected character {text[pos]!r}", pos)
+            tokens.append((match.lastgroup, match.group(match.lastgroup), match.start(match.lastgroup)))
+            pos = match.end()
+
+    def peek(self) -> Tuple[str, str, int]:
+        return self.tokens[self.pos]
+
+    def next(self) -> Tuple[str, str, int]:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def at_keyword(self, word: str) -> bool:
+        kind, value, _ = self.peek()
+        return kind == "name" and value.upper() == word
+
+    def expect(self, op: str):
+        kind, value, position = self.next()
+        if kind != "op" or value != op:
+            raise RuleError(f"Expected '{op}'" + (f" but found '{value}'" if value else ""), position)
+
+    def parse(self) -> _Node:
+        node = self.parse_or()
+        kind, value, position = self.peek()
+        if kind != "end":
+            raise RuleError(f"Unexpected '{value}'", position)
+        if not node.boolean:
+            raise RuleError("A rule must be a condition, e.g. 'BTC > 100000'")
+        if not self.coins:
+            # Rules are only evaluated when one of their coins changes
+            raise RuleError("A rule must read at least one coin")
+        return node
+
+    def parse_or(self) -> _Node:
+        return self._parse_logical("or", self.parse_and)
+
+    def parse_and(self) -> _Node:
+        return self._parse_logical("and", self.parse_not)
+
+    def _parse_logical(self, op: str, operand: Callable[[], _Node]) -> _Node:
+        position = self.peek()[2]
+        operands = [operand()]
+        while self.at_keyword(op.upper()):
+            position = self.next()[2]
+            operands.append(operand())
+        if len(operands) == 1:
+            return operands[0]
+        for node in operands:
+            if not node.boolean:
+                raise RuleError(f"'{op}' needs conditions on both sides", position)
+        return _Logical(op, operands)
+
+    def parse_not(self) -> _Node:
+        if self.at_keyword("NOT"):
+            position = self.next()[2]
+            operand = self.parse_not()
+            if not operand.boolean:
+                raise RuleError("'not' needs a condition", position)
+            return _Not(operand)
+        return self.parse_compare()
+
+    def parse_compare(self) -> _Node:
+        left = self.parse_sum()
+        kind, op, position = self.peek()
+        if kind != "op" or op not in _COMPARISONS:
+            return left
+        self.next()
+        right = self.parse_sum()
+        if left.boolean or right.boolean:
+            raise RuleError(f"'{op}' compares numbers, not conditions", position)
+        return _Compare(op, left, right)
+
+    def parse_sum(self) -> _Node:
+        return self._parse_arithmetic("+-", self.parse_term)
+
+    def parse_term(self) -> _Node:
+        return self._parse_arithmetic("*/", self.parse_unary)
+
+    def _parse_arithmetic(self, ops: str, operand: Callable[[], _Node]) -> _Node:
+        left = operand()
+        while True:
+            kind, op, position = self.peek()
+            if kind != "op" or op not in ops:
+                return left
+            self.next()
+            right = operand()
+            if left.boolean or right.boolean:
+                raise RuleError(f"'{op}' needs numbers on both sides", position)
+            left = _Arithmetic(op, left, right)
+
+    def parse_unary(self) -> _Node:
+        kind, value, position = self.peek()
+        if kind == "op" and value == "-":
+            self.next()
+            operand = self.parse_unary()
+            if operand.boolean:
+                raise RuleError("'-' needs a number", position)
+            if isinstance(operand, _Number):
+                return _Number(-operand.value)  # Folded, so "pct(X, 24h) < -5" stays a threshold
+            return _Negate(operand)
+        return self.parse_atom()
+
+    def parse_atom(self) -> _Node:
+        kind, value, position = self.next()
+        if kind == "number":
+            return _Number(float(value))
+        if kind == "op" and value == "(":
+            node = self.parse_or()
+            self.expect(")")
+            return node
+        if kind == "name":
+            word = value.upper()
+            if word == "PCT":
+                self.expect("(")
+                coin = self._coin()
+                self.expect(",")
+                kind, period, period_position = self.next()
+                field = PERIODS.get(period.lower()) if kind in ("name", "number") else None
+                if field is None:
+                    raise RuleError(f"pct() period must be one of {', '.join(PERIODS)}", period_position)
+                self.expect(")")
+                return _Metric(coin, field)
+            if word == "PRICE":
+                self.expect("(")
+                coin = self._coin()
+                self.expect(")")
+                return _Metric(coin, METRIC_PRICE)
+            if word in _KEYWORDS:
+                raise RuleError(f"Unexpected '{value}'", position)
+            return _Metric(self._use_coin(word), METRIC_PRICE)
+        if kind == "end":
+            raise RuleError("Rule is incomplete", position)
+        raise RuleError(f"Unexpected '{value}'", position)
+
+    def _coin(self) -> str:
+        kind, value, position = self.next()
+        if kind != "name" or value.upper() in _KEYWORDS:
+            raise RuleError("Expected a coin code", position)
+        return self._use_coin(value.upper())
+
+    def _use_coin(self, coin: str) -> str:
+        if coin not in self.coins:
+            self.coins.append(coin)
+        return coin
+
+
+def format_number(value: float) -> str:
+    """Formats a rule constant without a trailing '.0' or exponent for typical prices."""
+    if float(value).is_integer() and abs(value) < 1e16:
+        return str(int(value))
+    return repr(float(value))
+
+
+@lru_cache(maxsize=4096)
+def compile_rule(text: str) -> Rule:
+    """
+    Parses and compiles a rule. Results are cached, so recompiling an unchanged alarm list is cheap.
+
+    Args:
+        text (str): The rule, e.g. "ETH/BTC < 0.03".
+
+    Returns:
+        Rule: The compiled rule.
+
+    Raises:
+        RuleError: If the rule doesn't parse.
+    """
+    parser = _Parser(text)
+    node = parser.parse()
+    threshold = node.threshold() if isinstance(node, _Compare) else None
+    return Rule(node.source(), tuple(parser.coins), node.compile(), threshold)
+
+
+def legacy_rule(alarm: Dict) -> str:
+    """
+    Converts a pre-rules alarm ({'coin', 'type', 'threshold'}) to its rule text.
+
+    Raises:
+        RuleError: If the alarm type is unknown.
+    """
+    spec = ALARM_TYPES.get(alarm.get('type'))
+    if spec is None:
+        raise RuleError(f"Unknown alarm type: {alarm.get('type')}")
+    field, op = spec
+    threshold = float(alarm['threshold'])
+    if alarm['type'] == "% decrease (24h)":
+        threshold = -abs(threshold)
+    metric = _Metric(str(alarm['coin']).upper(), field).source()
+    return f"{metric} {op} {format_number(threshold)}"
+
+
+def rule_text(alarm: Dict) -> str:
+    """Returns an alarm's rule, converting pre-rules alarms on the fly."""
+    rule = alarm.get('rule')
+    return rule if rule is not None else legacy_rule(alarm)
+
+
+def alarm_coins(alarm: Dict) -> Tuple[str, ...]:
+    """Returns the coins an alarm reads; just its 'coin' if the rule doesn't parse."""
+    try:
+        return compile_rule(rule_text(alarm)).coins
+    except RuleError:
+        return (alarm['coin'],) if alarm.get('coin') else ()
+
+
+def legacy_form(rule: str) -> Optional[Tuple[str, str, float]]:
+    """
+    Expresses a rule as (coin, alarm type, threshold) if one of the fixed ALARM_TYPES covers it.
+
+    Returns:
+        Optional[Tuple[str, str, float]]: e.g. ('BTC', 'Price above', 65000.0); None for other rules.
+    """
+    try:
+        threshold = compile_rule(rule).threshold
+    except RuleError:
+        return None
+    if threshold is None:
+        return None
+    for alarm_type, (field, op) in ALARM_TYPES.items():
+        if (field, op) != (threshold.field, threshold.op):
+            continue
+        if alarm_type == "% decrease (24h)":
+            if threshold.level <= 0:
+                return threshold.coin, alarm_type, -threshold.level
+            continue
+        return threshold.coin, alarm_type, threshold.level
+    return None
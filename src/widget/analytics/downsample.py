@@ -0,0 +1,111 @@
+# QCryptoWidget/src/widget/analytics/downsample.py
+"""
+Reduces long price series to about one point per pixel before drawing.
+
+lttb keeps the points that preserve the visual shape of a line best;
+minmax_decimate keeps each bucket's extremes and is cheaper, which suits
+thinning buffers that are downsampled again before rendering.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+# Average bucket size up to which LTTB's inner loop runs on Python lists
+_PURE_PYTHON_BUCKET = 32
+
+
+def lttb(x, y, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    The first and last points are always kept. The points in between are
+    split into threshold - 2 buckets, and each bucket keeps the point that
+    forms the largest triangle with the previously kept point and the
+    average of the next bucket.
+
+    Args:
+        x: Sample positions (e.g. timestamps), ascending.
+        y: Sample values.
+        threshold (int): Number of points to return.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The kept (x, y) points, in order.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return x.copy(), y.copy()
+
+    every = (n - 2) / (threshold - 2)
+    # Bucket i spans [edges[i], edges[i + 1]); the final "bucket" is the last point
+    edges = np.append((np.arange(threshold - 1) * every).astype(np.int64) + 1, n)
+    edges[-2] = n - 1
+    counts = np.diff(edges)
+    avg_x = np.add.reduceat(x, edges[:-1]) / counts
+    avg_y = np.add.reduceat(y, edges[:-1]) / counts
+
+    if n <= _PURE_PYTHON_BUCKET * threshold:
+        kept = _lttb_select_lists(x.tolist(), y.tolist(), edges.tolist(), avg_x.tolist(), avg_y.tolist())
+    else:
+        kept = _lttb_select_arrays(x, y, edges, avg_x, avg_y)
+    return x[kept], y[kept]
+
+
+def _lttb_select_lists(x, y, edges, avg_x, avg_y) -> np.ndarray:
+    # Small buckets: plain Python beats per-bucket NumPy calls by several times
+    kept = [0]
+    a = 0
+    for i in range(len(edges) - 2):
+        ax, ay = x[a], y[a]
+        dx, dy = ax - avg_x[i + 1], avg_y[i + 1] - ay
+        best_area, a = -1.0, edges[i]
+        for j in range(edges[i], edges[i + 1]):
+            area = abs(dx * (y[j] - ay) - (ax - x[j]) * dy)
+            if area > best_area:
+                best_area, a = area, j
+        kept.append(a)
+    kept.append(len(x) - 1)
+    return np.array(kept, dtype=np.int64)
+
+
+def _lttb_select_arrays(x, y, edges, avg_x, avg_y) -> np.ndarray:
+    kept = np.empty(len(edges), dtype=np.int64)
+    kept[0] = 0
+    kept[-1] = len(x) - 1
+    a = 0
+    for i in range(len(edges) - 2):
+        start, end = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - avg_x[i + 1]) * (y[start:end] - ay) - (ax - x[start:end]) * (avg_y[i + 1] - ay))
+        a = start + int(np.argmax(area))
+        kept[i + 1] = a
+    return kept
+
+
+def minmax_decimate(x, y, buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Keeps the minimum and maximum of each of `buckets` equal-count buckets.
+
+    Returns at most 2 * buckets points, in their original order, so no
+    spike is lost at any zoom level.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(x)
+    if buckets < 1 or n <= 2 * buckets:
+        return x.copy(), y.copy()
+
+    size = -(-n // buckets)
+    rows = -(-n // size)
+    # Pad with the last value: argmin/argmax return the first of equal values,
+    # so the padding is never picked over the real last point
+    padded = np.full(rows * size, y[-1])
+    padded[:n] = y
+    grid = padded.reshape(rows, size)
+    base = np.arange(rows) * size
+    low = base + np.argmin(grid, axis=1)
+    high = base + np.argmax(grid, axis=1)
+    kept = np.unique(np.concatenate([low, high]))
+    return x[kept], y[kept]
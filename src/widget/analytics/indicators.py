@@ -0,0 +1,325 @@
+# QCryptoWidget/src/widget/analytics/indicators.py
+"""
+Technical indicators computed for every tracked coin at once.
+
+Batch functions take a close series of shape (T,) or a matrix of shape
+(coins, T), one row per coin, and return an array of the same shape. The
+first entries of each row are NaN until the indicator's window is
+full. Rows may be left-padded with NaN for coins with shorter histories;
+gaps inside a series should be forward-filled first (see forward_fill).
+
+IndicatorState keeps the rolling state needed to update the same
+indicators by one candle in O(coins), rather than recomputing the window.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_SMA_WINDOW = 20
+DEFAULT_EMA_SPAN = 20
+DEFAULT_VOLATILITY_WINDOW = 20
+DEFAULT_RSI_PERIOD = 14
+DEFAULT_CHANGE_WINDOW = 24
+
+# Running sums are recomputed from the buffers this often to stop float drift
+_RESYNC_EVERY = 1024
+
+
+def _as_matrix(values) -> Tuple[np.ndarray, bool]:
+    array = np.asarray(values, dtype=np.float64)
+    return (array[np.newaxis, :], True) if array.ndim == 1 else (array, False)
+
+
+def _restore(result: np.ndarray, was_1d: bool) -> np.ndarray:
+    return result[0] if was_1d else result
+
+
+def forward_fill(values) -> np.ndarray:
+    """Replaces NaNs with the last non-NaN value before them in the same row."""
+    matrix, was_1d = _as_matrix(values)
+    index = np.where(np.isnan(matrix), 0, np.arange(matrix.shape[1]))
+    np.maximum.accumulate(index, axis=1, out=index)
+    filled = matrix[np.arange(matrix.shape[0])[:, np.newaxis], index]
+    return _restore(filled, was_1d)
+
+
+def stack_closes(series: Sequence[np.ndarray], length: Optional[int] = None) -> np.ndarray:
+    """
+    Right-aligns close series of different lengths into one (coins, T) matrix.
+
+    Args:
+        series (Sequence[np.ndarray]): One close series per coin, oldest first,
+            all ending at the same candle (e.g. from get_chart_data).
+        length (int, optional): Number of columns; defaults to the longest series.
+
+    Returns:
+        np.ndarray: The matrix, left-padded with NaN.
+    """
+    if length is None:
+        length = max((len(s) for s in series), default=0)
+    matrix = np.full((len(series), length), np.nan)
+    for row, closes in enumerate(series):
+        closes = np.asarray(closes, dtype=np.float64)[-length:] if length else np.empty(0)
+        if len(closes):
+            matrix[row, length - len(closes):] = closes
+    return matrix
+
+
+def history_matrix(history, coins: List[str], start: float, end: float,
+                   buckets: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Builds a forward-filled close matrix from locally stored price history.
+
+    Args:
+        history (PriceHistory): The widget's history database.
+        coins (List[str]): The coins, one row each.
+        start (float): Start of the window (UNIX time).
+        end (float): End of the window (UNIX time).
+        buckets (int): Number of equal-width time buckets (columns).
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (bucket end times, matrix of each bucket's last price).
+    """
+    width = max((end - start) / max(buckets, 1), 1e-9)
+    matrix = np.full((len(coins), buckets), np.nan)
+    for row, coin in enumerate(coins):
+        rows = history.query_downsampled(coin, start, end, buckets)
+        if not rows:
+            continue
+        data = np.asarray(rows, dtype=np.float64)
+        columns = np.clip(((data[:, 0] - start) / width).astype(np.int64), 0, buckets - 1)
+        matrix[row, columns] = data[:, 3]
+    timestamps = start + width * np.arange(1, buckets + 1)
+    return timestamps, forward_fill(matrix)
+
+
+def sma(values, window: int = DEFAULT_SMA_WINDOW) -> np.ndarray:
+    """Simple moving average over the last `window` closes."""
+    matrix, was_1d = _as_matrix(values)
+    valid = ~np.isnan(matrix)
+    sums = np.cumsum(np.where(valid, matrix, 0.0), axis=1)
+    counts = np.cumsum(valid, axis=1)
+    result = np.full(matrix.shape, np.nan)
+    if matrix.shape[1] >= window:
+        window_sums = sums[:, window - 1:].copy()
+        window_sums[:, 1:] -= sums[:, :-window]
+        window_counts = counts[:, window - 1:].copy()
+        window_counts[:, 1:] -= counts[:, :-window]
+        result[:, window - 1:] = np.where(window_counts == window, window_sums / window, np.nan)
+    return _restore(result, was_1d)
+
+
+def ema(values, span: int = DEFAULT_EMA_SPAN) -> np.ndarray:
+    """Exponential moving average with alpha = 2 / (span + 1), seeded with each row's first close."""
+    matrix, was_1d = _as_matrix(values)
+    alpha = 2.0 / (span + 1)
+    result = np.full(matrix.shape, np.nan)
+    current = np.full(matrix.shape[0], np.nan)
+    for t in range(matrix.shape[1]):
+        x = matrix[:, t]
+        current = np.where(np.isnan(current), x, current + alpha * (x - current))
+        result[:, t] = current
+    return _restore(result, was_1d)
+
+
+def rolling_volatility(values, window: int = DEFAULT_VOLATILITY_WINDOW) -> np.ndarray:
+    """Sample standard deviation of the last `window` log returns (not annualized)."""
+    matrix, was_1d = _as_matrix(values)
+    returns = np.full(matrix.shape, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[:, 1:] = np.log(matrix[:, 1:] / matrix[:, :-1])
+    result = np.full(matrix.shape, np.nan)
+    if matrix.shape[1] >= window and window > 1:
+        windows = np.lib.stride_tricks.sliding_window_view(returns, window, axis=1)
+        result[:, window - 1:] = windows.std(axis=2, ddof=1)
+    return _restore(result, was_1d)
+
+
+def _rsi_from_averages(gain: np.ndarray, loss: np.ndarray) -> np.ndarray:
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100.0 - 100.0 / (1.0 + gain / loss)
+    rsi = np.where(loss == 0, np.where(gain == 0, 50.0, 100.0), rsi)
+    return rsi
+
+
+def rsi(values, period: int = DEFAULT_RSI_PERIOD) -> np.ndarray:
+    """Wilder's relative strength index (0-100)."""
+    matrix, was_1d = _as_matrix(values)
+    result = np.full(matrix.shape, np.nan)
+    gain = np.zeros(matrix.shape[0])
+    loss = np.zeros(matrix.shape[0])
+    seen = np.zeros(matrix.shape[0], dtype=np.int64)
+    for t in range(1, matrix.shape[1]):
+        diff = matrix[:, t] - matrix[:, t - 1]
+        _wilder_step(gain, loss, seen, diff, period)
+        result[:, t] = np.where(seen >= period, _rsi_from_averages(gain, loss), np.nan)
+    return _restore(result, was_1d)
+
+
+def _wilder_step(gain: np.ndarray, loss: np.ndarray, seen: np.ndarray, diff: np.ndarray, period: int):
+    # Sums the first `period` moves, then switches to Wilder's smoothing; updates in place
+    has = ~np.isnan(diff)
+    up = np.where(has, np.maximum(diff, 0.0), 0.0)
+    down = np.where(has, np.maximum(-diff, 0.0), 0.0)
+    seen += has
+    warming = has & (seen <= period)
+    gain[warming] += up[warming]
+    loss[warming] += down[warming]
+    seeded = has & (seen == period)
+    gain[seeded] /= period
+    loss[seeded] /= period
+    steady = has & (seen > period)
+    gain[steady] = (gain[steady] * (period - 1) + up[steady]) / period
+    loss[steady] = (loss[steady] * (period - 1) + down[steady]) / period
+
+
+def drawdown(values) -> np.ndarray:
+    """Fractional distance below the running peak (0 at a new high, -0.25 when 25% below)."""
+    matrix, was_1d = _as_matrix(values)
+    peak = np.fmax.accumulate(matrix, axis=1)
+    return _restore(matrix / peak - 1.0, was_1d)
+
+
+def pct_change(values, periods: int = DEFAULT_CHANGE_WINDOW) -> np.ndarray:
+    """Percent change over the last `periods` candles."""
+    matrix, was_1d = _as_matrix(values)
+    result = np.full(matrix.shape, np.nan)
+    if matrix.shape[1] > periods:
+        result[:, periods:] = (matrix[:, periods:] / matrix[:, :-periods] - 1.0) * 100.0
+    return _restore(result, was_1d)
+
+
+class IndicatorState:
+    """
+    Rolling indicator state for a fixed list of coins, updated one candle at a time.
+
+    update() appends a closed candle for every coin in O(coins); values()
+    returns the same numbers the batch functions give for the full series.
+    peek() evaluates a still-open candle (e.g. a live tick) without
+    committing it. A NaN close carries the coin's previous close forward.
+    """
+
+    def __init__(self, coins: List[str], sma_window: int = DEFAULT_SMA_WINDOW,
+                 ema_span: int = DEFAULT_EMA_SPAN, volatility_window: int = DEFAULT_VOLATILITY_WINDOW,
+                 rsi_period: int = DEFAULT_RSI_PERIOD, change_window: int = DEFAULT_CHANGE_WINDOW):
+        self.coins = list(coins)
+        self.index = {coin: i for i, coin in enumerate(self.coins)}
+        self.sma_window = sma_window
+        self.alpha = 2.0 / (ema_span + 1)
+        self.volatility_window = volatility_window
+        self.rsi_period = rsi_period
+        self.change_window = change_window
+
+        n = len(self.coins)
+        self._size = max(sma_window, change_window + 1, 2)
+        self._closes = np.full((n, self._size), np.nan)
+        self._pos = 0
+        self._count = np.zeros(n, dtype=np.int64)
+        self._last = np.full(n, np.nan)
+        self._sma_sum = np.zeros(n)
+        self._ema = np.full(n, np.nan)
+        self._gain = np.zeros(n)
+        self._loss = np.zeros(n)
+        self._rsi_seen = np.zeros(n, dtype=np.int64)
+        self._returns = np.full((n, volatility_window), np.nan)
+        self._ret_pos = 0
+        self._ret_count = np.zeros(n, dtype=np.int64)
+        self._ret_sum = np.zeros(n)
+        self._ret_sq = np.zeros(n)
+        self._peak = np.full(n, np.nan)
+        self._steps = 0
+
+    @classmethod
+    def from_history(cls, coins: List[str], closes: np.ndarray, **windows) -> "IndicatorState":
+        """Builds a state from a (coins, T) close matrix, oldest column first."""
+        state = cls(coins, **windows)
+        for t in range(np.shape(closes)[1]):
+            state.update(closes[:, t])
+        return state
+
+    def update(self, closes) -> None:
+        """
+        Appends one closed candle.
+
+        Args:
+            closes: One close per coin, in self.coins order (NaN if unknown).
+        """
+        x = np.asarray(closes, dtype=np.float64)
+        x = np.where(np.isnan(x), self._last, x)
+        valid = ~np.isnan(x)
+
+        leaving = self._closes[:, (self._pos - self.sma_window) % self._size]
+        self._sma_sum += np.where(valid, x, 0.0) - np.nan_to_num(leaving)
+
+        diff = x - self._last
+        _wilder_step(self._gain, self._loss, self._rsi_seen, diff, self.rsi_period)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_return = np.log(x / self._last)
+        has_return = ~np.isnan(log_return)
+        leaving_return = np.nan_to_num(self._returns[:, self._ret_pos])
+        self._ret_sum += np.where(has_return, log_return, 0.0) - leaving_return
+        self._ret_sq += np.where(has_return, log_return * log_return, 0.0) - leaving_return * leaving_return
+        self._returns[:, self._ret_pos] = log_return
+        self._ret_pos = (self._ret_pos + 1) % self.volatility_window
+        self._ret_count += has_return
+
+        self._ema = np.where(np.isnan(self._ema), x, self._ema + self.alpha * (x - self._ema))
+        self._peak = np.fmax(self._peak, x)
+
+        self._closes[:, self._pos] = x
+        self._pos = (self._pos + 1) % self._size
+        self._count += valid
+        self._last = x
+
+        self._steps += 1
+        if self._steps % _RESYNC_EVERY == 0:
+            self._resync()
+
+    def peek(self, closes) -> Dict[str, np.ndarray]:
+        """Returns values() as if `closes` were appended, leaving the state untouched."""
+        preview = self._copy()
+        preview.update(closes)
+        return preview.values()
+
+    def values(self) -> Dict[str, np.ndarray]:
+        """
+        Returns the current indicators, one array entry per coin (NaN while warming up).
+
+        Keys: 'sma', 'ema', 'volatility', 'rsi', 'drawdown', 'pct_change'.
+        """
+        w = self.volatility_window
+        variance = np.maximum(self._ret_sq - self._ret_sum * self._ret_sum / w, 0.0) / max(w - 1, 1)
+        base = self._closes[:, (self._pos - 1 - self.change_window) % self._size]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return {
+                'sma': np.where(self._count >= self.sma_window, self._sma_sum / self.sma_window, np.nan),
+                'ema': self._ema.copy(),
+                'volatility': np.where(self._ret_count >= w, np.sqrt(variance), np.nan),
+                'rsi': np.where(self._rsi_seen >= self.rsi_period,
+                                _rsi_from_averages(self._gain, self._loss), np.nan),
+                'drawdown': self._last / self._peak - 1.0,
+                'pct_change': np.where(self._count > self.change_window,
+                                       (self._last / base - 1.0) * 100.0, np.nan),
+            }
+
+    def by_coin(self, values: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, Dict[str, float]]:
+        """Returns values() (or the given values) as coin code -> {indicator: float}."""
+        if values is None:
+            values = self.values()
+        names = list(values)
+        table = np.column_stack([values[name] for name in names]).tolist() if self.coins else []
+        return {coin: dict(zip(names, row)) for coin, row in zip(self.coins, table)}
+
+    def _resync(self):
+        window = self._closes[:, [(self._pos - 1 - k) % self._size for k in range(self.sma_window)]]
+        self._sma_sum = np.nansum(window, axis=1)
+        self._ret_sum = np.nansum(self._returns, axis=1)
+        self._ret_sq = np.nansum(self._returns * self._returns, axis=1)
+
+    def _copy(self) -> "IndicatorState":
+        clone = object.__new__(IndicatorState)
+        for name, value in self.__dict__.items():
+            setattr(clone, name, value.copy() if isinstance(value, (np.ndarray, list, dict)) else value)
+        return clone
@@ -0,0 +1,176 @@
+# QCryptoWidget/src/widget/api/binance_symbols.py
+"""
+Maps coin codes to Binance trading pairs.
+
+Most coins trade against USDT directly. Those that don't are priced
+through a bridge asset instead, e.g. XYZ/BTC times BTC/USDT. The pairs come
+from /api/v3/exchangeInfo, which is large (several MB), so the index keeps
+a compact copy on disk and refreshes it at most once per TTL.
+"""
+
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional
+
+from widget.data.persistence import atomic_write_json, read_json
+from widget.diagnostics.metrics import HTTP_ERRORS, HTTP_SECONDS, PARSE_SECONDS
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+BINANCE_API_ROOT = "https://api.binance.com/api/v3"
+SYMBOL_INDEX_FILE = "binance_symbols.json"
+
+# exchangeInfo changes rarely (listings and delistings)
+SYMBOL_INDEX_TTL = 24 * 3600
+# An unknown coin may trigger an early refresh, but no more often than this
+MIN_REFRESH_SECONDS = 3600
+# Wait at least this long between download attempts, failed ones included
+RETRY_SECONDS = 300
+
+# Quote assets tried, in order, for coins without a direct pair
+BRIDGE_ASSETS = ("BTC", "ETH", "BNB", "FDUSD", "USDC")
+
+def get_symbol_index_path(root_path: Path) -> Path:
+    """Returns the full path to the cached Binance symbol index."""
+    return root_path / SYMBOL_INDEX_FILE
+
+class Route(NamedTuple):
+    """How to price one coin: `symbol`, times `bridge` when the pair isn't quoted in the target asset."""
+    symbol: str
+    bridge: Optional[str] = None
+
+class BinanceSymbolIndex:
+    """
+    A cached base asset -> quote assets index of Binance's trading pairs.
+
+    The index is loaded from disk on first use and re-downloaded when it is
+    older than `ttl`, or when a coin is missing and the last download is
+    more than MIN_REFRESH_SECONDS old. Failed downloads keep the old index
+    and are retried after RETRY_SECONDS. Thread-safe.
+    """
+
+    def __init__(self, path: Optional[Path] = None, api_root: str = BINANCE_API_ROOT,
+                 quote_asset: str = "USDT", ttl: float = SYMBOL_INDEX_TTL, timeout: float = 15):
+        """
+        Args:
+            path (Path, optional): File the index is cached in; None keeps it in memory only.
+            api_root (str): Binance REST root, e.g. https://api.binance.com/api/v3.
+            quote_asset (str): The asset prices are reported in.
+            ttl (float): Seconds before the index is downloaded again.
+            timeout (float): exchangeInfo request timeout in seconds.
+        """
+        self.path = path
+        self.api_root = api_root.rstrip('/')
+        self.quote_asset = quote_asset.upper()
+        self.ttl = ttl
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._pairs: Optional[Dict[str, List[str]]] = None
+        self._fetched = 0.0
+        self._attempted = 0.0
+
+    def routes(self, coins: List[str], session: "requests.Session",
+               now: Optional[float] = None) -> Dict[str, Route]:
+        """
+        Resolves coins to the pairs to request.
+
+        Coins that are the quote asset itself map to Route('') (priced at 1).
+        Coins Binance doesn't list are left out.
+
+        Args:
+            coins (List[str]): Coin codes, e.g. ['BTC', 'XYZ'].
+            session (requests.Session): Used if the index has to be downloaded.
+            now (float, optional): Current UNIX time. Defaults to time.time().
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            if self._pairs is None:
+                self._load()
+            if self._needs_refresh(coins, now):
+                self._refresh(session, now)
+            pairs = self._pairs
+
+        routes = {}
+        if pairs is None:
+            # No index yet: assume direct pairs, as a best effort
+            return {coin: Route('' if coin == self.quote_asset else coin + self.quote_asset) for coin in coins}
+        for coin in coins:
+            if coin == self.quote_asset:
+                routes[coin] = Route('')
+                continue
+            quotes = pairs.get(coin, ())
+            if self.quote_asset in quotes:
+                routes[coin] = Route(coin + self.quote_asset)
+                continue
+            for bridge in BRIDGE_ASSETS:
+                if bridge in quotes and self.quote_asset in pairs.get(bridge, ()):
+                    routes[coin] = Route(coin + bridge, bridge + self.quote_asset)
+                    break
+        return routes
+
+    def invalidate(self):
+        """Forces a download on the next lookup that needs it (e.g. after 'Invalid symbol')."""
+        with self._lock:
+            self._fetched = 0.0
+
+    def _needs_refresh(self, coins: List[str], now: float) -> bool:
+        if now - self._attempted < RETRY_SECONDS:
+            return False
+        if self._pairs is None or now - self._fetched > self.ttl:
+            return True
+        return (now - self._fetched > MIN_REFRESH_SECONDS
+                and any(coin not in self._pairs and coin != self.quote_asset for coin in coins))
+
+    def _load(self):
+        if self.path is None:
+            return
+        data = read_json(self.path, None, dict)
+        if data and isinstance(data.get('pairs'), dict):
+            self._pairs = data['pairs']
+            self._fetched = float(data.get('fetched', 0))
+
+    def _refresh(self, session: "requests.Session", now: float):
+        import requests
+
+        self._attempted = now
+        start = time.perf_counter()
+        try:
+            response = session.get(f"{self.api_root}/exchangeInfo", timeout=self.timeout)
+            HTTP_SECONDS.observe(time.perf_counter() - start, endpoint="binance_exchange_info")
+            response.raise_for_status()
+            with PARSE_SECONDS.time(kind="binance_exchange_info"):
+                pairs = parse_exchange_info(response.json())
+        except (requests.exceptions.RequestException, ValueError, KeyError, TypeError) as e:
+            HTTP_ERRORS.inc(endpoint="binance_exchange_info")
+            logger.warning("Could not update the Binance symbol list: %s", e)
+            return
+        self._pairs = pairs
+        self._fetched = now
+        if self.path is not None:
+            try:
+                atomic_write_json(self.path, {'fetched': now, 'pairs': pairs}, indent=None)
+            except OSError as e:
+                logger.error("Error saving the Binance symbol list: %s", e)
+
+def parse_exchange_info(data: Dict) -> Dict[str, List[str]]:
+    """
+    Reduces an exchangeInfo response to base asset -> quote assets of trading pairs.
+
+    Args:
+        data (Dict): The decoded /api/v3/exchangeInfo response.
+
+    Returns:
+        Dict[str, List[str]]: e.g. {'BTC': ['USDT', 'EUR', ...], ...}.
+    """
+    pairs: Dict[str, List[str]] = {}
+    for symbol in data['symbols']:
+        if symbol.get('status') != 'TRADING':
+            continue
+        pairs.setdefault(symbol['baseAsset'], []).append(symbol['quoteAsset'])
+    return pairs
@@ -1,77 +1,376 @@
 # QCryptoWidget/src/widget/api/coin_api.py
 
-import requests
-from typing import List, Dict, Optional, Tuple
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, List, Dict, Optional, Tuple
+
+if TYPE_CHECKING:
+    # requests and NumPy are imported on first use so importing this module stays
+    # cheap for GUI startup and for quote-only users like the daemon
+    import numpy as np
+    import requests
+    from widget.api.kline_cache import KlineCache
+
+from widget.diagnostics.metrics import HTTP_ERRORS, HTTP_SECONDS, PARSE_SECONDS
+
+logger = logging.getLogger(__name__)
 
 CMC_API_URL = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/quotes/latest"
+CMC_MAP_URL = "https://pro-api.coinmarketcap.com/v1/cryptocurrency/map"
 BINANCE_API_URL = "https://api.binance.com/api/v3/klines"
+# Binance returns at most this many candles per klines request
+MAX_KLINES_PER_REQUEST = 1000
+
+# Symbols per quotes request; keeps the query string well below URL length limits
+DEFAULT_CHUNK_SIZE = 100
+# Maximum number of chunk requests in flight at the same time
+DEFAULT_MAX_CONCURRENCY = 4
+# Assets per /cryptocurrency/map page (the API maximum)
+MAP_PAGE_SIZE = 5000
+# Only ask for the auxiliary fields the widget reads; the defaults (tags, supplies, ...) are dropped
+QUOTES_AUX_FIELDS = "is_active"
+MAP_AUX_FIELDS = "is_active"
+# Pause after HTTP 429 when the response has no usable Retry-After header
+RATE_LIMIT_PAUSE = 60
+
+def create_session(pool_size: int = DEFAULT_MAX_CONCURRENCY) -> "requests.Session":
+    """
+    Creates a requests session with a keep-alive connection pool.
+
+    Args:
+        pool_size (int): Number of connections kept open per host.
+
+    Returns:
+        requests.Session: The configured session.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
 
-def get_current_prices(coin_codes: List[str], api_key: str) -> Optional[Dict]:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+class CoinApiClient:
+    """
+    Reusable CoinMarketCap quotes client.
+
+    Holds one pooled session for the lifetime of the client, splits large
+    watchlists into bounded chunks and fetches the chunks concurrently.
+    """
+
+    def __init__(self, api_key: str, base_url: str = CMC_API_URL,
+                 chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 timeout: float = 10, map_url: Optional[str] = None):
+        self.api_key = api_key
+        self.base_url = base_url
+        if map_url is None:
+            # The map lives next to quotes/latest (also on test servers)
+            map_url = base_url.rsplit('/quotes/', 1)[0] + "/map" if '/quotes/' in base_url else CMC_MAP_URL
+        self.map_url = map_url
+        self.chunk_size = max(1, chunk_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self._session = None
+        self._executor = None
+        self._lock = threading.Lock()
+        # After HTTP 429, quote requests fail at once (without a request) until this UNIX time
+        self.paused_until = 0.0
+        # Called as usage_callback(status, status_code, retry_after) after every response, where
+        # status is the body's decoded "status" object (None if the body isn't JSON)
+        self.usage_callback: Optional[Callable[[Optional[Dict], int, Optional[float]], None]] = None
+
+    @property
+    def session(self) -> "requests.Session":
+        """The pooled session, created on first use (usually on a worker thread)."""
+        with self._lock:
+            if self._session is None:
+                self._session = create_session(self.max_concurrency)
+                self._session.headers.update({'Accepts': 'application/json', 'X-CMC_PRO_API_KEY': self.api_key})
+            return self._session
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                                    thread_name_prefix="cmc-chunk")
+            return self._executor
+
+    def get_current_prices(self, coin_codes: List[str], ids: Optional[Dict[str, int]] = None) -> Optional[Dict]:
+        """
+        Fetches the current price and other data for a list of cryptocurrencies.
+
+        Args:
+            coin_codes (List[str]): The coin codes to fetch (e.g., ['BTC', 'ETH']).
+            ids (Dict[str, int], optional): CoinMarketCap ids for some or all of the codes
+                (see SymbolIndex.ids_for). Those coins are requested by id, which is
+                unambiguous; the rest are requested by symbol.
+
+        Returns:
+            Optional[Dict]: Coin code -> {price, percent_change_24h, percent_change_7d, slug}.
+                Chunks that fail are left out; None is returned only if every chunk failed.
+        """
+        if not coin_codes:
+            return {}
+        ids = ids or {}
+        # A request takes either ids or symbols, so the two kinds are chunked separately
+        by_id = [code for code in coin_codes if code in ids]
+        by_symbol = [code for code in coin_codes if code not in ids]
+        chunks = [(by_id[i:i + self.chunk_size], ids) for i in range(0, len(by_id), self.chunk_size)]
+        chunks += [(by_symbol[i:i + self.chunk_size], None) for i in range(0, len(by_symbol), self.chunk_size)]
+        if len(chunks) == 1:
+            return self._fetch_chunk(*chunks[0])
+
+        results = {}
+        failures = 0
+        for chunk_result in self._get_executor().map(lambda chunk: self._fetch_chunk(*chunk), chunks):
+            if chunk_result is None:
+                failures += 1
+            else:
+                results.update(chunk_result)
+        if failures == len(chunks):
+            return None
+        if failures:
+            logger.warning("%d of %d quote requests failed.", failures, len(chunks))
+        return results
+
+    def _fetch_chunk(self, coin_codes: List[str], ids: Optional[Dict[str, int]] = None) -> Optional[Dict]:
+        import requests
+
+        if time.time() < self.paused_until:
+            return None  # Rate limited: retrying now would only extend the ban
+        parameters = {'convert': 'USD', 'aux': QUOTES_AUX_FIELDS}
+        if ids:
+            parameters['id'] = ",".join(str(ids[code]) for code in coin_codes)
+        else:
+            parameters['symbol'] = ",".join(coin_codes)
+        start = time.perf_counter()
+        try:
+            response = self.session.get(self.base_url, params=parameters, timeout=self.timeout)
+            HTTP_SECONDS.observe(time.perf_counter() - start, endpoint="cmc_quotes")
+            # The body is decoded once, for both the usage callback and the quotes
+            start = time.perf_counter()
+            data = _json_body(response)
+            decode_seconds = time.perf_counter() - start
+            self._report_usage(response, data)
+            if response.status_code == 429:
+                self.paused_until = time.time() + (_retry_after(response) or RATE_LIMIT_PAUSE)
+            response.raise_for_status()
+            if data is None:
+                raise requests.exceptions.InvalidJSONError("Response body is not a JSON object")
+            start = time.perf_counter()
+            try:
+                if data['status']['error_code'] != 0:
+                    logger.error("CoinMarketCap API Error: %s", data['status']['error_message'])
+                    return None
+                return parse_quotes(data, coin_codes, ids)
+            finally:
+                PARSE_SECONDS.observe(decode_seconds + time.perf_counter() - start, kind="cmc_quotes")
+        except requests.exceptions.RequestException as e:
+            HTTP_ERRORS.inc(endpoint="cmc_quotes")
+            logger.error("API request failed: %s", e)
+            return None
+
+    def get_map(self, page_size: int = MAP_PAGE_SIZE) -> Optional[List[Dict]]:
+        """
+        Downloads CoinMarketCap's list of active assets (/cryptocurrency/map), page by page.
+
+        Returns:
+            Optional[List[Dict]]: Entries with id, symbol, name, slug and rank; None on failure.
+        """
+        import requests
+
+        entries = []
+        start_index = 1
+        while True:
+            parameters = {'start': start_index, 'limit': page_size, 'sort': 'cmc_rank', 'aux': MAP_AUX_FIELDS}
+            start = time.perf_counter()
+            try:
+                response = self.session.get(self.map_url, params=parameters, timeout=self.timeout * 3)
+                HTTP_SECONDS.observe(time.perf_counter() - start, endpoint="cmc_map")
+                with PARSE_SECONDS.time(kind="cmc_map"):
+                    data = _json_body(response)
+                self._report_usage(response, data)
+                response.raise_for_status()
+                if data is None:
+                    raise ValueError("Response body is not a JSON object")
+                if data['status']['error_code'] != 0:
+                    logger.error("CoinMarketCap API Error: %s", data['status']['error_message'])
+                    return None
+                page = data['data']
+            except (requests.exceptions.RequestException, ValueError, KeyError, TypeError) as e:
+                HTTP_ERRORS.inc(endpoint="cmc_map")
+                logger.warning("Could not download the CoinMarketCap map: %s", e)
+                return None
+            entries.extend(page)
+            if len(page) < page_size:
+                return entries
+            start_index += page_size
+
+    def _report_usage(self, response: "requests.Response", data: Optional[Dict]):
+        if self.usage_callback is None:
+            return
+        status = data.get('status') if data is not None else None
+        retry_after = _retry_after(response) if response.status_code == 429 else None
+        self.usage_callback(status if isinstance(status, dict) else None, response.status_code, retry_after)
+
+    def close(self):
+        """Releases the pooled connections and worker threads."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+def _json_body(response: "requests.Response") -> Optional[Dict]:
+    # The decoded body if it is a JSON object (error pages and empty bodies give None)
+    try:
+        data = response.json()
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+def _retry_after(response: "requests.Response") -> Optional[float]:
+    try:
+        return float(response.headers.get('Retry-After', ''))
+    except ValueError:
+        return None
+
+def parse_quotes(data: Dict, coin_codes: List[str], ids: Optional[Dict[str, int]] = None) -> Dict:
+    """
+    Extracts the widget's price fields from a CoinMarketCap quotes response.
+
+    Args:
+        data (Dict): The decoded JSON response.
+        coin_codes (List[str]): The coin codes that were requested.
+        ids (Dict[str, int], optional): Code -> id, if the coins were requested by id
+            (the response is then keyed by id).
+
+    Returns:
+        Dict: Coin code -> {price, percent_change_24h, percent_change_7d, slug}.
+    """
+    results = {}
+    for code in coin_codes:
+        key = str(ids[code]) if ids else code
+        if key in data['data']:
+            coin_data = data['data'][key]
+            quote_data = coin_data['quote']['USD']
+            # **ENHANCEMENT**: Fetch slug and 7d change as well
+            results[code] = {
+                'price': quote_data['price'],
+                'percent_change_24h': quote_data.get('percent_change_24h', 0),
+                'percent_change_7d': quote_data.get('percent_change_7d', 0),
+                'slug': coin_data.get('slug', '')
+            }
+    return results
+
+_clients: Dict[str, CoinApiClient] = {}
+_clients_lock = threading.Lock()
+_binance_session: Optional["requests.Session"] = None
+
+def get_client(api_key: str) -> CoinApiClient:
+    """Returns the shared client for an API key, creating it on first use."""
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            client = _clients[api_key] = CoinApiClient(api_key)
+        return client
+
+def get_current_prices(coin_codes: List[str], api_key: str, ids: Optional[Dict[str, int]] = None) -> Optional[Dict]:
     """
     Fetches the current price and other data for a list of cryptocurrencies.
     """
-    if not coin_codes:
-        return {}
-    parameters = {'symbol': ",".join(coin_codes), 'convert': 'USD'}
-    headers = {'Accepts': 'application/json', 'X-CMC_PRO_API_KEY': api_key}
+    return get_client(api_key).get_current_prices(coin_codes, ids)
+
+def _get_binance_session() -> "requests.Session":
+    global _binance_session
+    with _clients_lock:
+        if _binance_session is None:
+            _binance_session = create_session()
+        return _binance_session
+
+def _fetch_klines(symbol: str, interval: str, limit: int, start_time: Optional[int] = None) -> Optional["np.ndarray"]:
+    import requests
+    from widget.api.kline_cache import parse_klines
+
+    params = {'symbol': symbol, 'interval': interval, 'limit': limit}
+    if start_time is not None:
+        params['startTime'] = start_time
+    start = time.perf_counter()
     try:
-        response = requests.get(CMC_API_URL, headers=headers, params=parameters, timeout=10)
+        response = _get_binance_session().get(BINANCE_API_URL, params=params, timeout=10)
+        HTTP_SECONDS.observe(time.perf_counter() - start, endpoint="binance_klines")
         response.raise_for_status()
-        data = response.json()
-        if data['status']['error_code'] != 0:
-            print(f"CoinMarketCap API Error: {data['status']['error_message']}")
-            return None
-            
-        results = {}
-        for code in coin_codes:
-            if code in data['data']:
-                coin_data = data['data'][code]
-                quote_data = coin_data['quote']['USD']
-                # **ENHANCEMENT**: Fetch slug and 7d change as well
-                results[code] = {
-                    'price': quote_data['price'],
-                    'percent_change_24h': quote_data.get('percent_change_24h', 0),
-                    'percent_change_7d': quote_data.get('percent_change_7d', 0),
-                    'slug': coin_data.get('slug', '')
-                }
-        return results
+        raw_data = response.json()
     except requests.exceptions.RequestException as e:
-        print(f"API request failed: {e}")
+        HTTP_ERRORS.inc(endpoint="binance_klines")
+        logger.error("Failed to get chart data for %s: %s", symbol, e)
+        return None
+    if isinstance(raw_data, dict) and 'code' in raw_data:
+        logger.error("Binance API Error for %s: %s", symbol, raw_data.get('msg'))
         return None
+    if not isinstance(raw_data, list):
+        logger.error("Unexpected data format from Binance for %s: %s", symbol, raw_data)
+        return None
+    with PARSE_SECONDS.time(kind="klines"):
+        return parse_klines(raw_data)
 
-def get_chart_data(coin_code: str, interval_days: int = 7) -> Optional[Tuple[List[float], List[float]]]:
+def get_chart_data(coin_code: str, interval_days: int = 7, interval: str = '1d',
+                   cache: Optional["KlineCache"] = None) -> Optional[Tuple["np.ndarray", "np.ndarray"]]:
     """
     (This function is no longer used by the UI but is kept for potential future use)
     Fetches historical price data for a single coin from Binance for charting.
+
+    With a cache, only candles newer than the last cached one are requested
+    (via startTime); the last cached candle is re-fetched because it may still
+    have been open.
+
+    Args:
+        coin_code (str): The coin code (e.g., 'BTC').
+        interval_days (int): Number of candles to return (at most 1000).
+        interval (str): Binance kline interval, e.g. '1m', '1h' or '1d'.
+        cache (KlineCache, optional): Cache to read from and update.
+
+    Returns:
+        Optional[Tuple[np.ndarray, np.ndarray]]: (timestamps in seconds, close prices), or None.
     """
+    from widget.api.kline_cache import INTERVAL_MS, INTERVAL_OFFSET_MS, merge_klines
+
     symbol = f"{coin_code.upper()}USDT"
-    params = {'symbol': symbol, 'interval': '1d', 'limit': interval_days}
-    try:
-        response = requests.get(BINANCE_API_URL, params=params, timeout=10)
-        response.raise_for_status()
-        raw_data = response.json()
-        if isinstance(raw_data, dict) and 'code' in raw_data:
-            print(f"Binance API Error for {symbol}: {raw_data.get('msg')}")
-            return None
-        if not isinstance(raw_data, list):
-            print(f"Unexpected data format from Binance for {symbol}: {raw_data}")
-            return None
-        timestamps = []
-        close_prices = []
-        for kline in raw_data:
-            if isinstance(kline, list) and len(kline) >= 5:
-                try:
-                    ts = int(kline[0]) / 1000
-                    price = float(kline[4])
-                    timestamps.append(ts)
-                    close_prices.append(price)
-                except (ValueError, TypeError, IndexError) as e:
-                    print(f"Skipping malformed kline item: {kline}, error: {e}")
-                    continue
-        if not timestamps or not close_prices:
-            print(f"No valid chart data points were processed for {symbol}.")
+    limit = max(1, min(interval_days, MAX_KLINES_PER_REQUEST))
+    step = INTERVAL_MS.get(interval)
+    if step is None:
+        logger.error("Unsupported kline interval: %s", interval)
+        return None
+
+    cached = cache.get(symbol, interval) if cache is not None else None
+    klines = None
+    if cached is not None and len(cached):
+        now_ms = time.time() * 1000
+        offset = INTERVAL_OFFSET_MS.get(interval, 0)
+        # Open time of the current candle, then of the first one in the window
+        first_needed = ((now_ms - offset) // step) * step + offset - (limit - 1) * step
+        missing = int((now_ms - cached[-1, 0]) // step) + 1
+        # Incremental update only if the cache covers the window and the gap fits one request
+        if cached[0, 0] <= first_needed and missing <= MAX_KLINES_PER_REQUEST:
+            fresh = _fetch_klines(symbol, interval, missing, start_time=int(cached[-1, 0]))
+            if fresh is None:
+                return None
+            klines = merge_klines(cached, fresh)
+    if klines is None:
+        klines = _fetch_klines(symbol, interval, limit)
+        if klines is None:
             return None
-        return timestamps, close_prices
-    except requests.exceptions.RequestException as e:
-        print(f"Failed to get chart data for {coin_code}: {e}")
-        return None
\ No newline at end of file
+    if not len(klines):
+        logger.warning("No valid chart data points were processed for %s.", symbol)
+        return None
+    if cache is not None:
+        cache.put(symbol, interval, klines)
+    window = klines[-limit:]
+    return window[:, 0] / 1000, window[:, 1]
@@ -0,0 +1,197 @@
+# QCryptoWidget/src/widget/api/credit_budget.py
+
+import calendar
+import json
+import logging
+import math
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from widget.data.persistence import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+CREDIT_USAGE_FILE = "credit_usage.json"
+
+# quotes/latest costs one credit per 100 coins returned (rounded up) per call
+SYMBOLS_PER_CREDIT = 100
+
+# CoinMarketCap Basic plan limits
+DEFAULT_DAILY_CREDITS = 333
+DEFAULT_MONTHLY_CREDITS = 10000
+
+def get_credit_usage_path(root_path: Path) -> Path:
+    """Returns the full path to the persisted credit usage file."""
+    return root_path / CREDIT_USAGE_FILE
+
+def estimate_call_cost(symbol_count: int, chunk_size: int = SYMBOLS_PER_CREDIT) -> int:
+    """
+    Estimates the credits one refresh of `symbol_count` coins costs.
+
+    Args:
+        symbol_count (int): Number of coins requested.
+        chunk_size (int): Symbols per request, as used by CoinApiClient.
+
+    Returns:
+        int: The estimated credit cost (at least 1 when any coin is requested).
+    """
+    if symbol_count <= 0:
+        return 0
+    full_chunks, remainder = divmod(symbol_count, chunk_size)
+    cost = full_chunks * math.ceil(chunk_size / SYMBOLS_PER_CREDIT)
+    if remainder:
+        cost += math.ceil(remainder / SYMBOLS_PER_CREDIT)
+    return cost
+
+class CreditBudget:
+    """
+    Tracks CoinMarketCap credit usage and derives the fastest sustainable refresh rate.
+
+    Usage is recorded from the `status.credit_count` CMC returns with each
+    response and is reset at UTC day and month boundaries, like CMC's own
+    counters. HTTP 429 responses double a backoff multiplier that is cleared
+    again by the next successful call. All methods are thread-safe.
+    """
+
+    def __init__(self, daily_limit: int = DEFAULT_DAILY_CREDITS,
+                 monthly_limit: int = DEFAULT_MONTHLY_CREDITS,
+                 min_interval: float = 60, state_path: Optional[Path] = None):
+        """
+        Args:
+            daily_limit (int): Credits available per UTC day.
+            monthly_limit (int): Credits available per UTC calendar month.
+            min_interval (float): Shortest refresh interval in seconds, regardless of budget.
+            state_path (Path, optional): File to persist usage in, so restarts keep counting.
+        """
+        self.daily_limit = daily_limit
+        self.monthly_limit = monthly_limit
+        self.min_interval = min_interval
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        self._day = ""
+        self._month = ""
+        self.day_used = 0
+        self.month_used = 0
+        self.last_call = 0.0
+        self.backoff = 1.0
+        self.backoff_until = 0.0
+        self._load()
+
+    def record_response(self, status: Optional[Dict], status_code: int, retry_after: Optional[float] = None,
+                        now: Optional[float] = None):
+        """
+        Records one API response. Meant to be used as CoinApiClient's usage callback.
+
+        Args:
+            status (Dict, optional): The response body's `status` object, whose
+                `credit_count` is charged (None if the body had none).
+            status_code (int): The HTTP status code.
+            retry_after (float, optional): Seconds from a Retry-After header.
+            now (float, optional): Current UNIX time. Defaults to time.time().
+        """
+        if now is None:
+            now = time.time()
+        try:
+            credit_count = int((status or {}).get('credit_count') or 0)
+        except (TypeError, ValueError):
+            credit_count = 0
+        with self._lock:
+            self._roll_periods(now)
+            self.last_call = now
+            self.day_used += credit_count
+            self.month_used += credit_count
+            if status_code == 429:
+                self.backoff = min(self.backoff * 2, 64)
+                wait = retry_after if retry_after is not None else self.min_interval * self.backoff
+                self.backoff_until = max(self.backoff_until, now + wait)
+                logger.warning("CoinMarketCap rate limit hit; backing off for %.0fs.", wait)
+            elif status_code < 400:
+                self.backoff = 1.0
+            self._save()
+
+    def next_interval(self, symbol_count: int, now: Optional[float] = None) -> float:
+        """
+        Returns the shortest refresh interval, in seconds, the remaining budget allows.
+
+        Remaining daily and monthly credits are spread evenly over the time left in
+        the day and month; the stricter of the two wins. While backing off from a
+        429 the interval is at least the remaining backoff time.
+        """
+        if now is None:
+            now = time.time()
+        cost = estimate_call_cost(symbol_count)
+        with self._lock:
+            self._roll_periods(now)
+            if cost == 0:
+                return self.min_interval
+            day_end, month_end = self._period_ends(now)
+            interval = max(
+                self._spread(self.daily_limit - self.day_used, cost, day_end - now),
+                self._spread(self.monthly_limit - self.month_used, cost, month_end - now),
+                self.min_interval * self.backoff,
+            )
+            return max(interval, self.backoff_until - now)
+
+    def min_gap_remaining(self, now: Optional[float] = None) -> float:
+        """Seconds until another call may be made without breaking min_interval or a backoff."""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            return max(0.0, self.last_call + self.min_interval - now, self.backoff_until - now)
+
+    def backoff_remaining(self, now: Optional[float] = None) -> float:
+        """Seconds left in the current 429 backoff, or 0."""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            return max(0.0, self.backoff_until - now)
+
+    @staticmethod
+    def _spread(credits_left: int, cost: int, seconds_left: float) -> float:
+        calls_left = credits_left // cost
+        if calls_left <= 0:
+            return seconds_left  # Exhausted: wait for the period to reset
+        return seconds_left / calls_left
+
+    @staticmethod
+    def _period_ends(now: float):
+        t = time.gmtime(now)
+        day_end = calendar.timegm((t.tm_year, t.tm_mon, t.tm_mday, 0, 0, 0)) + 86400
+        days_in_month = calendar.monthrange(t.tm_year, t.tm_mon)[1]
+        month_end = calendar.timegm((t.tm_year, t.tm_mon, 1, 0, 0, 0)) + days_in_month * 86400
+        return day_end, month_end
+
+    def _roll_periods(self, now: float):
+        day = time.strftime("%Y-%m-%d", time.gmtime(now))
+        month = day[:7]
+        if day != self._day:
+            self._day = day
+            self.day_used = 0
+        if month != self._month:
+            self._month = month
+            self.month_used = 0
+
+    def _load(self):
+        if self.state_path is None or not self.state_path.exists():
+            return
+        try:
+            with open(self.state_path, 'r') as f:
+                state = json.load(f)
+            self._day = state.get('day', "")
+            self._month = state.get('month', "")
+            self.day_used = int(state.get('day_used', 0))
+            self.month_used = int(state.get('month_used', 0))
+        except (json.JSONDecodeError, IOError, ValueError, AttributeError):
+            pass
+
+    def _save(self):
+        if self.state_path is None:
+            return
+        state = {'day': self._day, 'day_used': self.day_used,
+                 'month': self._month, 'month_used': self.month_used}
+        try:
+            atomic_write_json(self.state_path, state, indent=None)
+        except OSError as e:
+            logger.error("Error saving credit usage: %s", e)
@@ -0,0 +1,315 @@
+# QCryptoWidget/src/widget/api/fx_rates.py
+"""
+Display currencies computed locally from USD quotes.
+
+Quotes are always fetched in USD, in one request and without extra
+credits. Other denominations come from a small rate table:
+    fiat (EUR, GBP, ...)   ECB reference rates from a free API, cached in
+                           fx_rates.json and refreshed every few hours
+    crypto (BTC, ETH, ...) the coin's own USD quote when it is on the
+                           watchlist, else Binance's public 24h ticker
+convert_quotes() re-denominates a whole quote dictionary in one vectorized
+pass (convert_snapshot() a PriceSnapshot, without building dictionaries),
+so switching the display currency costs no network request.
+
+Percent changes of crypto denominations are relative to the reference coin
+(SOL vs. BTC), and unknown where the reference coin's own change is; fiat
+denominations keep the USD changes, since the 24h and 7d moves of major
+fiat pairs are small next to crypto moves.
+"""
+
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from widget.api.binance_symbols import BINANCE_API_ROOT
+from widget.api.coin_api import create_session
+from widget.api.providers import parse_binance_tickers
+from widget.data.persistence import atomic_write_json, read_json
+from widget.diagnostics.metrics import HTTP_ERRORS, HTTP_SECONDS
+
+logger = logging.getLogger(__name__)
+
+FX_RATES_FILE = "fx_rates.json"
+# Frankfurter serves the ECB reference rates without an API key
+FX_RATES_URL = "https://api.frankfurter.app/latest"
+# Reference rates are published once per working day
+FX_RATES_TTL = 6 * 3600
+RETRY_SECONDS = 600
+
+BASE_CURRENCY = "USD"
+# Denominations priced from crypto quotes rather than from the fiat rate table
+CRYPTO_CURRENCIES = ("BTC", "ETH", "BNB", "SOL")
+CURRENCY_SYMBOLS = {"USD": "$", "EUR": "€", "GBP": "£", "JPY": "¥", "BTC": "₿", "ETH": "Ξ"}
+# Fraction digits shown per denomination; a coin worth 0.00001 BTC needs more than 4
+CRYPTO_DECIMALS = 8
+FIAT_DECIMALS = 4
+
+CHANGE_FIELDS = ('percent_change_24h', 'percent_change_7d')
+
+def get_fx_rates_path(root_path: Path) -> Path:
+    """Returns the full path to the cached exchange rate table."""
+    return root_path / FX_RATES_FILE
+
+def currency_symbol(currency: str) -> str:
+    """Returns the prefix prices in a currency are shown with, e.g. '€' or 'CHF '."""
+    return CURRENCY_SYMBOLS.get(currency, currency + " ")
+
+def currency_decimals(currency: str) -> int:
+    """Returns how many fraction digits prices in a currency are shown with."""
+    return CRYPTO_DECIMALS if currency in CRYPTO_CURRENCIES else FIAT_DECIMALS
+
+def convert_quotes(price_data: Dict[str, Dict], usd_per_unit: float,
+                   reference_changes: Optional[Dict[str, float]] = None) -> Dict[str, Dict]:
+    """
+    Re-denominates USD quotes, all coins at once.
+
+    Args:
+        price_data (Dict[str, Dict]): USD quotes keyed by coin code.
+        usd_per_unit (float): The target currency's price in USD (e.g. 1.08 for EUR).
+        reference_changes (Dict[str, float], optional): The target currency's own
+            USD percent changes by field; changes are then made relative to it. A
+            field whose reference is None is unknown in that currency and dropped.
+
+    Returns:
+        Dict[str, Dict]: New quote dictionaries; the input is not modified.
+    """
+    import numpy as np
+
+    coins = list(price_data)
+    count = len(coins)
+    columns = _convert_columns(
+        lambda field: np.fromiter((_known(price_data[coin].get(field)) for coin in coins), float, count),
+        usd_per_unit, reference_changes)
+
+    converted = {coin: dict(price_data[coin]) for coin in coins}
+    for field, column in columns.items():
+        for coin, value in zip(coins, column.tolist()):
+            if value == value:
+                converted[coin][field] = value
+            else:
+                converted[coin].pop(field, None)  # Unknown (NaN) values are left out
+    return converted
+
+def _known(value) -> float:
+    return float('nan') if value is None else value
+
+def convert_snapshot(snapshot, usd_per_unit: float,
+                     reference_changes: Optional[Dict[str, float]] = None):
+    """
+    convert_quotes() for a PriceSnapshot: the columns are converted as arrays
+    and returned as a new snapshot; the input is not modified.
+    """
+    return snapshot.with_columns(_convert_columns(snapshot.column, usd_per_unit, reference_changes))
+
+def _convert_columns(column, usd_per_unit: float, reference_changes: Optional[Dict[str, float]]) -> Dict:
+    # column(field) returns that field for every coin, unknown values as NaN (which stay NaN)
+    columns = {'price': column('price') / usd_per_unit}
+    for field, reference in (reference_changes or {}).items():
+        if reference is None:
+            # The USD change would be mistaken for one relative to the reference
+            columns[field] = column(field) * float('nan')
+            continue
+        columns[field] = ((100.0 + column(field)) / (100.0 + reference) - 1.0) * 100.0
+    return columns
+
+class FxRates:
+    """
+    A cached table of USD prices per unit of each display currency. Thread-safe.
+
+    The table is loaded from disk on first use; refresh() downloads it again
+    (call it off the GUI thread, or use refresh_in_background()).
+    """
+
+    def __init__(self, path: Optional[Path], currencies: List[str], url: str = FX_RATES_URL,
+                 binance_root: str = BINANCE_API_ROOT, ttl: float = FX_RATES_TTL, timeout: float = 10):
+        """
+        Args:
+            path (Path, optional): File the table is cached in; None keeps it in memory only.
+            currencies (List[str]): Display currencies to keep rates for, e.g. ['USD', 'EUR', 'BTC'].
+            url (str): Reference-rate endpoint answering ?from=USD&to=EUR,GBP (Frankfurter's /latest).
+            binance_root (str): Binance REST root for crypto rates.
+            ttl (float): Seconds after which the table is stale.
+            timeout (float): Request timeout in seconds.
+        """
+        self.path = path
+        self.currencies = [currency.upper() for currency in currencies]
+        self.url = url
+        self.binance_root = binance_root.rstrip('/')
+        self.ttl = ttl
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._loaded = False
+        # currency -> {'usd': USD per unit, 'percent_change_24h': ..., ...}
+        self._rates: Dict[str, Dict[str, float]] = {}
+        self._fetched = 0.0
+        self._attempted = 0.0
+        self._refreshing = False
+        self._session = None
+
+    @property
+    def needed(self) -> bool:
+        """Whether any currency besides USD is configured (otherwise nothing is ever downloaded)."""
+        return any(currency != BASE_CURRENCY for currency in self.currencies)
+
+    def rate(self, currency: str, price_data: Optional[Dict[str, Dict]] = None) -> Optional[Dict[str, float]]:
+        """
+        Returns a currency's USD price and, for crypto, its percent changes.
+
+        A crypto currency on the watchlist is taken from `price_data`, which is
+        fresher than the table. Returns None if the rate is unknown.
+        """
+        currency = currency.upper()
+        if currency == BASE_CURRENCY:
+            return {'usd': 1.0}
+        if price_data and currency in CRYPTO_CURRENCIES and price_data.get(currency, {}).get('price'):
+            quote = price_data[currency]
+            return {'usd': quote['price'], **{field: quote.get(field) for field in CHANGE_FIELDS}}
+        self._ensure_loaded()
+        return self._rates.get(currency)
+
+    def convert(self, price_data: Dict[str, Dict], currency: str) -> Optional[Dict[str, Dict]]:
+        """
+        Returns the quotes in another currency, or None if its rate is unknown.
+        A PriceSnapshot is converted to a PriceSnapshot.
+        """
+        if currency.upper() == BASE_CURRENCY:
+            return price_data
+        rate = self.rate(currency, price_data)
+        if rate is None or not rate.get('usd'):
+            return None
+        # Crypto changes are relative to the reference coin, and unknown where its own change is
+        # (the Binance fallback only has 24h); fiat keeps the USD changes
+        reference = ({field: rate.get(field) for field in CHANGE_FIELDS}
+                     if currency.upper() in CRYPTO_CURRENCIES else None)
+        from widget.data.price_snapshot import PriceSnapshot  # Deferred like numpy
+        if isinstance(price_data, PriceSnapshot):
+            return convert_snapshot(price_data, rate['usd'], reference)
+        return convert_quotes(price_data, rate['usd'], reference)
+
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        """Whether the table should be downloaded again (never if only USD is configured)."""
+        if now is None:
+            now = time.time()
+        self._ensure_loaded()
+        return self.needed and now - self._fetched > self.ttl and now - self._attempted > RETRY_SECONDS
+
+    def refresh(self, now: Optional[float] = None) -> bool:
+        """
+        Downloads fiat and crypto rates; blocking. Sources that fail keep their old rates.
+
+        Returns:
+            bool: True if every source answered.
+        """
+        if now is None:
+            now = time.time()
+        self._attempted = now
+        fiat = [c for c in self.currencies if c != BASE_CURRENCY and c not in CRYPTO_CURRENCIES]
+        crypto = [c for c in self.currencies if c in CRYPTO_CURRENCIES]
+        rates = {}
+        ok = True
+        if fiat:
+            fiat_rates = self._fetch_fiat(fiat)
+            ok = fiat_rates is not None
+            rates.update(fiat_rates or {})
+        if crypto:
+            crypto_rates = self._fetch_crypto(crypto)
+            ok = ok and crypto_rates is not None
+            rates.update(crypto_rates or {})
+        if not rates:
+            return False
+        with self._lock:
+            self._rates.update(rates)
+            self._fetched = now
+            table = {'fetched': now, 'rates': dict(self._rates)}
+        if self.path is not None:
+            try:
+                atomic_write_json(self.path, table)
+            except OSError as e:
+                logger.error("Error saving exchange rates: %s", e)
+        logger.info("Exchange rates updated: %s", ", ".join(sorted(rates)))
+        return ok
+
+    def refresh_in_background(self) -> bool:
+        """Starts a refresh on a daemon thread if the table is stale. Returns whether one started."""
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+        if not self.is_stale():
+            self._refreshing = False
+            return False
+
+        def run():
+            try:
+                self.refresh()
+            finally:
+                self._refreshing = False
+        threading.Thread(target=run, name="fx-rates-refresh", daemon=True).start()
+        return True
+
+    @property
+    def session(self):
+        with self._lock:
+            if self._session is None:
+                self._session = create_session(1)
+            return self._session
+
+    def _fetch_fiat(self, currencies: List[str]) -> Optional[Dict[str, Dict[str, float]]]:
+        import requests
+
+        start = time.perf_counter()
+        try:
+            response = self.session.get(self.url, params={'from': BASE_CURRENCY, 'to': ",".join(currencies)},
+                                        timeout=self.timeout)
+            HTTP_SECONDS.observe(time.perf_counter() - start, endpoint="fx_rates")
+            response.raise_for_status()
+            # Units of each currency per USD
+            per_usd = response.json()['rates']
+            return {currency: {'usd': 1.0 / float(per_usd[currency])}
+                    for currency in currencies if per_usd.get(currency)}
+        except (requests.exceptions.RequestException, ValueError, KeyError, TypeError) as e:
+            HTTP_ERRORS.inc(endpoint="fx_rates")
+            logger.warning("Could not update exchange rates: %s", e)
+            return None
+
+    def _fetch_crypto(self, currencies: List[str]) -> Optional[Dict[str, Dict[str, float]]]:
+        import requests
+
+        symbols = [currency + "USDT" for currency in currencies]
+        start = time.perf_counter()
+        try:
+            response = self.session.get(f"{self.binance_root}/ticker/24hr",
+                                        params={'symbols': json.dumps(symbols, separators=(',', ':')),
+                                                'type': 'MINI'},
+                                        timeout=self.timeout)
+            HTTP_SECONDS.observe(time.perf_counter() - start, endpoint="fx_crypto_rates")
+            response.raise_for_status()
+            tickers = parse_binance_tickers(response.json())
+        except (requests.exceptions.RequestException, ValueError, KeyError, TypeError) as e:
+            HTTP_ERRORS.inc(endpoint="fx_crypto_rates")
+            logger.warning("Could not update crypto exchange rates: %s", e)
+            return None
+        rates = {}
+        for currency, symbol in zip(currencies, symbols):
+            if symbol in tickers:
+                price, change = tickers[symbol]
+                rates[currency] = {'usd': price, 'percent_change_24h': change}
+        return rates
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            if self.path is not None:
+                data = read_json(self.path, None, dict)
+                if data and isinstance(data.get('rates'), dict):
+                    self._rates = {currency: rate for currency, rate in data['rates'].items()
+                                   if isinstance(rate, dict) and rate.get('usd')}
+                    self._fetched = float(data.get('fetched', 0))
+            self._loaded = True
@@ -0,0 +1,143 @@
+# QCryptoWidget/src/widget/api/kline_cache.py
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Candle width in milliseconds for the supported Binance intervals
+INTERVAL_MS = {
+    '1m': 60_000,
+    '5m': 5 * 60_000,
+    '15m': 15 * 60_000,
+    '1h': 3_600_000,
+    '4h': 4 * 3_600_000,
+    '1d': 86_400_000,
+    '1w': 7 * 86_400_000,
+}
+# Where candles start relative to the epoch: weekly candles open on Mondays,
+# while 1970-01-01 was a Thursday
+INTERVAL_OFFSET_MS = {'1w': 4 * 86_400_000}
+
+KLINE_CACHE_DIR = "kline_cache"
+
+def get_kline_cache_dir(root_path: Path) -> Path:
+    """Returns the directory holding cached klines."""
+    return root_path / KLINE_CACHE_DIR
+
+class KlineCache:
+    """
+    On-disk kline cache keyed by (symbol, interval).
+
+    Each entry is an (n, 2) float64 array of [open_time_ms, close] rows stored as
+    one .npy file. Recently used entries are also kept in memory. When the
+    number of files exceeds max_entries, the least recently used are deleted.
+    """
+
+    def __init__(self, cache_dir: Path, max_entries: int = 64, max_memory_entries: int = 16,
+                 max_rows: int = 5000):
+        """
+        Args:
+            cache_dir (Path): Directory for the .npy files; created if missing.
+            max_entries (int): Maximum number of (symbol, interval) files kept on disk.
+            max_memory_entries (int): Maximum number of entries kept in memory.
+            max_rows (int): Maximum candles kept per entry; older candles are dropped.
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_memory_entries = max_memory_entries
+        self.max_rows = max_rows
+        self._memory: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, symbol: str, interval: str) -> Path:
+        return self.cache_dir / f"{symbol.upper()}_{interval}.npy"
+
+    def get(self, symbol: str, interval: str) -> Optional[np.ndarray]:
+        """Returns the cached [open_time_ms, close] rows, or None if not cached."""
+        key = (symbol.upper(), interval)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        path = self._path(symbol, interval)
+        try:
+            data = np.load(path, allow_pickle=False)
+            os.utime(path)  # Mark as recently used for disk eviction
+        except (OSError, ValueError):
+            return None
+        if data.ndim != 2 or data.shape[1] != 2:
+            return None
+        self._remember(key, data)
+        return data
+
+    def put(self, symbol: str, interval: str, data: np.ndarray):
+        """Stores rows for (symbol, interval), keeping only the newest max_rows."""
+        data = np.ascontiguousarray(data[-self.max_rows:], dtype=np.float64)
+        path = self._path(symbol, interval)
+        tmp_path = path.with_suffix(".tmp.npy")
+        try:
+            np.save(tmp_path, data, allow_pickle=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.error("Error writing kline cache for %s %s: %s", symbol, interval, e)
+        self._remember((symbol.upper(), interval), data)
+        self._evict_files()
+
+    def _remember(self, key: tuple, data: np.ndarray):
+        with self._lock:
+            self._memory[key] = data
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_memory_entries:
+                self._memory.popitem(last=False)
+
+    def _evict_files(self):
+        files = list(self.cache_dir.glob("*.npy"))
+        if len(files) <= self.max_entries:
+            return
+        files.sort(key=lambda p: p.stat().st_mtime)
+        for path in files[:len(files) - self.max_entries]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+def parse_klines(raw_data: list) -> np.ndarray:
+    """
+    Converts a Binance klines response into an (n, 2) array of [open_time_ms, close].
+
+    Parses the whole response in one vectorized pass, and falls back to
+    row-by-row parsing (skipping malformed rows) only if that fails.
+    """
+    if not raw_data:
+        return np.empty((0, 2))
+    try:
+        table = np.array(raw_data, dtype=object)
+        if table.ndim == 2 and table.shape[1] >= 5:
+            return table[:, [0, 4]].astype(np.float64)
+    except (ValueError, TypeError):
+        pass
+    rows = []
+    for kline in raw_data:
+        if isinstance(kline, list) and len(kline) >= 5:
+            try:
+                rows.append((float(kline[0]), float(kline[4])))
+            except (ValueError, TypeError) as e:
+                logger.warning("Skipping malformed kline item: %s, error: %s", kline, e)
+    return np.array(rows, dtype=np.float64).reshape(-1, 2)
+
+def merge_klines(cached: np.ndarray, fresh: np.ndarray) -> np.ndarray:
+    """Appends fresh candles to cached ones, replacing any overlapping (still open) candles."""
+    if not len(fresh):
+        return cached
+    if not len(cached):
+        return fresh
+    keep = cached[cached[:, 0] < fresh[0, 0]]
+    return np.concatenate([keep, fresh])
@@ -0,0 +1,584 @@
+# QCryptoWidget/src/widget/api/providers.py
+"""
+Interchangeable quote sources and a router that hedges and fails over between them.
+
+Every provider returns the same shape as get_current_prices:
+{coin: {price, percent_change_24h, percent_change_7d, slug}}. Fields a
+source doesn't know are left out, so merging quotes from several sources
+never replaces a known value with a made-up one.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from widget.api.binance_symbols import (BINANCE_API_ROOT, RETRY_SECONDS, BinanceSymbolIndex, Route,
+                                        get_symbol_index_path)
+from widget.api.coin_api import create_session, get_client
+from widget.api.resilience import RETRIES, RETRY_ATTEMPTS, CircuitBreaker, backoff_delay
+from widget.api.symbol_index import SymbolIndex, get_symbol_index
+from widget.diagnostics.metrics import (FETCH_SECONDS, HTTP_ERRORS, HTTP_SECONDS, PARSE_SECONDS,
+                                        PROVIDER_FAILURES, PROVIDER_SECONDS)
+
+logger = logging.getLogger(__name__)
+
+# ticker setting -> Binance endpoint; both accept symbols=[...]
+BINANCE_TICKER_PATHS = {"24hr": "ticker/24hr", "price": "ticker/price"}
+# Symbols per ticker request. Request weight is flat above 100 symbols, so
+# bigger chunks are cheaper; this keeps the query string near 4 KB
+BINANCE_CHUNK_SIZE = 200
+# Binance error code for an unknown or delisted symbol
+INVALID_SYMBOL = -1121
+# A symbol Binance rejected is left out of requests this long; by then the
+# symbol index may be downloaded again and no longer lists it
+REJECTED_SYMBOL_SECONDS = RETRY_SECONDS
+
+# Hedge after this fraction of the primary's recent calls would have finished
+DEFAULT_HEDGE_PERCENTILE = 0.9
+# Bounds for the hedge delay; the maximum also applies until enough samples exist
+MIN_HEDGE_DELAY = 0.2
+MAX_HEDGE_DELAY = 3.0
+# Latency samples kept per provider
+LATENCY_WINDOW = 50
+# A provider that failed is tried last for this many seconds
+FAILURE_COOLDOWN = 60
+
+
+def normalize_quote(price: float, percent_change_24h: Optional[float] = None,
+                    percent_change_7d: Optional[float] = None, slug: Optional[str] = None) -> Dict:
+    """Builds a quote in the widget's standard shape, leaving out unknown (None or empty) fields."""
+    quote = {'price': float(price)}
+    if percent_change_24h is not None:
+        quote['percent_change_24h'] = float(percent_change_24h)
+    if percent_change_7d is not None:
+        quote['percent_change_7d'] = float(percent_change_7d)
+    if slug:
+        quote['slug'] = slug
+    return quote
+
+
+class PriceProvider:
+    """
+    A source of current quotes.
+
+    Subclasses implement get_prices(), returning quotes for the coins they
+    know, or None when the request as a whole failed.
+    """
+    name = "provider"
+    # True for sources that spend CoinMarketCap credits
+    costs_credits = False
+
+    def get_prices(self, coins: List[str]) -> Optional[Dict[str, Dict]]:
+        raise NotImplementedError
+
+    def close(self):
+        """Releases network resources, if any."""
+
+
+class CmcProvider(PriceProvider):
+    """
+    CoinMarketCap quotes/latest through the shared CoinApiClient (costs credits).
+
+    With a symbol index, known coins are requested by id; the rest by symbol.
+    """
+    name = "cmc"
+    costs_credits = True
+
+    def __init__(self, api_key: str, index: Optional[SymbolIndex] = None):
+        self.client = get_client(api_key)
+        self.index = index
+
+    def get_prices(self, coins: List[str]) -> Optional[Dict[str, Dict]]:
+        ids = self.index.ids_for(coins) if self.index is not None else None
+        return self.client.get_current_prices(coins, ids)
+
+
+class BinanceTickerProvider(PriceProvider):
+    """
+    Binance's public tickers for the whole watchlist; free, but without 7d change or slugs.
+
+    All coins go into one request (per BINANCE_CHUNK_SIZE symbols) through the
+    `symbols=[...]` parameter. Coins without a pair in `quote_asset` are priced
+    through a bridge asset found in the cached exchangeInfo index.
+
+    Binance rejects a whole request if one of its symbols was delisted. The
+    chunk is then split until the rejected symbols are found; they are left
+    out for REJECTED_SYMBOL_SECONDS while the index is refreshed.
+
+    `ticker` selects the endpoint: "24hr" (the MINI 24h ticker: price and 24h
+    change) or "price" (ticker/price: price only, lower request weight).
+    """
+    name = "binance"
+
+    def __init__(self, api_root: str = BINANCE_API_ROOT, quote_asset: str = "USDT", ticker: str = "24hr",
+                 index: Optional[BinanceSymbolIndex] = None, chunk_size: int = BINANCE_CHUNK_SIZE,
+                 timeout: float = 10):
+        if ticker not in BINANCE_TICKER_PATHS:
+            raise ValueError(f"Unknown Binance ticker: {ticker}")
+        self.api_root = api_root.rstrip('/')
+        self.quote_asset = quote_asset.upper()
+        self.ticker = ticker
+        self.index = index or BinanceSymbolIndex(api_root=api_root, quote_asset=quote_asset)
+        self.chunk_size = max(1, chunk_size)
+        self.timeout = timeout
+        self._session = None
+        self._lock = threading.Lock()
+        # symbol -> when Binance rejected it
+        self._rejected: Dict[str, float] = {}
+
+    @property
+    def session(self):
+        with self._lock:
+            if self._session is None:
+                self._session = create_session()
+            return self._session
+
+    def get_prices(self, coins: List[str]) -> Optional[Dict[str, Dict]]:
+        if not coins:
+            return {}
+        now = time.time()
+        routes = self.index.routes(coins, self.session, now)
+        symbols = {symbol for route in routes.values() for symbol in route if symbol}
+        if not symbols:
+            return {coin: normalize_quote(1.0, 0, 0) for coin in routes}
+        symbols = sorted(symbols - self._rejected_symbols(now))
+        if not symbols:
+            return combine_routes(routes, {})
+
+        tickers = {}
+        chunks = [symbols[i:i + self.chunk_size] for i in range(0, len(symbols), self.chunk_size)]
+        failures = 0
+        for chunk in chunks:
+            chunk_tickers = self._fetch_chunk(chunk, now)
+            if chunk_tickers is None:
+                failures += 1
+            else:
+                tickers.update(chunk_tickers)
+        if failures == len(chunks):
+            return None
+        return combine_routes(routes, tickers)
+
+    def _rejected_symbols(self, now: float) -> Set[str]:
+        with self._lock:
+            for symbol, rejected_at in list(self._rejected.items()):
+                if now - rejected_at >= REJECTED_SYMBOL_SECONDS:
+                    del self._rejected[symbol]
+            return set(self._rejected)
+
+    def _fetch_chunk(self, symbols: List[str], now: float) -> Optional[Dict[str, Tuple[float, Optional[float]]]]:
+        # Tickers for the symbols Binance accepts; None if the request failed
+        try:
+            return self._request_tickers(symbols)
+        except _SymbolRejected:
+            pass
+        # A pair was delisted since the index was built; the whole request is rejected
+        self.index.invalidate()
+        if len(symbols) == 1:
+            logger.warning("Binance rejected %s; leaving it out until the symbol list is refreshed.", symbols[0])
+            with self._lock:
+                self._rejected[symbols[0]] = now
+            return {}
+        middle = len(symbols) // 2
+        halves = [self._fetch_chunk(symbols[:middle], now), self._fetch_chunk(symbols[middle:], now)]
+        if halves[0] is None and halves[1] is None:
+            return None
+        return {**(halves[0] or {}), **(halves[1] or {})}
+
+    def _request_tickers(self, symbols: List[str]) -> Optional[Dict[str, Tuple[float, Optional[float]]]]:
+        import requests
+
+        params = {'symbols': json.dumps(symbols, separators=(',', ':'))}
+        if self.ticker == "24hr":
+            params['type'] = 'MINI'
+        endpoint = f"binance_ticker_{self.ticker}"
+        start = time.perf_counter()
+        try:
+            response = self.session.get(f"{self.api_root}/{BINANCE_TICKER_PATHS[self.ticker]}",
+                                        params=params, timeout=self.timeout)
+            HTTP_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+            if response.status_code == 400 and _binance_error_code(response) == INVALID_SYMBOL:
+                raise _SymbolRejected()
+            response.raise_for_status()
+            with PARSE_SECONDS.time(kind="binance_tickers"):
+                tickers = response.json()
+                if isinstance(tickers, list):
+                    return parse_binance_tickers(tickers)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            HTTP_ERRORS.inc(endpoint=endpoint)
+            logger.error("Binance ticker request failed: %s", e)
+            return None
+        logger.error("Unexpected data format from Binance ticker: %s", tickers)
+        return None
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+class _SymbolRejected(Exception):
+    """Binance answered a ticker request with INVALID_SYMBOL."""
+
+
+def _binance_error_code(response) -> Optional[int]:
+    try:
+        return response.json().get('code')
+    except (ValueError, AttributeError):
+        return None
+
+
+def parse_binance_tickers(tickers: List[Dict]) -> Dict[str, Tuple[float, Optional[float]]]:
+    """
+    Reads Binance ticker entries (full or MINI 24hr, or ticker/price).
+
+    Args:
+        tickers (List[Dict]): The decoded response.
+
+    Returns:
+        Dict[str, Tuple[float, Optional[float]]]: Symbol -> (last price, 24h change in percent;
+            None if unknown).
+    """
+    results = {}
+    for ticker in tickers:
+        symbol = ticker.get('symbol')
+        try:
+            if 'price' in ticker:
+                results[symbol] = (float(ticker['price']), None)
+                continue
+            price = float(ticker['lastPrice'])
+            if 'priceChangePercent' in ticker:
+                change = float(ticker['priceChangePercent'])
+            else:
+                open_price = float(ticker['openPrice'])
+                change = (price / open_price - 1) * 100 if open_price else 0.0
+            results[symbol] = (price, change)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning("Skipping malformed Binance ticker for %s: %s", symbol, e)
+    return results
+
+
+def combine_routes(routes: Dict[str, Route], tickers: Dict[str, Tuple[float, Optional[float]]]) -> Dict[str, Dict]:
+    """
+    Prices coins from their pair tickers, multiplying through bridge pairs.
+
+    A bridged coin's 24h change compounds both legs: (1 + a)(1 + b) - 1.
+    """
+    results = {}
+    for coin, route in routes.items():
+        if not route.symbol:
+            # The quote asset itself
+            results[coin] = normalize_quote(1.0, 0, 0)
+            continue
+        quote = tickers.get(route.symbol)
+        if quote is None:
+            continue
+        price, change = quote
+        if route.bridge:
+            bridge = tickers.get(route.bridge)
+            if bridge is None:
+                continue
+            price *= bridge[0]
+            if change is not None and bridge[1] is not None:
+                change = ((1 + change / 100) * (1 + bridge[1] / 100) - 1) * 100
+            else:
+                change = None
+        results[coin] = normalize_quote(price, change)
+    return results
+
+
+class ReplayProvider(PriceProvider):
+    """
+    Serves recorded quotes from a local file, for offline use, demos and tests.
+
+    The file is either one JSON object ({coin: quote}), served on every call,
+    or JSON lines with one such object per line, served in turn and looped.
+    """
+    name = "replay"
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._snapshots: Optional[List[Dict]] = None
+        self._position = 0
+        self._lock = threading.Lock()
+
+    def get_prices(self, coins: List[str]) -> Optional[Dict[str, Dict]]:
+        with self._lock:
+            if self._snapshots is None:
+                self._snapshots = self._load()
+            if not self._snapshots:
+                return None
+            snapshot = self._snapshots[self._position % len(self._snapshots)]
+            self._position += 1
+        results = {}
+        for coin in coins:
+            quote = snapshot.get(coin)
+            if isinstance(quote, dict) and 'price' in quote:
+                results[coin] = normalize_quote(quote['price'], quote.get('percent_change_24h'),
+                                                quote.get('percent_change_7d'), quote.get('slug'))
+        return results
+
+    def _load(self) -> List[Dict]:
+        try:
+            text = self.path.read_text(encoding="utf-8")
+        except OSError as e:
+            logger.error("Could not read replay file %s: %s", self.path, e)
+            return []
+        try:
+            data = json.loads(text)
+            return [data] if isinstance(data, dict) else []
+        except ValueError:
+            pass
+        snapshots = []
+        for number, line in enumerate(text.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                snapshot = json.loads(line)
+            except ValueError as e:
+                logger.warning("Skipping malformed replay line %d: %s", number, e)
+                continue
+            if isinstance(snapshot, dict):
+                snapshots.append(snapshot)
+        return snapshots
+
+
+def append_replay_snapshot(path: Path, price_data: Dict[str, Dict]):
+    """Appends one snapshot to a JSON-lines replay file."""
+    with open(path, 'a', encoding="utf-8") as f:
+        f.write(json.dumps(price_data, separators=(',', ':')) + "\n")
+
+
+class ProviderStats:
+    """Recent latency and failure history for one provider."""
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.successes = 0
+        self.failures = 0
+        self.last_failure = 0.0
+
+    def record(self, seconds: float, ok: bool, now: float):
+        if ok:
+            self.latencies.append(seconds)
+            self.successes += 1
+        else:
+            self.failures += 1
+            self.last_failure = now
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Returns the given latency percentile (0-1), or None without samples."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def healthy(self, now: float, cooldown: float = FAILURE_COOLDOWN) -> bool:
+        return now - self.last_failure >= cooldown
+
+
+class ProviderRouter:
+    """
+    Fetches quotes from the best of several providers.
+
+    Healthy providers are tried fastest first (by median latency; ties keep
+    the configured order). If the first hasn't answered by its
+    `hedge_percentile` latency, the next one is started as a hedge and the
+    first usable answer wins. Errors fail over immediately. Coins the
+    winning provider doesn't know are requested from the remaining ones.
+
+    Each provider has a CircuitBreaker: one that keeps failing is skipped
+    until its pause is over, so an outage costs no timeouts. When every
+    provider failed, the whole fetch is retried up to `attempts` times with
+    jittered exponential backoff, unless all breakers are open.
+    """
+
+    def __init__(self, providers: List[PriceProvider], hedge_percentile: float = DEFAULT_HEDGE_PERCENTILE,
+                 min_hedge_delay: float = MIN_HEDGE_DELAY, max_hedge_delay: float = MAX_HEDGE_DELAY,
+                 failure_cooldown: float = FAILURE_COOLDOWN, attempts: int = RETRY_ATTEMPTS,
+                 sleep: Callable[[float], None] = time.sleep):
+        if not providers:
+            raise ValueError("ProviderRouter needs at least one provider")
+        self.providers = list(providers)
+        self.hedge_percentile = hedge_percentile
+        self.min_hedge_delay = min_hedge_delay
+        self.max_hedge_delay = max_hedge_delay
+        self.failure_cooldown = failure_cooldown
+        self.attempts = max(1, attempts)
+        self.sleep = sleep
+        self.stats: Dict[str, ProviderStats] = {provider.name: ProviderStats() for provider in self.providers}
+        self.breakers: Dict[str, CircuitBreaker] = {provider.name: CircuitBreaker(provider.name)
+                                                    for provider in self.providers}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=2 * len(self.providers), thread_name_prefix="provider")
+
+    @property
+    def costs_credits(self) -> bool:
+        """Whether any provider spends CoinMarketCap credits (so refreshes follow the budget)."""
+        return any(provider.costs_credits for provider in self.providers)
+
+    def ranked(self, now: Optional[float] = None) -> List[PriceProvider]:
+        """Returns the providers in the order they will be tried."""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            def key(item):
+                position, provider = item
+                stats = self.stats[provider.name]
+                median = stats.percentile(0.5)
+                return (not stats.healthy(now, self.failure_cooldown),
+                        median if median is not None else float('inf'), position)
+            return [provider for _, provider in sorted(enumerate(self.providers), key=key)]
+
+    def hedge_delay(self, provider: PriceProvider) -> float:
+        """Seconds to wait for `provider` before starting a hedged request."""
+        with self._lock:
+            stats = self.stats[provider.name]
+            delay = stats.percentile(self.hedge_percentile) if len(stats.latencies) >= 5 else None
+        if delay is None:
+            return self.max_hedge_delay
+        return min(max(delay, self.min_hedge_delay), self.max_hedge_delay)
+
+    def get_prices(self, coins: List[str]) -> Optional[Dict[str, Dict]]:
+        """
+        Returns quotes for the coins, or None if every provider failed (or is paused).
+        """
+        if not coins:
+            return {}
+        with FETCH_SECONDS.time():
+            for attempt in range(self.attempts):
+                if attempt:
+                    if self.retry_in() > 0:
+                        break  # Every breaker is open: fail fast
+                    RETRIES.inc()
+                    self.sleep(backoff_delay(attempt - 1))
+                quotes = self._get_prices(coins)
+                if quotes is not None:
+                    return quotes
+            return None
+
+    def retry_in(self, now: Optional[float] = None) -> float:
+        """Seconds until some provider's breaker lets calls through again (0 if one does now)."""
+        return min(breaker.retry_in(now) for breaker in self.breakers.values())
+
+    def _get_prices(self, coins: List[str]) -> Optional[Dict[str, Dict]]:
+        order = self.ranked()
+        results = self._race(order, coins)
+        if results is None:
+            return None
+        winner, quotes = results
+        missing = [coin for coin in coins if coin not in quotes]
+        now = time.time()
+        for provider in order:
+            if not missing:
+                break
+            if provider is winner or not self.stats[provider.name].healthy(now, self.failure_cooldown):
+                continue
+            if not self.breakers[provider.name].allow():
+                continue
+            extra = self._call(provider, missing)
+            if extra:
+                quotes.update(extra)
+                missing = [coin for coin in missing if coin not in extra]
+        return quotes
+
+    def latency_report(self) -> Dict[str, Dict]:
+        """Per-provider p50/p90 latency (seconds) and success/failure counts."""
+        with self._lock:
+            return {
+                name: {'p50': stats.percentile(0.5), 'p90': stats.percentile(0.9),
+                       'successes': stats.successes, 'failures': stats.failures}
+                for name, stats in self.stats.items()
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        for provider in self.providers:
+            provider.close()
+
+    def _race(self, order: List[PriceProvider], coins: List[str]):
+        # Returns (provider, quotes) from the first provider with quotes for any of the coins
+        pending: Dict[Future, PriceProvider] = {}
+        remaining = list(order)
+        empty = None
+
+        def start_next():
+            # Providers whose breaker is open are skipped without a request
+            while remaining:
+                provider = remaining.pop(0)
+                if self.breakers[provider.name].allow():
+                    pending[self._executor.submit(self._call, provider, coins)] = provider
+                    return provider
+            return None
+
+        newest = start_next()
+        while pending:
+            timeout = self.hedge_delay(newest) if remaining else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                newest = start_next() or newest  # Too slow: hedge with the next provider
+                continue
+            for future in done:
+                provider = pending.pop(future)
+                quotes = future.result()
+                if quotes:
+                    return provider, quotes
+                if quotes is not None and empty is None:
+                    empty = (provider, quotes)
+            if remaining and not pending:
+                newest = start_next()  # Failed: fail over at once
+        return empty
+
+    def _call(self, provider: PriceProvider, coins: List[str]) -> Optional[Dict[str, Dict]]:
+        start = time.perf_counter()
+        try:
+            quotes = provider.get_prices(coins)
+        except Exception as e:
+            logger.error("Price provider %s failed: %s", provider.name, e)
+            quotes = None
+        elapsed = time.perf_counter() - start
+        PROVIDER_SECONDS.observe(elapsed, provider=provider.name)
+        if quotes is None:
+            PROVIDER_FAILURES.inc(provider=provider.name)
+        with self._lock:
+            self.stats[provider.name].record(elapsed, quotes is not None, time.time())
+        if quotes is None:
+            self.breakers[provider.name].record_failure()
+        else:
+            self.breakers[provider.name].record_success()
+        return quotes
+
+
+def build_providers(config: Dict) -> List[PriceProvider]:
+    """Creates the providers named in config['price_providers'], in order."""
+    providers = []
+    for name in config.get('price_providers', ['cmc']):
+        if name == 'cmc':
+            providers.append(CmcProvider(config['api_key'], get_symbol_index(config['root_path'])))
+        elif name == 'binance':
+            index = BinanceSymbolIndex(get_symbol_index_path(config['root_path']))
+            providers.append(BinanceTickerProvider(ticker=config.get('binance_ticker', "24hr"), index=index))
+        elif name == 'replay':
+            if config.get('replay_file'):
+                providers.append(ReplayProvider(config['replay_file']))
+            else:
+                logger.warning("Ignoring the replay provider: PRICE_REPLAY_FILE is not set.")
+        else:
+            logger.warning("Ignoring unknown price provider: %s", name)
+    if not providers:
+        # Nothing usable configured: CoinMarketCap if there is a key, otherwise the free Binance tickers
+        if config.get('api_key'):
+            providers.append(CmcProvider(config['api_key'], get_symbol_index(config['root_path'])))
+        else:
+            providers.append(BinanceTickerProvider(index=BinanceSymbolIndex(get_symbol_index_path(config['root_path']))))
+    return providers
+
+
+def build_router(config: Dict) -> ProviderRouter:
+    """Creates a ProviderRouter over the configured providers."""
+    return ProviderRouter(build_providers(config))
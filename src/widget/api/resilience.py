@@ -0,0 +1,179 @@
+# QCryptoWidget/src/widget/api/resilience.py
+"""
+Retry backoff, circuit breaking and staleness helpers for the quote path.
+
+A fetch that fails is retried a few times with jittered exponential
+backoff. A source that keeps failing trips its CircuitBreaker: further
+calls fail at once instead of each waiting for a timeout, and after a
+pause a single probe call decides whether it is back. Meanwhile the last
+good quotes keep being shown; every quote carries the time it was
+fetched ('fetched_at'), so views and alarm sinks can tell how old it is.
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from widget.diagnostics.metrics import counter
+
+logger = logging.getLogger(__name__)
+
+# Attempts per fetch (the first call included) and the backoff between them
+RETRY_ATTEMPTS = 3
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 4.0
+
+# Consecutive failures that open a breaker, and how long it stays open at first;
+# each failed probe doubles the pause, up to the maximum
+FAILURE_THRESHOLD = 3
+OPEN_SECONDS = 30.0
+MAX_OPEN_SECONDS = 600.0
+
+# Field every served quote carries: UNIX time it was fetched from a source
+FETCHED_AT = 'fetched_at'
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+RETRIES = counter("fetch_retries_total", "Quote fetches retried after a failure.")
+BREAKER_OPENED = counter("circuit_breaker_opened_total", "Times a circuit breaker opened, by source.")
+STALE_SERVED = counter("stale_quotes_served_total", "Refreshes that failed and kept showing the last good quotes.")
+BREAKER_REJECTED = counter("circuit_breaker_rejected_total", "Calls skipped because a breaker was open, by source.")
+
+def backoff_delay(attempt: int, base: float = RETRY_BASE_DELAY, cap: float = RETRY_MAX_DELAY,
+                  rng: Callable[[], float] = random.random) -> float:
+    """
+    Returns the wait before retry number `attempt` (0 for the first retry).
+
+    Uses "full jitter": a uniform draw between 0 and min(cap, base * 2**attempt),
+    so clients that failed together don't retry together.
+    """
+    return rng() * min(cap, base * (2 ** attempt))
+
+class CircuitBreaker:
+    """
+    Tracks one source's consecutive failures and stops calls to it while it is down.
+
+    closed     calls pass; `failure_threshold` failures in a row open the breaker
+    open       calls are rejected until `open_seconds` have passed
+    half_open  one probe call passes; success closes the breaker, failure
+               re-opens it for twice as long (at most `max_open_seconds`)
+
+    Thread-safe.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = FAILURE_THRESHOLD,
+                 open_seconds: float = OPEN_SECONDS, max_open_seconds: float = MAX_OPEN_SECONDS):
+        """
+        Args:
+            name (str): The source, for logs and metrics (e.g. a provider name).
+            failure_threshold (int): Consecutive failures that open the breaker.
+            open_seconds (float): Pause after the breaker first opens.
+            max_open_seconds (float): Upper bound for the doubled pause.
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max(open_seconds, max_open_seconds)
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._pause = open_seconds
+        self._opened_at = 0.0
+        self._probing = False
+
+    def state(self, now: Optional[float] = None) -> str:
+        """Returns CLOSED, OPEN or HALF_OPEN (an open breaker whose pause is over is half open)."""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            if self._state == OPEN and now - self._opened_at >= self._pause:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        """
+        Whether a call may go ahead now. In the half-open state only the first
+        caller gets through; it must report back with record_success/record_failure.
+        """
+        if now is None:
+            now = time.time()
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and now - self._opened_at >= self._pause:
+                self._state = HALF_OPEN
+                self._probing = False
+            if self._state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+        BREAKER_REJECTED.inc(source=self.name)
+        return False
+
+    def retry_in(self, now: Optional[float] = None) -> float:
+        """Seconds until the breaker lets a call through again (0 if it does now)."""
+        if now is None:
+            now = time.time()
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self._pause - now)
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("%s is reachable again.", self.name)
+            self._state = CLOSED
+            self._failures = 0
+            self._pause = self.open_seconds
+            self._probing = False
+
+    def record_failure(self, now: Optional[float] = None):
+        if now is None:
+            now = time.time()
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN:
+                # The probe failed: stay away for longer this time
+                self._pause = min(self._pause * 2, self.max_open_seconds)
+            elif self._state == OPEN or self._failures < self.failure_threshold:
+                return
+            self._state = OPEN
+            self._opened_at = now
+            self._probing = False
+            failures, pause = self._failures, self._pause
+        BREAKER_OPENED.inc(source=self.name)
+        logger.warning("%s failed %d times in a row; pausing calls for %.0f s.", self.name, failures, pause)
+
+def stamp_quotes(quotes: Dict[str, Dict], fetched_at: float) -> Dict[str, Dict]:
+    """Sets 'fetched_at' on every quote (in place) and returns the dictionary."""
+    for quote in quotes.values():
+        quote[FETCHED_AT] = fetched_at
+    return quotes
+
+def oldest_quote_time(price_data: Dict[str, Dict], coins: Optional[List[str]] = None) -> Optional[float]:
+    """
+    Returns when the oldest of the quotes was fetched, or None if none is stamped.
+
+    Args:
+        price_data (Dict[str, Dict]): Quotes keyed by coin code.
+        coins (List[str], optional): Only consider these coins.
+    """
+    times = [quote.get(FETCHED_AT) for coin, quote in price_data.items()
+             if coins is None or coin in coins]
+    times = [t for t in times if t]
+    return min(times) if times else None
+
+def format_age(seconds: float) -> str:
+    """Formats an age for people: '45 s', '12 min', '3 h 5 min'."""
+    seconds = max(0, int(seconds))
+    if seconds < 60:
+        return f"{seconds} s"
+    minutes = seconds // 60
+    if minutes < 60:
+        return f"{minutes} min"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours} h {minutes} min" if minutes else f"{hours} h"
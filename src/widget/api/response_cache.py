@@ -0,0 +1,205 @@
+# QCryptoWidget/src/widget/api/response_cache.py
+
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from widget.api.resilience import FETCHED_AT
+from widget.data.persistence import atomic_write_json
+
+logger = logging.getLogger(__name__)
+
+QUOTE_CACHE_FILE = "quote_cache.json"
+
+# Entries older than this are dropped whenever the cache is rewritten
+MAX_ENTRY_AGE = 24 * 60 * 60
+
+def get_quote_cache_path(cache_dir: Path) -> Path:
+    """Returns the full path to the shared quote cache file."""
+    return cache_dir / QUOTE_CACHE_FILE
+
+class FileLock:
+    """
+    An exclusive inter-process lock on a side file (`<path>.lock`).
+
+    Uses fcntl on POSIX and msvcrt on Windows, so every local widget, daemon
+    or thread that opens the same path serializes on it.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(f"{path}.lock")
+        self._fd = None
+
+    def acquire(self, blocking: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        Takes the lock.
+
+        Args:
+            blocking (bool): Wait for the lock if another holder has it.
+            timeout (float, optional): Maximum seconds to wait when blocking.
+
+        Returns:
+            bool: True if the lock was acquired.
+        """
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._try_lock(fd):
+                self._fd = fd
+                return True
+            if not blocking or (deadline is not None and time.monotonic() >= deadline):
+                os.close(fd)
+                return False
+            time.sleep(0.05)
+
+    def release(self):
+        """Releases the lock if held."""
+        fd, self._fd = self._fd, None
+        if fd is None:
+            return
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _try_lock(fd: int) -> bool:
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                os.lseek(fd, 0, os.SEEK_SET)
+                msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except OSError:
+            return False
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+class SharedQuoteCache:
+    """
+    TTL'd quote cache on disk, shared by every local instance.
+
+    Quotes are cached per coin and served with the time they were fetched
+    ('fetched_at'). A read that finds every coin fresh never touches the
+    API. Otherwise one process takes the file lock and fetches only the
+    stale or missing coins; concurrent callers serve stale values if they
+    have them, or wait for the refresh to land.
+
+    A coin the fetch didn't return (unknown to the provider, or delisted)
+    is remembered as checked for one TTL, so it isn't requested on every
+    call; a quote it had before is still served, as the last good one.
+    """
+
+    def __init__(self, path: Path, ttl: float = 60, wait_timeout: float = 15):
+        """
+        Args:
+            path (Path): The cache file; its directory must exist.
+            ttl (float): Seconds a cached quote counts as fresh.
+            wait_timeout (float): Maximum seconds to wait for another process's refresh.
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self.lock = FileLock(self.path)
+
+    def peek(self, coins: List[str]) -> Dict[str, Dict]:
+        """Returns whatever is cached for the coins, regardless of age (the last good quotes)."""
+        return self._select(coins, self._read())
+
+    def get_prices(self, coins: List[str], fetch_fn: Callable[[List[str]], Optional[Dict]]) -> Optional[Dict]:
+        """
+        Returns quotes for the coins, fetching only what is not fresh in the cache.
+
+        Args:
+            coins (List[str]): The coin codes wanted.
+            fetch_fn (Callable): Fetches quotes for a list of coins; returns None on failure.
+
+        Returns:
+            Optional[Dict]: Coin code -> quote, or None if a needed fetch failed
+                and no cached value could stand in.
+        """
+        entries = self._read()
+        missing = self._stale(coins, entries, time.time())
+        if not missing:
+            return self._select(coins, entries)
+
+        if not self.lock.acquire(blocking=False):
+            # Another process is refreshing; serve stale values if we have them all
+            if all(coin in entries for coin in missing):
+                return self._select(coins, entries)
+            if not self.lock.acquire(timeout=self.wait_timeout):
+                return None
+        try:
+            entries = self._read()  # The other holder may have refreshed what we need
+            missing = self._stale(coins, entries, time.time())
+            if missing:
+                fetched = fetch_fn(missing)
+                if fetched is None:
+                    return None
+                now = time.time()
+                for coin, data in fetched.items():
+                    entries[coin] = {'t': now, 'd': data}
+                for coin in missing:
+                    if coin in fetched:
+                        continue
+                    if coin in entries:
+                        entries[coin]['m'] = now  # Missed at; 'd' keeps the last good quote
+                    else:
+                        entries[coin] = {'t': now, 'd': None}
+                self._write(entries, now)
+            return self._select(coins, entries)
+        finally:
+            self.lock.release()
+
+    def _stale(self, coins: List[str], entries: Dict, now: float) -> List[str]:
+        # A coin counts as fresh for one TTL after it was last fetched or found missing
+        return [coin for coin in coins
+                if coin not in entries or now - max(entries[coin]['t'], entries[coin].get('m', 0)) >= self.ttl]
+
+    @staticmethod
+    def _select(coins: List[str], entries: Dict) -> Dict[str, Dict]:
+        return {coin: dict(entries[coin]['d'], **{FETCHED_AT: entries[coin]['t']})
+                for coin in coins if coin in entries and entries[coin]['d'] is not None}
+
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if not isinstance(entries, dict):
+            return {}
+        # Malformed entries (another version, a hand edit) are treated as missing
+        return {coin: entry for coin, entry in entries.items() if _valid_entry(entry)}
+
+    def _write(self, entries: Dict[str, Dict], now: float):
+        entries = {coin: entry for coin, entry in entries.items() if now - entry['t'] < MAX_ENTRY_AGE}
+        try:
+            atomic_write_json(self.path, entries, indent=None)
+        except OSError as e:
+            logger.error("Error writing quote cache: %s", e)
+
+def _valid_entry(entry) -> bool:
+    # 'd' is the quote, or None for a coin the provider didn't return
+    if not (isinstance(entry, dict) and isinstance(entry.get('t'), (int, float))
+            and isinstance(entry.get('m', 0), (int, float))):
+        return False
+    data = entry.get('d')
+    return data is None or (isinstance(data, dict) and isinstance(data.get('price'), (int, float)))
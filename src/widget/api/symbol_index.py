@@ -0,0 +1,287 @@
+# QCryptoWidget/src/widget/api/symbol_index.py
+"""
+A local copy of CoinMarketCap's /cryptocurrency/map.
+
+It lets the widget validate and autocomplete coin codes offline, and request
+quotes by numeric id (smaller, unambiguous responses) instead of by symbol.
+The map is stored column-wise (one JSON array per field), which loads several
+times faster than a list of objects, and is refreshed in the background when
+it is older than the TTL.
+
+Several assets can share a symbol. Unless the user picked one explicitly
+(a "pin", kept in coin_ids.json), a symbol means its best-ranked asset.
+"""
+
+import logging
+import re
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional
+
+from widget.data.persistence import atomic_write_json, read_json
+
+if TYPE_CHECKING:
+    from widget.api.coin_api import CoinApiClient
+
+logger = logging.getLogger(__name__)
+
+SYMBOL_INDEX_FILE = "cmc_map.json"
+COIN_IDS_FILE = "coin_ids.json"
+
+# Listings change slowly; a refresh costs about one credit per 5000 assets
+SYMBOL_INDEX_TTL = 7 * 24 * 3600
+# After a failed refresh, wait this long before trying again
+RETRY_SECONDS = 3600
+
+# Accepted without an index: letters and digits (e.g. 1INCH, W, XAUT), at most 15 characters
+COIN_CODE_PATTERN = re.compile(r"^[A-Z0-9]{1,15}$")
+
+_COLUMNS = ('ids', 'symbols', 'names', 'slugs', 'ranks')
+
+def get_symbol_index_path(root_path: Path) -> Path:
+    """Returns the full path to the cached CoinMarketCap map."""
+    return root_path / SYMBOL_INDEX_FILE
+
+def get_coin_ids_path(root_path: Path) -> Path:
+    """Returns the full path to the user's code -> CMC id choices."""
+    return root_path / COIN_IDS_FILE
+
+def is_valid_code(code: str) -> bool:
+    """Whether a coin code is well-formed (it may still be unknown)."""
+    return bool(COIN_CODE_PATTERN.match(code))
+
+class CoinInfo(NamedTuple):
+    id: int
+    symbol: str
+    name: str
+    slug: str
+    rank: int
+
+    def label(self) -> str:
+        """The text shown in the add dialog, e.g. 'UNI — Uniswap [7083]'."""
+        return f"{self.symbol} — {self.name} [{self.id}]"
+
+_LABEL_PATTERN = re.compile(r"^\s*([A-Za-z0-9]+)(?:\s+—\s+.*\[(\d+)\])?\s*$")
+
+def parse_label(text: str):
+    """
+    Splits add-dialog input into (code, id).
+
+    Returns:
+        Tuple[Optional[str], Optional[int]]: The upper-cased code and the id if the
+            text is a completion label; (None, None) if the text isn't a code at all.
+    """
+    match = _LABEL_PATTERN.match(text)
+    if not match:
+        return None, None
+    return match.group(1).upper(), int(match.group(2)) if match.group(2) else None
+
+class SymbolIndex:
+    """
+    CoinMarketCap assets by symbol and id, loaded lazily from disk. Thread-safe.
+    """
+
+    def __init__(self, path: Path, pins_path: Optional[Path] = None, ttl: float = SYMBOL_INDEX_TTL):
+        """
+        Args:
+            path (Path): Where the map is cached (cmc_map.json).
+            pins_path (Path, optional): Where explicit code -> id choices are kept (coin_ids.json).
+            ttl (float): Seconds after which refresh_in_background() downloads the map again.
+        """
+        self.path = path
+        self.pins_path = pins_path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._fetched = 0.0
+        self._attempted = 0.0
+        self._by_id: Dict[int, CoinInfo] = {}
+        # symbol -> assets sharing it, best rank first
+        self._by_symbol: Dict[str, List[CoinInfo]] = {}
+        self._pins: Dict[str, int] = {}
+        self._completions: Optional[List[str]] = None
+        self._refreshing = False
+
+    @property
+    def available(self) -> bool:
+        """Whether a map has been loaded (validation is only possible with one)."""
+        self._ensure_loaded()
+        return bool(self._by_id)
+
+    def candidates(self, code: str) -> List[CoinInfo]:
+        """Returns every asset with this symbol, best rank first."""
+        self._ensure_loaded()
+        return list(self._by_symbol.get(code.upper(), ()))
+
+    def resolve(self, code: str) -> Optional[CoinInfo]:
+        """Returns the asset a code stands for: the pinned one, else the best-ranked."""
+        self._ensure_loaded()
+        code = code.upper()
+        pinned = self._pins.get(code)
+        if pinned is not None and pinned in self._by_id:
+            return self._by_id[pinned]
+        matches = self._by_symbol.get(code)
+        return matches[0] if matches else None
+
+    def ids_for(self, codes: List[str]) -> Dict[str, int]:
+        """Maps the codes the index knows to CMC ids; unknown codes are left out."""
+        self._ensure_loaded()
+        ids = {}
+        for code in codes:
+            pinned = self._pins.get(code)
+            if pinned is not None:
+                ids[code] = pinned
+                continue
+            matches = self._by_symbol.get(code)
+            if matches:
+                ids[code] = matches[0].id
+        return ids
+
+    def completions(self) -> List[str]:
+        """Returns one label per asset for autocompletion, best rank first."""
+        self._ensure_loaded()
+        with self._lock:
+            if self._completions is None:
+                ranked = sorted(self._by_id.values(), key=lambda info: info.rank)
+                self._completions = [info.label() for info in ranked]
+            return self._completions
+
+    def pin(self, code: str, coin_id: Optional[int]):
+        """
+        Records which asset a code means (None forgets the choice) and saves the choices.
+
+        Only ambiguous codes need a pin; choosing the best-ranked asset removes it.
+        """
+        self._ensure_loaded()
+        code = code.upper()
+        with self._lock:
+            matches = self._by_symbol.get(code)
+            if coin_id is None or (matches and matches[0].id == coin_id):
+                changed = self._pins.pop(code, None) is not None
+            else:
+                changed = self._pins.get(code) != coin_id
+                self._pins[code] = coin_id
+            pins = dict(self._pins)
+        if changed and self.pins_path is not None:
+            try:
+                atomic_write_json(self.pins_path, pins)
+            except OSError as e:
+                logger.error("Error saving coin ids: %s", e)
+
+    def is_stale(self, now: Optional[float] = None) -> bool:
+        """Whether the map is missing or older than the TTL (and no attempt failed recently)."""
+        if now is None:
+            now = time.time()
+        self._ensure_loaded()
+        return now - self._fetched > self.ttl and now - self._attempted > RETRY_SECONDS
+
+    def refresh(self, client: "CoinApiClient", now: Optional[float] = None) -> bool:
+        """
+        Downloads the map and replaces the cached copy.
+
+        Returns:
+            bool: True on success; a failed download keeps the old map.
+        """
+        if now is None:
+            now = time.time()
+        self._attempted = now
+        entries = client.get_map()
+        if not entries:
+            return False
+        columns = build_columns(entries)
+        with self._lock:
+            self._set_columns(columns)
+            self._fetched = now
+        try:
+            atomic_write_json(self.path, {'fetched': now, **columns}, indent=None)
+        except OSError as e:
+            logger.error("Error saving the CoinMarketCap map: %s", e)
+        logger.info("CoinMarketCap map updated (%d assets).", len(entries))
+        return True
+
+    def refresh_in_background(self, client: "CoinApiClient") -> bool:
+        """
+        Starts a daemon thread that refreshes the map if it is stale (loading the
+        cached copy first, which is too slow for the GUI thread). Returns whether
+        one started; False while another is still running.
+        """
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+
+        def run():
+            try:
+                if self.is_stale():
+                    self.refresh(client)
+            finally:
+                self._refreshing = False
+        threading.Thread(target=run, name="cmc-map-refresh", daemon=True).start()
+        return True
+
+    def load_in_background(self):
+        """Loads the cached map and builds the completions on a daemon thread, ahead of first use."""
+        if not self._loaded:
+            threading.Thread(target=self.completions, name="cmc-map-load", daemon=True).start()
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            data = read_json(self.path, None, dict)
+            if data and all(isinstance(data.get(column), list) for column in _COLUMNS):
+                self._set_columns(data)
+                self._fetched = float(data.get('fetched', 0))
+            if self.pins_path is not None:
+                pins = read_json(self.pins_path, {}, dict)
+                self._pins = {str(code).upper(): int(coin_id) for code, coin_id in pins.items()
+                              if isinstance(coin_id, int)}
+            self._loaded = True
+
+    def _set_columns(self, columns: Dict[str, List]):
+        self._completions = None
+        by_id = {}
+        by_symbol: Dict[str, List[CoinInfo]] = {}
+        for coin_id, symbol, name, slug, rank in zip(*(columns[column] for column in _COLUMNS)):
+            info = CoinInfo(coin_id, symbol.upper(), name, slug, rank or 1_000_000_000)
+            by_id[coin_id] = info
+            by_symbol.setdefault(info.symbol, []).append(info)
+        for matches in by_symbol.values():
+            matches.sort(key=lambda info: info.rank)
+        self._by_id = by_id
+        self._by_symbol = by_symbol
+
+def build_columns(entries: List[Dict]) -> Dict[str, List]:
+    """
+    Converts /cryptocurrency/map entries to the column-wise cache format.
+
+    Args:
+        entries (List[Dict]): The `data` entries of one or more map responses.
+    """
+    columns = {column: [] for column in _COLUMNS}
+    for entry in entries:
+        try:
+            coin_id, symbol = int(entry['id']), str(entry['symbol'])
+        except (KeyError, TypeError, ValueError):
+            continue
+        columns['ids'].append(coin_id)
+        columns['symbols'].append(symbol)
+        columns['names'].append(str(entry.get('name', '')))
+        columns['slugs'].append(str(entry.get('slug', '')))
+        columns['ranks'].append(entry.get('rank'))
+    return columns
+
+_indexes: Dict[Path, SymbolIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_symbol_index(root_path: Path) -> SymbolIndex:
+    """Returns the process-wide SymbolIndex for a project root (shared by the UI and providers)."""
+    with _indexes_lock:
+        index = _indexes.get(root_path)
+        if index is None:
+            index = _indexes[root_path] = SymbolIndex(get_symbol_index_path(root_path),
+                                                      get_coin_ids_path(root_path))
+        return index
@@ -1,9 +1,14 @@
 # QCryptoWidget/src/widget/config/config.py
 
+import logging
 import os
-from dotenv import load_dotenv
 from pathlib import Path
 import sys
+from typing import Optional
+
+from widget.diagnostics.logs import get_log_path, program_log_path
+
+logger = logging.getLogger(__name__)
 
 def get_project_root() -> Path:
     """
@@ -23,34 +28,134 @@ def get_project_root() -> Path:
                 return parent
     
     # Fallback if no path is found
-    print("Error: Could not determine the project root directory.", file=sys.stderr)
+    logger.error("Error: Could not determine the project root directory.")
     sys.exit(1)
 
 
-def load_config():
+def load_config(program: Optional[str] = None):
     """
     Loads configuration from the .env file located in the project root.
 
+    Args:
+        program (str, optional): 'daemon' or 'hub' when loaded by those programs, so
+            they log to a file of their own. None for the widget.
+
     Returns:
         dict: A dictionary containing configuration values.
     """
+    from dotenv import load_dotenv  # Deferred: only needed once, while loading config
+
     root_path = get_project_root()
     load_dotenv(dotenv_path=root_path / ".env")
 
     api_key = os.getenv("CMC_API_KEY")
     interval_str = os.getenv("DEFAULT_REFRESH_INTERVAL", "5")
 
+    # Quote sources in order of preference, e.g. "cmc,binance"; see widget.api.providers
+    price_providers = [name.strip().lower() for name in os.getenv("PRICE_PROVIDERS", "cmc").split(",")
+                       if name.strip()] or ["cmc"]
+
     if not api_key or "YOUR_COINMARKETCAP_API_KEY_HERE" in api_key:
-        raise ValueError("CMC_API_KEY is not set or is invalid. Please update your .env file.")
+        # Without CoinMarketCap in the provider list (e.g. PRICE_PROVIDERS=binance) no key is needed
+        if "cmc" in price_providers:
+            raise ValueError("CMC_API_KEY is not set or is invalid. Please update your .env file.")
+        api_key = None
 
     try:
         interval = int(interval_str)
     except (ValueError, TypeError):
-        print("Warning: Invalid DEFAULT_REFRESH_INTERVAL. Using default value of 5 minutes.", file=sys.stderr)
+        logger.warning("Invalid DEFAULT_REFRESH_INTERVAL. Using default value of 5 minutes.")
         interval = 5
 
+    try:
+        retention_days = float(os.getenv("HISTORY_RETENTION_DAYS", "365"))
+    except ValueError:
+        logger.warning("Invalid HISTORY_RETENTION_DAYS. Using default value of 365 days.")
+        retention_days = 365.0
+
+    credit_settings = {}
+    for key, env_name, default in (("daily_credits", "CMC_DAILY_CREDITS", 333),
+                                   ("monthly_credits", "CMC_MONTHLY_CREDITS", 10000),
+                                   ("min_refresh_seconds", "MIN_REFRESH_SECONDS", 60)):
+        try:
+            credit_settings[key] = int(os.getenv(env_name, str(default)))
+        except ValueError:
+            logger.warning("Invalid %s. Using default value of %s.", env_name, default)
+            credit_settings[key] = default
+
+    try:
+        quote_cache_ttl = float(os.getenv("QUOTE_CACHE_TTL", "60"))
+    except ValueError:
+        logger.warning("Invalid QUOTE_CACHE_TTL. Using default value of 60 seconds.")
+        quote_cache_ttl = 60.0
+    # Point several installations at one directory to share quotes between them
+    quote_cache_dir = Path(os.getenv("QUOTE_CACHE_DIR") or root_path)
+
+    stream_enabled = os.getenv("PRICE_STREAM", "false").strip().lower() in ("1", "true", "yes", "on")
+    try:
+        stream_max_updates = float(os.getenv("PRICE_STREAM_MAX_UPDATES", "2"))
+    except ValueError:
+        logger.warning("Invalid PRICE_STREAM_MAX_UPDATES. Using default value of 2 per second.")
+        stream_max_updates = 2.0
+
+    replay_file = os.getenv("PRICE_REPLAY_FILE")
+    binance_ticker = os.getenv("BINANCE_TICKER", "24hr").strip().lower()
+    if binance_ticker not in ("24hr", "price"):
+        logger.warning("Invalid BINANCE_TICKER (use 24hr or price). Using 24hr.")
+        binance_ticker = "24hr"
+
+    # Currencies offered in the display currency selector; quotes are still fetched in USD only.
+    # Only USD by default: any other currency downloads exchange rates from a third party
+    display_currencies = [code.strip().upper() for code in os.getenv("DISPLAY_CURRENCIES", "USD").split(",")
+                          if code.strip()]
+    if "USD" not in display_currencies:
+        display_currencies.insert(0, "USD")
+    display_currency = os.getenv("DISPLAY_CURRENCY", "USD").strip().upper()
+    if display_currency not in display_currencies:
+        logger.warning("DISPLAY_CURRENCY %s is not in DISPLAY_CURRENCIES. Using USD.", display_currency)
+        display_currency = "USD"
+
+    # Local price hub shared by widgets and daemons; HUB_ADDRESS=off makes every process fetch on its own
+    from widget.hub.protocol import default_hub_address  # Deferred like dotenv: keeps this module import-light
+    hub_setting = os.getenv("HUB_ADDRESS", "").strip()
+    if hub_setting.lower() == "off":
+        hub_address = None
+    else:
+        hub_address = hub_setting or default_hub_address(root_path)
+
+    # Opt-in diagnostics endpoint on 127.0.0.1; see widget.diagnostics.metrics
+    metrics_port = None
+    if os.getenv("METRICS_PORT"):
+        try:
+            metrics_port = int(os.getenv("METRICS_PORT"))
+        except ValueError:
+            logger.warning("Invalid METRICS_PORT. The metrics endpoint stays disabled.")
+    # Structured (JSON lines) log; LOG_FILE=none keeps logging on the console only
+    log_file = os.getenv("LOG_FILE", "").strip()
+    if log_file.lower() == "none":
+        log_path = None
+    else:
+        log_path = program_log_path(Path(log_file), program) if log_file else get_log_path(root_path, program)
+
     return {
         "api_key": api_key,
         "refresh_interval": interval,
+        "history_retention_days": retention_days,
+        "stream_enabled": stream_enabled,
+        "stream_url": os.getenv("PRICE_STREAM_URL", "wss://stream.binance.com:9443/stream"),
+        "stream_max_updates": stream_max_updates,
+        **credit_settings,
+        "quote_cache_ttl": quote_cache_ttl,
+        "quote_cache_dir": quote_cache_dir,
+        "price_providers": price_providers,
+        "replay_file": Path(replay_file) if replay_file else None,
+        "binance_ticker": binance_ticker,
+        "display_currencies": display_currencies,
+        "display_currency": display_currency,
+        "fx_rates_url": os.getenv("FX_RATES_URL", "https://api.frankfurter.app/latest"),
+        "hub_address": hub_address,
+        "metrics_port": metrics_port,
+        "log_level": os.getenv("LOG_LEVEL", "INFO").strip().upper(),
+        "log_file": log_path,
         "root_path": root_path
     }
\ No newline at end of file
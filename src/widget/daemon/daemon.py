@@ -0,0 +1,281 @@
+# QCryptoWidget/src/widget/daemon/daemon.py
+"""
+Headless price polling and alarm loop.
+
+Reuses the widget's configuration, coins.json, alarms.json and price API
+but never imports Qt, so it can run on servers without a display.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from widget.config.config import load_config
+from widget.data.coin_db import load_coins, get_coin_db_path
+from widget.data.alarm_db import (load_alarms, get_alarm_db_path,
+                                  load_alarm_state, save_alarm_state, get_alarm_state_path)
+from widget.alarms.engine import AlarmEngine, migrate_alarms
+from widget.api.coin_api import get_client
+from widget.api.providers import build_router
+from widget.api.symbol_index import get_symbol_index
+from widget.api.credit_budget import CreditBudget, get_credit_usage_path
+from widget.api.resilience import STALE_SERVED, backoff_delay
+from widget.api.response_cache import SharedQuoteCache, get_quote_cache_path
+from widget.daemon.sinks import StdoutSink, LogSink, WebhookSink, alarm_event
+from widget.diagnostics.logs import setup_logging
+from widget.diagnostics.metrics import ALARM_SECONDS, start_metrics_server
+from widget.hub.client import HubClient
+
+logger = logging.getLogger(__name__)
+
+# After a failed fetch, retry with jittered backoff between these bounds (never later than the interval)
+RETRY_MIN_SECONDS = 10
+RETRY_MAX_SECONDS = 600
+# While fetching directly, look for the price hub again after this many seconds (doubling up to the maximum)
+HUB_RETRY_MIN_SECONDS = 2
+HUB_RETRY_MAX_SECONDS = 60
+# How often coins.json is checked for changes while the hub pushes prices
+COIN_CHECK_SECONDS = 5
+
+
+def _mtime(path: Path) -> float:
+    try:
+        return path.stat().st_mtime
+    except OSError:
+        return 0.0
+
+
+class PriceDaemon:
+    """
+    Polls prices on an asyncio loop and sends fired alarms to sinks.
+
+    coins.json and alarms.json are re-read whenever they change on disk, so
+    edits made in the widget are picked up without a restart.
+    """
+
+    def __init__(self, config: Dict, sinks: List, interval: Optional[float] = None):
+        """
+        Args:
+            config (Dict): The result of load_config().
+            sinks (List): Objects with an emit(event) method.
+            interval (float, optional): Seconds between fetches. None follows the credit budget.
+        """
+        self.config = config
+        self.sinks = sinks
+        self.interval = interval
+        root_path = config['root_path']
+        self.coin_db_path = get_coin_db_path(root_path)
+        self.alarm_db_path = get_alarm_db_path(root_path)
+        self.alarm_state_path = get_alarm_state_path(root_path)
+        self.budget = CreditBudget(config['daily_credits'], config['monthly_credits'],
+                                   config['min_refresh_seconds'], get_credit_usage_path(root_path))
+        if config['api_key']:
+            get_client(config['api_key']).usage_callback = self.budget.record_response
+        self.router = build_router(config)
+        # The CoinMarketCap map is only needed to request quotes by id
+        self.symbol_index = (get_symbol_index(root_path)
+                             if config['api_key'] and 'cmc' in config['price_providers'] else None)
+        self.quote_cache = SharedQuoteCache(get_quote_cache_path(config['quote_cache_dir']),
+                                            ttl=config['quote_cache_ttl'])
+        self.coins: List[str] = []
+        self.engine = AlarmEngine([])
+        # Applied when alarms.json is first read; later reloads keep the engine's own state
+        self._saved_state: Optional[Dict] = load_alarm_state(self.alarm_state_path)
+        self._coins_mtime = -1.0
+        self._alarms_mtime = -1.0
+        # Consecutive failed fetches; the loop retries sooner while this is non-zero
+        self.failures = 0
+
+    def reload_if_changed(self):
+        """Re-reads coins.json and alarms.json if they were modified."""
+        coins_mtime = _mtime(self.coin_db_path)
+        if coins_mtime != self._coins_mtime:
+            self._coins_mtime = coins_mtime
+            self.coins = load_coins(self.coin_db_path)
+        alarms_mtime = _mtime(self.alarm_db_path)
+        if alarms_mtime != self._alarms_mtime:
+            self._alarms_mtime = alarms_mtime
+            alarms = load_alarms(self.alarm_db_path)
+            state = self._saved_state if self._saved_state is not None else self.engine.export_state()
+            self._saved_state = None
+            # Old-style alarms are converted in memory; the widget rewrites alarms.json
+            migrate_alarms(alarms, state)
+            self.engine.compile(alarms, state)
+
+    def fetch(self, coins: List[str]) -> Optional[Dict]:
+        """Fetches quotes through the shared cache; runs in an executor thread."""
+        return self.quote_cache.get_prices(coins, self.router.get_prices)
+
+    async def run_once(self):
+        """Performs one fetch and alarm evaluation."""
+        self.reload_if_changed()
+        loop = asyncio.get_running_loop()
+        prices = await loop.run_in_executor(None, self.fetch, list(self.coins))
+        stale = prices is None
+        if stale:
+            self.failures += 1
+            # Serve the last good quotes; events carry the flag and the quotes' age
+            prices = self.quote_cache.peek(list(self.coins))
+            if not prices:
+                logger.warning("Could not fetch new prices.")
+                return
+            STALE_SERVED.inc()
+            logger.warning("Could not fetch new prices; using the last good quotes.")
+        else:
+            self.failures = 0
+        await self.process(prices, stale)
+
+    async def process(self, prices: Dict[str, Dict], stale: bool = False):
+        """
+        Evaluates the alarms against a set of quotes and emits the fired ones.
+
+        Args:
+            prices (Dict[str, Dict]): Quotes keyed by coin code.
+            stale (bool): Whether these are the last good quotes rather than a fresh fetch.
+        """
+        loop = asyncio.get_running_loop()
+        now = time.time()
+        with ALARM_SECONDS.time():
+            fired = self.engine.evaluate(prices, now)
+        for alarm in fired:
+            event = alarm_event(alarm, prices.get(alarm['coin'], {}), now, stale)
+            for sink in self.sinks:
+                await loop.run_in_executor(None, sink.emit, event)
+        if self.engine.dirty:
+            save_alarm_state(self.alarm_state_path, self.engine.export_state())
+            self.engine.dirty = False
+
+    async def run_forever(self):
+        """Runs the fetch/alarm loop until cancelled."""
+        while True:
+            if self.symbol_index is not None:
+                self.symbol_index.refresh_in_background(get_client(self.config['api_key']))
+            await self.run_once()
+            await asyncio.sleep(self.next_interval())
+
+    def next_interval(self) -> float:
+        """Seconds until the next direct fetch."""
+        interval = self.interval
+        if interval is None:
+            # Credit-free providers only: the budget falls back to its minimum interval
+            interval = self.budget.next_interval(len(self.coins) if self.router.costs_credits else 0)
+        if self.failures:
+            retry = max(RETRY_MIN_SECONDS, backoff_delay(self.failures - 1, RETRY_MIN_SECONDS, RETRY_MAX_SECONDS),
+                        self.router.retry_in())
+            interval = min(interval, retry)
+        return max(interval, self.budget.backoff_remaining())
+
+    async def run_with_hub(self, address: str):
+        """
+        Takes prices from the price hub while one is running and fetches
+        directly otherwise, looking for the hub again with growing delays.
+        """
+        client = HubClient(address)
+        delay = HUB_RETRY_MIN_SECONDS
+        next_fetch = 0.0
+        while True:
+            self.reload_if_changed()
+            if await client.connect(self.coins):
+                logger.info("Receiving prices from the hub at %s.", address)
+                await self._follow_hub(client)
+                logger.warning("Lost the price hub; fetching prices directly.")
+                delay = HUB_RETRY_MIN_SECONDS
+                next_fetch = 0.0
+            if time.time() >= next_fetch:
+                if self.symbol_index is not None:
+                    self.symbol_index.refresh_in_background(get_client(self.config['api_key']))
+                await self.run_once()
+                next_fetch = time.time() + self.next_interval()
+            await asyncio.sleep(max(0.0, min(delay, next_fetch - time.time())))
+            delay = min(delay * 2, HUB_RETRY_MAX_SECONDS)
+
+    async def _follow_hub(self, client: HubClient):
+        """Processes the hub's updates until the connection drops."""
+        watcher = asyncio.create_task(self._watch_coins(client))
+        try:
+            async for prices, stale in client.updates():
+                self.reload_if_changed()
+                await self.process(prices, stale)
+        finally:
+            watcher.cancel()
+
+    async def _watch_coins(self, client: HubClient):
+        """Re-subscribes when coins.json changes (updates may be minutes apart)."""
+        while True:
+            await asyncio.sleep(COIN_CHECK_SECONDS)
+            self.reload_if_changed()
+            await client.subscribe(self.coins)
+
+
+def build_sinks(args) -> List:
+    """Creates the sinks selected on the command line (stdout by default)."""
+    sinks = []
+    if args.log_file:
+        sinks.append(LogSink(Path(args.log_file)))
+    if args.webhook:
+        sinks.append(WebhookSink(args.webhook))
+    if args.stdout or not sinks:
+        sinks.append(StdoutSink())
+    return sinks
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Entry point for `qcryptowidget-daemon`.
+    """
+    parser = argparse.ArgumentParser(prog="qcryptowidget-daemon", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--interval', default=None,
+                        help="Minutes between fetches, or 'auto' to follow the credit budget "
+                             "(default: DEFAULT_REFRESH_INTERVAL from .env)")
+    parser.add_argument('--once', action='store_true', help="Fetch and evaluate alarms once, then exit")
+    parser.add_argument('--stdout', action='store_true', help="Print alarms as JSON lines (default sink)")
+    parser.add_argument('--log-file', help="Append alarms as JSON lines to this rotating log")
+    parser.add_argument('--webhook', help="POST alarms as JSON to this URL")
+    parser.add_argument('--hub', metavar='ADDRESS', default=None,
+                        help="Price hub to take prices from (default: HUB_ADDRESS from .env)")
+    parser.add_argument('--no-hub', action='store_true', help="Always fetch prices directly")
+    args = parser.parse_args(argv)
+
+    try:
+        config = load_config("daemon")
+    except ValueError as e:
+        logger.error("Configuration error: %s", e)
+        sys.exit(2)
+    # Diagnostics go to stderr and the structured log; stdout stays reserved for the alarm sink
+    setup_logging(config['log_file'], config['log_level'])
+    metrics_server = start_metrics_server(config['metrics_port'])
+
+    interval = config['refresh_interval'] * 60
+    if args.interval == 'auto':
+        interval = None
+    elif args.interval is not None:
+        try:
+            interval = float(args.interval) * 60
+        except ValueError:
+            parser.error("--interval must be a number of minutes or 'auto'")
+
+    daemon = PriceDaemon(config, build_sinks(args), interval)
+    hub_address = None if args.no_hub else args.hub or config['hub_address']
+    if args.once:
+        # A hub shares its quotes through the quote cache, so a single fetch is usually served from there
+        job = daemon.run_once()
+    elif hub_address:
+        job = daemon.run_with_hub(hub_address)
+    else:
+        job = daemon.run_forever()
+    try:
+        asyncio.run(job)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if metrics_server:
+            metrics_server.close()
+
+
+if __name__ == '__main__':
+    main()
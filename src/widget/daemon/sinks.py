@@ -0,0 +1,81 @@
+# QCryptoWidget/src/widget/daemon/sinks.py
+
+import json
+import logging
+import sys
+import urllib.error
+import urllib.request
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Dict
+
+from widget.alarms.rules import rule_text
+from widget.api.resilience import FETCHED_AT
+
+logger = logging.getLogger(__name__)
+
+
+def alarm_event(alarm: Dict, quote: Dict, ts: float, stale: bool = False) -> Dict:
+    """
+    Builds the JSON-serializable event every sink receives for a fired alarm.
+
+    Args:
+        alarm (Dict): The alarm that fired.
+        quote (Dict): The quote of the alarm's coin (the first one its rule reads) at the time it fired.
+        ts (float): UNIX time of the evaluation.
+        stale (bool): Whether the quotes are the last good ones, served because fetching failed.
+            'age' then tells how old they are.
+    """
+    rule = rule_text(alarm)
+    fetched_at = quote.get(FETCHED_AT)
+    return {
+        'ts': ts,
+        'coin': alarm['coin'],
+        'rule': rule,
+        'price': quote.get('price'),
+        'percent_change_24h': quote.get('percent_change_24h'),
+        'stale': stale,
+        'age': round(ts - fetched_at, 1) if fetched_at else None,
+        'message': f"Alarm for {alarm['coin']}: {rule}",
+    }
+
+
+class StdoutSink:
+    """Writes one JSON line per alarm to stdout."""
+
+    def emit(self, event: Dict):
+        sys.stdout.write(json.dumps(event) + "\n")
+        sys.stdout.flush()
+
+
+class LogSink:
+    """Appends one JSON line per alarm to a size-rotated log file."""
+
+    def __init__(self, path: Path, max_bytes: int = 1_000_000, backup_count: int = 3):
+        self.logger = logging.getLogger("qcryptowidget.alarms")
+        self.logger.setLevel(logging.INFO)
+        self.logger.propagate = False
+        handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        self.logger.addHandler(handler)
+
+    def emit(self, event: Dict):
+        self.logger.info(json.dumps(event))
+
+
+class WebhookSink:
+    """POSTs each alarm as JSON to a (typically local) webhook URL."""
+
+    def __init__(self, url: str, timeout: float = 5):
+        self.url = url
+        self.timeout = timeout
+
+    def emit(self, event: Dict):
+        request = urllib.request.Request(
+            self.url, data=json.dumps(event).encode("utf-8"),
+            headers={'Content-Type': 'application/json'}, method='POST')
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+        except (urllib.error.URLError, OSError) as e:
+            logger.warning("Webhook delivery to %s failed: %s", self.url, e)
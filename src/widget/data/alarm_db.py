@@ -1,10 +1,15 @@
 # QCryptoWidget/src/widget/data/alarm_db.py
 
-import json
+import logging
 from pathlib import Path
 from typing import List, Dict
 
+from widget.data.persistence import atomic_write_json, indent_for, read_json
+
+logger = logging.getLogger(__name__)
+
 ALARM_FILE = "alarms.json"
+ALARM_STATE_FILE = "alarm_state.json"
 
 def get_alarm_db_path(root_path: Path) -> Path:
     """Returns the full path to the alarm database file."""
@@ -18,26 +23,51 @@ def load_alarms(db_path: Path) -> List[Dict]:
         db_path (Path): The path to the alarm database file.
 
     Returns:
-        List[Dict]: A list of alarm dictionaries. Returns an empty list on failure.
+        List[Dict]: A list of alarm dictionaries. Returns an empty list if the
+            file is missing; a corrupt file is moved aside (see read_json).
     """
-    if not db_path.exists():
-        return []
-    try:
-        with open(db_path, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return []
+    return read_json(db_path, [], list)
 
 def save_alarms(db_path: Path, alarms: List[Dict]):
     """
-    Saves alarms to the JSON file.
+    Saves alarms to the JSON file, atomically.
+
+    Large alarm sets are written as compact JSON; small ones stay indented.
 
     Args:
         db_path (Path): The path to the alarm database file.
         alarms (List[Dict]): The list of alarm dictionaries to save.
     """
     try:
-        with open(db_path, 'w') as f:
-            json.dump(alarms, f, indent=4)
-    except IOError as e:
-        print(f"Error saving alarms: {e}")
\ No newline at end of file
+        atomic_write_json(db_path, alarms, indent_for(alarms))
+    except OSError as e:
+        logger.error("Error saving alarms: %s", e)
+
+def get_alarm_state_path(root_path: Path) -> Path:
+    """Returns the full path to the alarm trigger state file, kept next to alarms.json."""
+    return root_path / ALARM_STATE_FILE
+
+def load_alarm_state(state_path: Path) -> Dict[str, Dict]:
+    """
+    Loads the persisted alarm trigger state (armed flags and last firing times).
+
+    Args:
+        state_path (Path): The path to the alarm state file.
+
+    Returns:
+        Dict[str, Dict]: Alarm key -> state. Returns an empty dict on failure.
+    """
+    return read_json(state_path, {}, dict)
+
+def save_alarm_state(state_path: Path, state: Dict[str, Dict]):
+    """
+    Saves the alarm trigger state so a restart doesn't re-fire alarms.
+
+    Args:
+        state_path (Path): The path to the alarm state file.
+        state (Dict[str, Dict]): The state returned by AlarmEngine.export_state().
+    """
+    try:
+        atomic_write_json(state_path, state, indent=None)
+    except OSError as e:
+        logger.error("Error saving alarm state: %s", e)
@@ -1,10 +1,14 @@
 # QCryptoWidget/src/widget/data/coin_db.py
 
-import json
-import os
+import logging
 from pathlib import Path
 
+from widget.data.persistence import atomic_write_json, read_json
+
+logger = logging.getLogger(__name__)
+
 COIN_FILE = "coins.json"
+DEFAULT_COINS = ["BTC", "ETH", "ADA", "BNB"]
 
 def get_coin_db_path(root_path: Path) -> Path:
     """Returns the full path to the coin database file."""
@@ -19,26 +23,20 @@ def load_coins(db_path: Path) -> list:
 
     Returns:
         list: A list of coin codes (e.g., ['BTC', 'ETH']).
-              Returns a default list if the file doesn't exist.
+              Returns a default list if the file doesn't exist. A corrupt
+              file is moved aside (see read_json) and the defaults are returned.
     """
-    if not db_path.exists():
-        return ["BTC", "ETH", "ADA", "BNB"]  # Default coins
-    try:
-        with open(db_path, 'r') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return ["BTC", "ETH", "ADA", "BNB"] # Return default on error
+    return read_json(db_path, list(DEFAULT_COINS), list)
 
 def save_coins(db_path: Path, coins: list):
     """
-    Saves the list of coin codes to the JSON file.
+    Saves the list of coin codes to the JSON file, atomically.
 
     Args:
         db_path (Path): The path to the coin database file.
         coins (list): The list of coin codes to save.
     """
     try:
-        with open(db_path, 'w') as f:
-            json.dump(coins, f, indent=4)
-    except IOError as e:
-        print(f"Error saving coin list: {e}")
\ No newline at end of file
+        atomic_write_json(db_path, coins)
+    except OSError as e:
+        logger.error("Error saving coin list: %s", e)
\ No newline at end of file
@@ -0,0 +1,180 @@
+# QCryptoWidget/src/widget/data/history_db.py
+
+import logging
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from widget.diagnostics.metrics import WRITE_ERRORS, WRITE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+HISTORY_FILE = "price_history.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    coin TEXT NOT NULL,
+    ts REAL NOT NULL,
+    price REAL NOT NULL,
+    pct_24h REAL,
+    pct_7d REAL,
+    PRIMARY KEY (coin, ts)
+) WITHOUT ROWID
+"""
+
+def get_history_db_path(root_path: Path) -> Path:
+    """Returns the full path to the price history database."""
+    return root_path / HISTORY_FILE
+
+class PriceHistory:
+    """
+    Append-only price history backed by SQLite in WAL mode.
+
+    Every fetch is recorded in a single batched transaction. Rows are keyed by
+    (coin, ts), so range queries for one coin are index scans. Old data is
+    compacted to one row per bucket and eventually dropped, keeping the file bounded.
+
+    Writes go through the thread that created the object; queries may also be
+    made from other threads, which read through a connection of their own.
+    """
+
+    def __init__(self, db_path: Path, retention_days: float = 365, raw_days: float = 7,
+                 compact_bucket: float = 3600, compact_every: float = 3600):
+        """
+        Args:
+            db_path (Path): The path to the SQLite database file.
+            retention_days (float): Rows older than this are deleted.
+            raw_days (float): Rows older than this are thinned to one per compact_bucket.
+            compact_bucket (float): Bucket width in seconds for compacted rows.
+            compact_every (float): Minimum seconds between automatic compactions.
+        """
+        self.db_path = db_path
+        self.retention = retention_days * 86400
+        self.raw_age = raw_days * 86400
+        self.compact_bucket = compact_bucket
+        self.compact_every = compact_every
+        self._last_compact = 0.0
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(_SCHEMA)
+        self.conn.commit()
+        self._owner = threading.get_ident()
+        self._readers = threading.local()
+
+    def _reader(self) -> sqlite3.Connection:
+        # SQLite connections belong to the thread that opened them
+        if threading.get_ident() == self._owner:
+            return self.conn
+        conn = getattr(self._readers, 'conn', None)
+        if conn is None:
+            conn = self._readers.conn = sqlite3.connect(str(self.db_path))
+        return conn
+
+    def record(self, price_data: Dict[str, Dict], ts: Optional[float] = None) -> int:
+        """
+        Appends one observation per coin in a single transaction.
+
+        Args:
+            price_data (Dict[str, Dict]): Prices keyed by coin code, as returned by get_current_prices.
+            ts (float, optional): Observation time. Defaults to now.
+
+        Returns:
+            int: The number of rows written.
+        """
+        if ts is None:
+            ts = time.time()
+        rows = [
+            (coin, ts, data['price'], data.get('percent_change_24h'), data.get('percent_change_7d'))
+            for coin, data in price_data.items()
+        ]
+        if not rows:
+            return 0
+        try:
+            with WRITE_SECONDS.time(file=Path(self.db_path).name), self.conn:
+                self.conn.executemany("INSERT OR REPLACE INTO prices VALUES (?, ?, ?, ?, ?)", rows)
+        except sqlite3.Error as e:
+            WRITE_ERRORS.inc(file=Path(self.db_path).name)
+            logger.error("Error recording price history: %s", e)
+            return 0
+        if ts - self._last_compact >= self.compact_every:
+            self.compact(ts)
+        return len(rows)
+
+    def query_range(self, coin: str, start: Optional[float] = None,
+                    end: Optional[float] = None) -> List[Tuple[float, float]]:
+        """
+        Returns the raw (ts, price) observations for a coin, oldest first.
+
+        Args:
+            coin (str): The coin code.
+            start (float, optional): Inclusive lower bound (UNIX time).
+            end (float, optional): Inclusive upper bound (UNIX time).
+        """
+        cursor = self._reader().execute(
+            "SELECT ts, price FROM prices WHERE coin = ? AND ts >= ? AND ts <= ? ORDER BY ts",
+            (coin, start if start is not None else float('-inf'), end if end is not None else float('inf')))
+        return cursor.fetchall()
+
+    def query_downsampled(self, coin: str, start: float, end: float,
+                          buckets: int) -> List[Tuple[float, float, float, float]]:
+        """
+        Returns a coin's history reduced to at most `buckets` equal-width time buckets.
+
+        Args:
+            coin (str): The coin code.
+            start (float): Start of the window (UNIX time).
+            end (float): End of the window (UNIX time).
+            buckets (int): Maximum number of rows to return.
+
+        Returns:
+            List[Tuple[float, float, float, float]]: (ts, min, max, last) per non-empty
+                bucket, where ts and last come from the bucket's newest observation.
+        """
+        width = max((end - start) / max(buckets, 1), 1e-9)
+        # The newest price is picked with a window function: a bare column next to
+        # several MIN()/MAX() aggregates may come from any of their rows
+        cursor = self._reader().execute(
+            """SELECT MAX(ts), MIN(price), MAX(price), MAX(CASE WHEN newest = 1 THEN price END)
+               FROM (SELECT ts, price, bucket,
+                            ROW_NUMBER() OVER (PARTITION BY bucket ORDER BY ts DESC) AS newest
+                     FROM (SELECT ts, price, CAST((ts - ?) / ? AS INTEGER) AS bucket FROM prices
+                           WHERE coin = ? AND ts >= ? AND ts <= ?))
+               GROUP BY bucket ORDER BY 1""",
+            (start, width, coin, start, end))
+        return cursor.fetchall()
+
+    def latest(self, coin: str) -> Optional[Tuple[float, float]]:
+        """Returns the newest (ts, price) observation for a coin, or None."""
+        return self._reader().execute(
+            "SELECT ts, price FROM prices WHERE coin = ? ORDER BY ts DESC LIMIT 1", (coin,)).fetchone()
+
+    def compact(self, now: Optional[float] = None):
+        """
+        Applies retention: drops rows past the retention window and thins rows
+        older than the raw window to the newest row per bucket.
+        """
+        if now is None:
+            now = time.time()
+        self._last_compact = now
+        raw_cutoff = now - self.raw_age
+        try:
+            with self.conn:
+                self.conn.execute("DELETE FROM prices WHERE ts < ?", (now - self.retention,))
+                self.conn.execute(
+                    """DELETE FROM prices WHERE ts < :cutoff AND (coin, ts) NOT IN (
+                           SELECT coin, MAX(ts) FROM prices WHERE ts < :cutoff
+                           GROUP BY coin, CAST(ts / :bucket AS INTEGER))""",
+                    {'cutoff': raw_cutoff, 'bucket': self.compact_bucket})
+        except sqlite3.Error as e:
+            logger.error("Error compacting price history: %s", e)
+
+    def close(self):
+        """Checkpoints the WAL and closes the database."""
+        try:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        except sqlite3.Error:
+            pass
+        self.conn.close()
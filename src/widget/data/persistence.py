@@ -0,0 +1,222 @@
+# QCryptoWidget/src/widget/data/persistence.py
+
+import json
+import logging
+import os
+import stat
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from widget.diagnostics.metrics import WRITE_ERRORS, WRITE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Lists longer than this are written without indentation; small files stay hand-editable
+COMPACT_THRESHOLD = 500
+
+def _read_umask() -> int:
+    # The umask can only be read by setting it; done once, before any threads write files
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+_UMASK = _read_umask()
+
+def atomic_write_json(path: Path, data: Any, indent: Optional[int] = 4):
+    """
+    Writes JSON so that readers only ever see the old or the new file.
+
+    The data goes to a temp file in the same directory, which is fsynced and
+    then renamed over the target. A crash mid-write leaves the old file intact.
+    The new file keeps the target's permissions (or gets the umask's defaults
+    if the target doesn't exist yet).
+
+    Args:
+        path (Path): The file to replace.
+        data (Any): JSON-serializable data.
+        indent (int, optional): Indentation; None writes compact JSON.
+
+    Raises:
+        OSError: If the file could not be written.
+    """
+    path = Path(path)
+    separators = (',', ':') if indent is None else None
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # The file object owns fd from here on, so it is closed whatever fails below
+        with os.fdopen(fd, 'w') as f:
+            # mkstemp creates the file owner-only; don't let that replace the target's mode
+            os.chmod(tmp_name, _file_mode(path))
+            json.dump(data, f, indent=indent, separators=separators)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(path.parent)
+
+def _file_mode(path: Path) -> int:
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except OSError:
+        return 0o666 & ~_UMASK
+
+def _fsync_dir(directory: Path):
+    # Makes the rename itself durable; not supported on Windows
+    if os.name == 'nt':
+        return
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def indent_for(data: Any) -> Optional[int]:
+    """Returns the indentation to write `data` with: 4 for small lists, None for large ones."""
+    if isinstance(data, (list, dict)) and len(data) > COMPACT_THRESHOLD:
+        return None
+    return 4
+
+def read_json(path: Path, default: Any, expected_type: Optional[type] = None) -> Any:
+    """
+    Reads a JSON file, setting aside unreadable ones instead of losing them.
+
+    A file that exists but doesn't parse (or has the wrong top-level type) is
+    renamed to `<name>.<timestamp>.corrupt` with a warning, so the next save
+    can't overwrite what might still be recovered by hand.
+
+    Args:
+        path (Path): The file to read.
+        default (Any): Returned when the file is missing or unusable.
+        expected_type (type, optional): Required type of the decoded value.
+
+    Returns:
+        Any: The decoded data, or `default`.
+    """
+    path = Path(path)
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return default
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        quarantine(path, str(e))
+        return default
+    except OSError as e:
+        logger.error("Error reading %s: %s", path, e)
+        return default
+    if expected_type is not None and not isinstance(data, expected_type):
+        quarantine(path, f"expected {expected_type.__name__}, got {type(data).__name__}")
+        return default
+    return data
+
+def quarantine(path: Path, reason: str) -> Optional[Path]:
+    """Renames a corrupt file out of the way and returns its new path."""
+    target = path.with_name(f"{path.name}.{time.strftime('%Y%m%d-%H%M%S')}.corrupt")
+    try:
+        os.replace(path, target)
+    except OSError as e:
+        logger.warning("%s is corrupt (%s) and could not be moved aside: %s", path, reason, e)
+        return None
+    logger.warning("%s is corrupt (%s); moved it to %s and using defaults.", path, reason, target.name)
+    return target
+
+class WriteBehind:
+    """
+    Coalesces saves and performs them on a background thread.
+
+    schedule() records the latest data for a path; the write happens once the
+    path has been quiet for `delay` seconds (or `max_delay` after the first
+    unsaved change, so a steady stream of edits still reaches the disk). Only
+    the newest data per path is written. Callers must pass data that won't be
+    mutated afterwards, e.g. a copy of the list.
+    """
+
+    def __init__(self, delay: float = 0.5, max_delay: float = 5.0):
+        """
+        Args:
+            delay (float): Seconds of quiet before a scheduled write runs.
+            max_delay (float): Maximum seconds a change may stay unwritten.
+        """
+        self.delay = delay
+        self.max_delay = max_delay
+        self._cond = threading.Condition()
+        # path -> (writer, data, due time, deadline)
+        self._pending: Dict[Path, Tuple[Callable[[Path, Any], None], Any, float, float]] = {}
+        # Held while taking entries and writing them, so writes to a path never reorder
+        self._io_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def schedule(self, path: Path, data: Any, writer: Callable[[Path, Any], None]):
+        """
+        Queues `writer(path, data)`, replacing anything still pending for the path.
+
+        After close() the write is performed immediately on the calling thread.
+        """
+        with self._cond:
+            if not self._closed:
+                now = time.monotonic()
+                previous = self._pending.get(path)
+                deadline = previous[3] if previous else now + self.max_delay
+                self._pending[path] = (writer, data, min(now + self.delay, deadline), deadline)
+                self._cond.notify()
+                return
+        with self._io_lock:
+            self._write_all({path: (writer, data, 0, 0)})
+
+    def flush(self):
+        """Performs every pending write now and returns once they are on disk."""
+        with self._io_lock:
+            with self._cond:
+                entries, self._pending = self._pending, {}
+            self._write_all(entries)
+
+    def close(self):
+        """Flushes pending writes and stops the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and not self._due(time.monotonic()):
+                    timeout = min((entry[2] for entry in self._pending.values()), default=None)
+                    self._cond.wait(None if timeout is None else max(0.0, timeout - time.monotonic()))
+                if self._closed:
+                    return
+            with self._io_lock:
+                with self._cond:
+                    due = self._due(time.monotonic())
+                    for path in due:
+                        del self._pending[path]
+                self._write_all(due)
+
+    def _due(self, now: float) -> Dict:
+        return {path: entry for path, entry in self._pending.items() if entry[2] <= now}
+
+    @staticmethod
+    def _write_all(entries: Dict):
+        for path, (writer, data, _, _) in entries.items():
+            try:
+                with WRITE_SECONDS.time(file=Path(path).name):
+                    writer(path, data)
+            except Exception as e:
+                WRITE_ERRORS.inc(file=Path(path).name)
+                logger.error("Error writing %s: %s", path, e)
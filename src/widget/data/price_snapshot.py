@@ -0,0 +1,366 @@
+# QCryptoWidget/src/widget/data/price_snapshot.py
+"""
+Column-oriented store for the latest quote of every tracked coin.
+
+A PriceSnapshot keeps a symbol -> row table and one float64 column per
+numeric quote field (price, the percent-change windows, fetched_at), and
+is updated in place: a refresh writes numbers into existing arrays instead
+of allocating a dictionary per coin. Unknown values are NaN.
+
+Readers that expect quote dictionaries (alarm rules, the history database,
+the sparkline cache) can use a snapshot as a read-only Mapping[str, Mapping]:
+snapshot[coin] is a QuoteView that reads one row straight from the columns.
+Vectorized readers (the price table, currency conversion, analytics) take
+the columns themselves through column()/change(), as read-only views.
+
+A snapshot can also keep each coin's last few prices in a ring buffer
+(recent(), tick_matrix()) for analytics that need a short series without a
+database query.
+"""
+
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from widget.api.resilience import FETCHED_AT
+
+PRICE = 'price'
+SLUG = 'slug'
+# Change window (as shown in the interval selector) -> quote field
+CHANGE_FIELDS = {
+    '24h': 'percent_change_24h',
+    '7d': 'percent_change_7d',
+}
+NUMERIC_FIELDS = (PRICE,) + tuple(CHANGE_FIELDS.values()) + (FETCHED_AT,)
+# Fields whose change is worth redrawing a row for
+DISPLAY_FIELDS = (PRICE,) + tuple(CHANGE_FIELDS.values())
+
+_MIN_CAPACITY = 16
+
+
+class QuoteView(Mapping):
+    """
+    One coin's quote, read from a snapshot's columns without copying.
+
+    Behaves like the quote dictionary it replaces (view['price'],
+    view.get('percent_change_7d')); unknown fields are absent. A view is only
+    valid until coins are removed from its snapshot.
+    """
+    __slots__ = ("_snapshot", "_row")
+
+    def __init__(self, snapshot: "PriceSnapshot", row: int):
+        self._snapshot = snapshot
+        self._row = row
+
+    def __getitem__(self, field: str):
+        if field == SLUG:
+            return self._snapshot._slugs[self._row]
+        column = self._snapshot._columns.get(field)
+        if column is None:
+            raise KeyError(field)
+        value = column[self._row]
+        if value != value:  # NaN: not known
+            raise KeyError(field)
+        return float(value)
+
+    def __iter__(self):
+        row = self._row
+        for field, column in self._snapshot._columns.items():
+            if column[row] == column[row]:
+                yield field
+        yield SLUG
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"QuoteView({dict(self)!r})"
+
+
+class PriceSnapshot(Mapping):
+    """
+    Latest quotes, one row per coin, stored as NumPy columns.
+
+    Rows keep the order in which coins were first added. Columns grow by
+    doubling, so adding coins one at a time stays cheap.
+    """
+
+    def __init__(self, ticks: int = 0):
+        """
+        Args:
+            ticks (int): Recent prices kept per coin (0 keeps none).
+        """
+        self.ticks = max(0, ticks)
+        self._index: Dict[str, int] = {}
+        self._codes: List[str] = []
+        self._slugs: List[str] = []
+        self._columns: Dict[str, np.ndarray] = {field: np.full(_MIN_CAPACITY, np.nan) for field in NUMERIC_FIELDS}
+        # Bumped whenever a slug changes, so views of the slugs can tell when to re-read them
+        self.slug_version = 0
+        self._tick_ts = np.full((_MIN_CAPACITY, self.ticks), np.nan)
+        self._tick_prices = np.full((_MIN_CAPACITY, self.ticks), np.nan)
+        self._tick_count = np.zeros(_MIN_CAPACITY, dtype=np.int64)
+
+    @classmethod
+    def from_quotes(cls, quotes: Mapping, ticks: int = 0) -> "PriceSnapshot":
+        """Builds a snapshot from quote dictionaries keyed by coin code."""
+        snapshot = cls(ticks)
+        snapshot.update(quotes)
+        return snapshot
+
+    # --- Mapping interface ---
+
+    def __getitem__(self, code: str) -> QuoteView:
+        return QuoteView(self, self._index[code])
+
+    def __iter__(self):
+        return iter(self._codes)
+
+    def __len__(self):
+        return len(self._codes)
+
+    def __contains__(self, code) -> bool:
+        return code in self._index
+
+    # --- Columns ---
+
+    @property
+    def codes(self) -> Tuple[str, ...]:
+        """The coin codes, in row order."""
+        return tuple(self._codes)
+
+    def row(self, code: str) -> Optional[int]:
+        """Returns a coin's row, or None if it isn't in the snapshot."""
+        return self._index.get(code)
+
+    def rows(self, codes: Iterable[str]) -> np.ndarray:
+        """Returns the rows of the given coins (which must all be present)."""
+        index = self._index
+        return np.fromiter((index[code] for code in codes), dtype=np.intp)
+
+    def column(self, field: str) -> np.ndarray:
+        """
+        Returns a numeric field for every row, in row order.
+
+        The array is a read-only view of the snapshot's storage, not a copy:
+        it reflects later in-place updates but not added or removed coins.
+        """
+        view = self._columns[field][:len(self._codes)]
+        view.flags.writeable = False
+        return view
+
+    def change(self, interval: str) -> np.ndarray:
+        """Returns the percent changes for a change window ('24h' or '7d'); see column()."""
+        return self.column(CHANGE_FIELDS[interval])
+
+    def slug(self, code: str) -> str:
+        return self._slugs[self._index[code]]
+
+    # --- Updates ---
+
+    def update(self, quotes: Mapping, ts: Optional[float] = None):
+        """
+        Writes quotes into the snapshot, adding coins it doesn't have yet.
+
+        Only the fields a quote carries are overwritten, so a partial update
+        (a stream tick with price and 24h change) keeps the rest, and a quote
+        without a slug (e.g. from Binance) keeps the one CoinMarketCap sent.
+
+        Args:
+            quotes (Mapping): Quote dictionaries keyed by coin code.
+            ts (float, optional): Time recorded with the new prices in the tick
+                buffers when a quote has no 'fetched_at'.
+        """
+        count = len(quotes)
+        if not count:
+            return
+        index = self._index
+        new_codes = [code for code in quotes if code not in index]
+        if new_codes:
+            self._add(new_codes)
+        row_list = list(map(index.__getitem__, quotes))
+        rows = np.array(row_list, dtype=np.intp)
+        values = list(quotes.values())
+        updates = {}
+        for field in NUMERIC_FIELDS:
+            # NumPy turns missing fields (None) into NaN
+            update = updates[field] = np.array([quote.get(field) for quote in values], dtype=np.float64)
+            known = ~np.isnan(update)
+            if known.all():
+                self._columns[field][rows] = update
+            else:
+                self._columns[field][rows[known]] = update[known]
+        slugs = self._slugs
+        new_slugs = [quote.get(SLUG) for quote in values]
+        if new_slugs != list(map(slugs.__getitem__, row_list)):
+            for row, slug in zip(row_list, new_slugs):
+                if slug and slug != slugs[row]:
+                    slugs[row] = slug
+                    self.slug_version += 1
+        if self.ticks:
+            times = updates[FETCHED_AT]
+            if ts is not None:
+                times = np.where(np.isnan(times), ts, times)
+            self._record_ticks(rows, updates[PRICE], times)
+
+    def retain(self, codes: Iterable[str]):
+        """Drops every coin not in `codes`; the remaining rows keep their order."""
+        keep = set(codes)
+        if all(code in keep for code in self._codes):
+            return
+        kept = [row for row, code in enumerate(self._codes) if code in keep]
+        self._take(np.array(kept, dtype=np.intp))
+
+    def remove(self, code: str):
+        """Drops one coin (a no-op if it isn't present)."""
+        if code in self._index:
+            self.retain(c for c in self._codes if c != code)
+
+    def copy(self, ticks: bool = True) -> "PriceSnapshot":
+        """
+        Returns an independent copy (e.g. to diff the next update against).
+
+        Args:
+            ticks (bool): Whether to copy the tick buffers too.
+        """
+        other = PriceSnapshot(self.ticks if ticks else 0)
+        other._take_from(self)
+        return other
+
+    def with_columns(self, columns: Dict[str, np.ndarray]) -> "PriceSnapshot":
+        """
+        Returns a copy with some numeric columns replaced (e.g. prices in another
+        currency). Each array must have one value per row; tick buffers are not copied.
+        """
+        other = PriceSnapshot()
+        other._take_from(self)
+        size = len(self._codes)
+        for field, values in columns.items():
+            other._columns[field][:size] = values
+        return other
+
+    # --- Diffs ---
+
+    def diff(self, previous: "PriceSnapshot", fields: Tuple[str, ...] = DISPLAY_FIELDS) -> np.ndarray:
+        """
+        Returns the rows whose values in `fields` differ from `previous`.
+
+        Coins that `previous` doesn't have count as changed. When both
+        snapshots hold the same coins in the same order (the usual case
+        between two refreshes) this is one vectorized comparison per field.
+        """
+        size = len(self._codes)
+        if self._codes == previous._codes:
+            other_rows = None
+            present = np.ones(size, dtype=bool)
+        else:
+            other_rows = np.fromiter((previous._index.get(code, -1) for code in self._codes),
+                                     dtype=np.intp, count=size)
+            present = other_rows >= 0
+        changed = ~present
+        for field in fields:
+            current = self._columns[field][:size]
+            before = previous._columns[field][:len(previous._codes)]
+            before = before if other_rows is None else np.where(present, before[other_rows], np.nan)
+            both_unknown = np.isnan(current) & np.isnan(before)
+            changed |= (current != before) & ~both_unknown
+        return np.flatnonzero(changed)
+
+    # --- Recent ticks ---
+
+    def recent(self, code: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns a coin's buffered (timestamps, prices), oldest first."""
+        row = self._index[code]
+        count = int(self._tick_count[row])
+        if not self.ticks or not count:
+            return np.empty(0), np.empty(0)
+        order = (np.arange(max(0, count - self.ticks), count)) % self.ticks
+        return self._tick_ts[row, order], self._tick_prices[row, order]
+
+    def tick_matrix(self) -> np.ndarray:
+        """
+        Returns every coin's buffered prices as a (coins, ticks) matrix, oldest
+        first and left-padded with NaN, in the layout the batch functions of
+        widget.analytics.indicators take.
+        """
+        size = len(self._codes)
+        if not self.ticks:
+            return np.empty((size, 0))
+        counts = self._tick_count[:size, np.newaxis]
+        # Column j holds tick number count - ticks + j; negative numbers are padding
+        numbers = counts - self.ticks + np.arange(self.ticks)
+        matrix = self._tick_prices[np.arange(size)[:, np.newaxis], numbers % self.ticks]
+        matrix[numbers < 0] = np.nan
+        return matrix
+
+    # --- Storage ---
+
+    def _add(self, codes: List[str]):
+        start = len(self._codes)
+        self._reserve(start + len(codes))
+        for offset, code in enumerate(codes):
+            self._index[code] = start + offset
+        self._codes.extend(codes)
+        self._slugs.extend([''] * len(codes))
+
+    def _reserve(self, size: int):
+        capacity = len(self._tick_count)
+        if size <= capacity:
+            return
+        capacity = max(size, capacity * 2)
+        used = len(self._codes)
+        for field, column in self._columns.items():
+            grown = np.full(capacity, np.nan)
+            grown[:used] = column[:used]
+            self._columns[field] = grown
+        for name in ('_tick_ts', '_tick_prices'):
+            grown = np.full((capacity, self.ticks), np.nan)
+            grown[:used] = getattr(self, name)[:used]
+            setattr(self, name, grown)
+        count = np.zeros(capacity, dtype=np.int64)
+        count[:used] = self._tick_count[:used]
+        self._tick_count = count
+
+    def _take(self, rows: np.ndarray):
+        self._take_from(self, rows)
+        self.slug_version += 1  # Slugs moved to other rows
+
+    def _take_from(self, source: "PriceSnapshot", rows: Optional[np.ndarray] = None):
+        # Copies the given rows of `source` (all of them by default). Everything
+        # is gathered before assigning, so the source may be self.
+        if rows is None:
+            codes, slugs, index = list(source._codes), list(source._slugs), dict(source._index)
+            rows = slice(0, len(codes))
+        else:
+            codes = [source._codes[row] for row in rows.tolist()]
+            slugs = [source._slugs[row] for row in rows.tolist()]
+            index = {code: row for row, code in enumerate(codes)}
+        size = len(codes)
+        capacity = max(_MIN_CAPACITY, size)
+        columns = {}
+        for field, column in source._columns.items():
+            columns[field] = np.full(capacity, np.nan)
+            columns[field][:size] = column[rows]
+        ticks = self.ticks if self.ticks == source.ticks else 0
+        tick_ts = np.full((capacity, ticks), np.nan)
+        tick_prices = np.full((capacity, ticks), np.nan)
+        tick_count = np.zeros(capacity, dtype=np.int64)
+        if ticks:
+            tick_ts[:size] = source._tick_ts[rows]
+            tick_prices[:size] = source._tick_prices[rows]
+            tick_count[:size] = source._tick_count[rows]
+        self._index = index
+        self._codes, self._slugs, self._columns = codes, slugs, columns
+        self.ticks, self._tick_ts, self._tick_prices, self._tick_count = ticks, tick_ts, tick_prices, tick_count
+        self.slug_version = source.slug_version
+
+    def _record_ticks(self, rows: np.ndarray, prices: np.ndarray, times: np.ndarray):
+        # A quote served again from the cache (same fetched_at) is not a new tick
+        last = self._tick_ts[rows, (self._tick_count[rows] - 1) % self.ticks]
+        known = ~np.isnan(prices) & ~(times <= last)
+        rows, prices, times = rows[known], prices[known], times[known]
+        slots = self._tick_count[rows] % self.ticks
+        self._tick_prices[rows, slots] = prices
+        self._tick_ts[rows, slots] = times
+        self._tick_count[rows] += 1
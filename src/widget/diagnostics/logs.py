@@ -0,0 +1,107 @@
+# QCryptoWidget/src/widget/diagnostics/logs.py
+
+import json
+import logging
+import sys
+import time
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Optional
+
+from widget.diagnostics.metrics import counter
+
+LOG_FILE = "qcryptowidget.log"
+LOG_MAX_BYTES = 1_000_000
+LOG_BACKUP_COUNT = 3
+
+# Attributes every LogRecord has; anything else was passed through `extra=` and is logged as a field
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+def get_log_path(root_path: Path, program: Optional[str] = None) -> Path:
+    """Returns the default path of a program's structured log (see program_log_path)."""
+    return program_log_path(root_path / LOG_FILE, program)
+
+def program_log_path(log_path: Path, program: Optional[str] = None) -> Path:
+    """
+    Returns the log file a program writes, derived from the configured one.
+
+    The widget writes `log_path` itself; the daemon and the hub get files of
+    their own ("qcryptowidget-daemon.log"), because each process rotates its
+    log and two RotatingFileHandlers would rename one file from under each other.
+
+    Args:
+        log_path (Path): The configured log file.
+        program (str, optional): 'daemon', 'hub', or None for the widget.
+    """
+    if not program:
+        return log_path
+    return log_path.with_name(f"{log_path.stem}-{program}{log_path.suffix}")
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats records as one JSON object per line.
+
+    Fields given with `extra=` (e.g. logger.info("...", extra={'coins': 12}))
+    are included as top-level keys.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': round(record.created, 3),
+            'time': time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(record.created)),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+class _CountingHandler(logging.Handler):
+    """Counts warnings and errors per logger, so error rates show up in the metrics."""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.messages = counter("log_messages_total", "Warnings and errors logged, by level and logger.")
+
+    def emit(self, record: logging.LogRecord):
+        self.messages.inc(level=record.levelname.lower(), logger=record.name)
+
+def setup_logging(log_path: Optional[Path] = None, level: str = "INFO",
+                  max_bytes: int = LOG_MAX_BYTES, backup_count: int = LOG_BACKUP_COUNT):
+    """
+    Configures the 'widget' loggers: plain messages on stderr and, if a path is
+    given, JSON lines in a size-rotated log file.
+
+    Calling it again replaces the handlers it installed before.
+
+    Args:
+        log_path (Path, optional): Structured log file; None logs to stderr only.
+        level (str): Minimum level, e.g. "INFO" or "DEBUG".
+        max_bytes (int): Size at which the log file is rotated.
+        backup_count (int): Rotated files kept.
+    """
+    logger = logging.getLogger("widget")
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+    logger.setLevel(getattr(logging, str(level).upper(), logging.INFO))
+    logger.propagate = False
+
+    console = logging.StreamHandler(sys.stderr)
+    console.setFormatter(logging.Formatter("[%(asctime)s] %(levelname)s: %(message)s", "%H:%M:%S"))
+    logger.addHandler(console)
+    logger.addHandler(_CountingHandler())
+
+    if log_path is not None:
+        try:
+            file_handler = RotatingFileHandler(log_path, maxBytes=max_bytes, backupCount=backup_count,
+                                               encoding="utf-8")
+        except OSError as e:
+            logger.warning("Could not open log file %s: %s", log_path, e)
+            return
+        file_handler.setFormatter(JsonFormatter())
+        logger.addHandler(file_handler)
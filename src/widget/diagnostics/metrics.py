@@ -0,0 +1,283 @@
+# QCryptoWidget/src/widget/diagnostics/metrics.py
+"""
+In-process counters and latency histograms for the hot paths.
+
+Metrics are always collected (an observation is a lock and a bisect) and
+can be read over an opt-in HTTP endpoint bound to localhost:
+    /metrics        Prometheus text format
+    /metrics.json   the same data as JSON
+Set METRICS_PORT in .env to enable it.
+"""
+
+import bisect
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Upper bounds in seconds; covers sub-millisecond parsing up to slow HTTP calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_PREFIX = "qcw_"
+
+logger = logging.getLogger(__name__)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey) -> str:
+    if not key:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in key) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    """A monotonically increasing count, per label set."""
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str = ""):
+        self.name = name
+        self.help = help_text
+        self._lock = threading.Lock()
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(labels), 0)
+
+    def samples(self) -> List[Tuple[str, LabelKey, float]]:
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            return [{'labels': dict(key), 'value': value} for key, value in self._values.items()]
+
+
+class Histogram:
+    """Observations counted into fixed buckets, with their sum, per label set."""
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # label key -> [per-bucket counts (last one is +Inf), sum, count]
+        self._values: Dict[LabelKey, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                entry = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observes the wall-clock duration of the enclosed block, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            entry = self._values.get(_label_key(labels))
+            return entry[2] if entry else 0
+
+    def samples(self) -> List[Tuple[str, LabelKey, float]]:
+        samples = []
+        with self._lock:
+            for key, (counts, total, count) in self._values.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    samples.append((f"{self.name}_bucket", key + (("le", _format_value(bound)),), cumulative))
+                samples.append((f"{self.name}_sum", key, total))
+                samples.append((f"{self.name}_count", key, count))
+        return samples
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            return [{'labels': dict(key), 'count': count, 'sum': total,
+                     'buckets': dict(zip([_format_value(b) for b in self.buckets] + ["+Inf"], counts))}
+                    for key, (counts, total, count) in self._values.items()]
+
+
+class MetricsRegistry:
+    """Named metrics, created on first use and shared by every caller."""
+
+    def __init__(self, prefix: str = METRIC_PREFIX):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, help_text: str = "") -> Counter:
+        return self._get(Counter, name, help_text)
+
+    def histogram(self, name: str, help_text: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, help_text, buckets)
+
+    def _get(self, cls, name: str, *args):
+        full_name = self.prefix + name
+        with self._lock:
+            metric = self._metrics.get(full_name)
+            if metric is None:
+                metric = self._metrics[full_name] = cls(full_name, *args)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {full_name} is already registered as a {metric.kind}")
+            return metric
+
+    def render_prometheus(self) -> str:
+        """Returns every metric in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        lines = []
+        for metric in metrics:
+            if metric.help:
+                lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, key, value in metric.samples():
+                lines.append(f"{name}{_format_labels(key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> Dict[str, Dict]:
+        """Returns every metric as JSON-serializable data."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return {metric.name: {'type': metric.kind, 'help': metric.help, 'values': metric.snapshot()}
+                for metric in metrics}
+
+
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, help_text: str = "") -> Counter:
+    """Returns (creating if needed) a counter in the default registry."""
+    return REGISTRY.counter(name, help_text)
+
+
+def histogram(name: str, help_text: str = "", buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    """Returns (creating if needed) a histogram in the default registry."""
+    return REGISTRY.histogram(name, help_text, buckets)
+
+
+# Instruments fed by the hot paths
+HTTP_SECONDS = histogram("http_request_seconds", "Time until an HTTP response has arrived, by endpoint.")
+HTTP_ERRORS = counter("http_errors_total", "Failed HTTP requests, by endpoint.")
+PARSE_SECONDS = histogram("parse_seconds", "Time to decode and parse a response body, by kind.")
+PROVIDER_SECONDS = histogram("provider_request_seconds", "Price provider call latency, by provider.")
+PROVIDER_FAILURES = counter("provider_failures_total", "Price provider calls that returned nothing, by provider.")
+FETCH_SECONDS = histogram("quote_fetch_seconds", "Time to fetch one watchlist refresh, hedging and fill-ins included.")
+RENDER_SECONDS = histogram("render_seconds", "Time to update a view with new prices, by view.")
+ALARM_SECONDS = histogram("alarm_evaluation_seconds", "Time to evaluate every alarm against one price update.")
+WRITE_SECONDS = histogram("persistence_write_seconds", "Time to write a data file, by file.")
+WRITE_ERRORS = counter("persistence_errors_total", "Failed data file writes, by file.")
+
+
+def _handler_class():
+    from http.server import BaseHTTPRequestHandler
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass  # Scrapes would otherwise flood the console
+
+        def do_GET(self):
+            registry = self.server.registry
+            path = self.path.split('?', 1)[0]
+            if path in ("/", "/metrics"):
+                body = registry.render_prometheus().encode('utf-8')
+                content_type = "text/plain; version=0.0.4; charset=utf-8"
+            elif path == "/metrics.json":
+                body = json.dumps({'ts': time.time(), 'metrics': registry.to_dict()}).encode('utf-8')
+                content_type = "application/json"
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return MetricsHandler
+
+
+class MetricsServer:
+    """
+    Serves a registry over HTTP from a background thread.
+
+    Binds to 127.0.0.1 by default so the numbers never leave the machine.
+    """
+
+    def __init__(self, port: int, registry: MetricsRegistry = REGISTRY, host: str = "127.0.0.1"):
+        """
+        Args:
+            port (int): TCP port; 0 picks a free one (see `port` after start()).
+            registry (MetricsRegistry): The metrics to expose.
+            host (str): Interface to bind to.
+        """
+        # http.server is only imported when the endpoint is enabled
+        from http.server import ThreadingHTTPServer
+
+        self.httpd = ThreadingHTTPServer((host, port), _handler_class())
+        self.httpd.daemon_threads = True
+        self.httpd.registry = registry
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-server", daemon=True)
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def start(self) -> "MetricsServer":
+        self._thread.start()
+        return self
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def start_metrics_server(port: Optional[int], registry: MetricsRegistry = REGISTRY) -> Optional[MetricsServer]:
+    """
+    Starts the metrics endpoint if a port is configured.
+
+    Returns:
+        Optional[MetricsServer]: The running server, or None if disabled or the port is taken.
+    """
+    if port is None:
+        return None
+    try:
+        server = MetricsServer(port, registry).start()
+    except OSError as e:
+        logger.error("Could not start the metrics endpoint on port %s: %s", port, e)
+        return None
+    logger.info("Metrics available at http://127.0.0.1:%s/metrics", server.port)
+    return server
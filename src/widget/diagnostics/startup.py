@@ -0,0 +1,71 @@
+# QCryptoWidget/src/widget/diagnostics/startup.py
+
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STARTUP_PROFILE_FILE = "startup_profile.txt"
+
+class StartupProfiler:
+    """
+    Records how long each startup phase takes, for --profile-startup.
+
+    Phases are timed back to back from the moment the profiler is created,
+    so the report also shows time spent between explicitly named phases.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self._last = self.start
+        self.phases: List[Tuple[str, float]] = []
+        self.reported = False
+
+    def mark(self, name: str):
+        """Ends the current phase and records it under `name`."""
+        now = time.perf_counter()
+        self.phases.append((name, now - self._last))
+        self._last = now
+
+    @contextmanager
+    def phase(self, name: str):
+        """Times the enclosed block as `name`; any gap before it is recorded as 'other'."""
+        now = time.perf_counter()
+        if now - self._last > 0.0005:
+            self.phases.append(("other", now - self._last))
+        self._last = now
+        try:
+            yield
+        finally:
+            self.mark(name)
+
+    def report(self) -> str:
+        """Formats the recorded phases as a small table."""
+        total = self._last - self.start
+        lines = [f"QCryptoWidget startup profile ({'frozen' if getattr(sys, 'frozen', False) else 'source'} build)"]
+        for name, duration in self.phases:
+            lines.append(f"  {name:<16} {duration * 1000:8.1f} ms")
+        lines.append(f"  {'total':<16} {total * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+    def write_report(self, root_path: Optional[Path] = None):
+        """
+        Prints the report to stderr and, since windowed builds have no console,
+        also writes it to startup_profile.txt in the project root.
+        """
+        if self.reported:
+            return
+        self.reported = True
+        report = self.report()
+        if sys.stderr is not None:
+            print(report, file=sys.stderr)
+        if root_path is not None:
+            try:
+                with open(root_path / STARTUP_PROFILE_FILE, 'w', encoding='utf-8') as f:
+                    f.write(report + "\n")
+            except IOError as e:
+                logger.error("Error writing startup profile: %s", e)
@@ -0,0 +1,107 @@
+# QCryptoWidget/src/widget/hub/client.py
+"""
+asyncio client for the local price hub, used by the headless daemon.
+
+(The widget uses the Qt equivalent, widget.ui.hub_feed.HubFeed.)
+"""
+
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from widget.hub.protocol import (MAX_LINE_BYTES, OP_REFRESH, TYPE_PRICES, decode, encode, parse_address,
+                                 subscription)
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait for the hub to accept a connection
+CONNECT_TIMEOUT = 2.0
+
+
+class HubClient:
+    """
+    A connection to the price hub.
+
+    connect() returns False at once when no hub is running, so callers can
+    fall back to fetching themselves and simply call it again later.
+    """
+
+    def __init__(self, address: str):
+        """
+        Args:
+            address (str): Socket path, or host:port for TCP.
+        """
+        self.address = address
+        self.coins: List[str] = []
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def connect(self, coins: List[str]) -> bool:
+        """Connects and subscribes to the coins. Returns False if the hub is unreachable."""
+        await self.close()
+        target = parse_address(self.address)
+        try:
+            if isinstance(target, tuple):
+                opening = asyncio.open_connection(*target, limit=MAX_LINE_BYTES)
+            else:
+                opening = asyncio.open_unix_connection(target, limit=MAX_LINE_BYTES)
+            self._reader, self._writer = await asyncio.wait_for(opening, CONNECT_TIMEOUT)
+        except (OSError, asyncio.TimeoutError):
+            return False
+        await self.subscribe(coins)
+        return self.connected
+
+    async def subscribe(self, coins: List[str]):
+        """Replaces the subscription (no-op when it didn't change)."""
+        coins = list(coins)
+        if coins == self.coins and self.connected:
+            return
+        self.coins = coins
+        await self._send(subscription(coins))
+
+    async def request_refresh(self):
+        """Asks the hub for a fetch soon."""
+        await self._send({'op': OP_REFRESH})
+
+    async def updates(self) -> AsyncIterator[Tuple[Dict[str, Dict], bool]]:
+        """
+        Yields (quotes, stale) for every prices message until the connection is lost.
+        """
+        while self._reader is not None:
+            try:
+                line = await self._reader.readline()
+            except (OSError, ValueError) as e:
+                logger.warning("Price hub connection failed: %s", e)
+                break
+            if not line:
+                break
+            message = decode(line)
+            if message is None or message.get('type') != TYPE_PRICES:
+                continue
+            data = message.get('data')
+            if isinstance(data, dict):
+                yield data, bool(message.get('stale'))
+        await self.close()
+
+    async def close(self):
+        writer, self._writer, self._reader = self._writer, None, None
+        if writer is not None:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def _send(self, message: Dict):
+        if not self.connected:
+            return
+        try:
+            self._writer.write(encode(message))
+            await self._writer.drain()
+        except OSError as e:
+            logger.warning("Could not reach the price hub: %s", e)
+            await self.close()
@@ -0,0 +1,82 @@
+# QCryptoWidget/src/widget/hub/protocol.py
+"""
+Wire format between the price hub and its clients.
+
+Messages are JSON objects, one per line (NDJSON), over a Unix domain socket
+(or, where there are none, a TCP socket on 127.0.0.1).
+
+Client to hub:
+    {"op": "subscribe", "coins": ["BTC", "ETH"]}   replaces the subscription
+    {"op": "refresh"}                               asks for a fetch soon
+
+Hub to client:
+    {"type": "hello", "version": 1}
+    {"type": "prices", "data": {coin: quote, ...}, "stale": false}
+
+A prices message only holds subscribed coins. Quotes have the shape of
+widget.api.providers.normalize_quote plus 'fetched_at'. "stale" is true
+when the hub's last fetch failed and it is re-sending the last good quotes.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+
+PROTOCOL_VERSION = 1
+
+HUB_SOCKET_FILE = "qcryptowidget-hub.sock"
+# Used instead of a socket file on platforms without Unix domain sockets (Windows)
+DEFAULT_HUB_PORT = 47211
+
+# A line longer than this is a protocol error (about 20 000 quotes)
+MAX_LINE_BYTES = 4 * 1024 * 1024
+
+OP_SUBSCRIBE = "subscribe"
+OP_REFRESH = "refresh"
+TYPE_HELLO = "hello"
+TYPE_PRICES = "prices"
+
+def default_hub_address(root_path: Path) -> str:
+    """Returns where the hub listens by default: a socket file in the project root, or a loopback port."""
+    if hasattr(os, 'fork'):  # POSIX: Unix domain sockets
+        return str(root_path / HUB_SOCKET_FILE)
+    return f"127.0.0.1:{DEFAULT_HUB_PORT}"
+
+def parse_address(address: str) -> Union[str, Tuple[str, int]]:
+    """
+    Splits a hub address into a socket path or a (host, port) pair.
+
+    "host:port" and ":port" are TCP addresses; anything else is a socket path.
+    """
+    host, sep, port = address.rpartition(':')
+    if sep and port.isdigit() and '/' not in address and '\\' not in address:
+        return host or "127.0.0.1", int(port)
+    return address
+
+def encode(message: Dict) -> bytes:
+    """Serializes one message as a line."""
+    return json.dumps(message, separators=(',', ':')).encode('utf-8') + b"\n"
+
+def encode_prices(fragments: Dict[str, bytes], coins, stale: bool = False) -> bytes:
+    """
+    Builds a prices message from quotes serialized beforehand.
+
+    The hub serializes every quote once per update (`fragments`, coin -> JSON
+    bytes) and only joins them here, so the cost per subscriber group is a
+    join rather than a json.dumps of all its quotes.
+    """
+    body = b",".join(b'"%s":%s' % (coin.encode('utf-8'), fragments[coin]) for coin in coins if coin in fragments)
+    return b'{"type":"prices","data":{%s},"stale":%s}\n' % (body, b"true" if stale else b"false")
+
+def decode(line: bytes) -> Optional[Dict]:
+    """Parses one line; returns None for anything that isn't a JSON object."""
+    try:
+        message = json.loads(line)
+    except ValueError:
+        return None
+    return message if isinstance(message, dict) else None
+
+def subscription(coins) -> Dict:
+    """The subscribe message for a list of coin codes."""
+    return {'op': OP_SUBSCRIBE, 'coins': [str(coin).upper() for coin in coins]}
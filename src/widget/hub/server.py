@@ -0,0 +1,354 @@
+# QCryptoWidget/src/widget/hub/server.py
+"""
+Local price hub: fetches quotes once and pushes them to every subscribed client.
+
+Widgets and daemons on the same machine connect over a Unix domain socket
+(a loopback TCP port on Windows), subscribe to their coins and receive
+updates instead of each polling the API. The hub fetches the union of all
+subscriptions on the usual schedule (credit budget, shared quote cache,
+provider failover, circuit breakers), so N clients cost one set of API
+calls. See widget.hub.protocol for the message format.
+"""
+
+import argparse
+import asyncio
+import errno
+import logging
+import os
+import signal
+import sys
+from typing import Dict, FrozenSet, List, Optional, Set
+
+from widget.config.config import load_config
+from widget.api.coin_api import get_client
+from widget.api.credit_budget import CreditBudget, get_credit_usage_path
+from widget.api.providers import build_router
+from widget.api.resilience import STALE_SERVED, backoff_delay
+from widget.api.response_cache import SharedQuoteCache, get_quote_cache_path
+from widget.api.symbol_index import get_symbol_index, is_valid_code
+from widget.diagnostics.logs import setup_logging
+from widget.diagnostics.metrics import counter, start_metrics_server
+from widget.hub.protocol import (MAX_LINE_BYTES, OP_REFRESH, OP_SUBSCRIBE, PROTOCOL_VERSION, TYPE_HELLO,
+                                 decode, encode, encode_prices, parse_address)
+
+logger = logging.getLogger(__name__)
+
+# New subscriptions within this window are served by one fetch
+SUBSCRIBE_DEBOUNCE_SECONDS = 1.0
+# After a failed fetch, retry with jittered backoff between these bounds (never later than the interval)
+RETRY_MIN_SECONDS = 10
+RETRY_MAX_SECONDS = 600
+# A client with more unsent data than this misses updates until it catches up (the next one is complete)
+MAX_CLIENT_BUFFER = 1024 * 1024
+
+MESSAGES_SENT = counter("hub_messages_sent_total", "Price messages the hub wrote to clients.")
+UPDATES_DROPPED = counter("hub_updates_dropped_total", "Price messages skipped for clients that fell behind.")
+
+
+class _Subscriber:
+    """One connected client and the coins it wants."""
+
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.coins: FrozenSet[str] = frozenset()
+        self.behind = False
+
+    def send(self, data: bytes) -> bool:
+        transport = self.writer.transport
+        if transport.is_closing():
+            return False
+        if transport.get_write_buffer_size() > MAX_CLIENT_BUFFER:
+            if not self.behind:
+                logger.warning("A hub client is not reading; skipping updates until it catches up.")
+            self.behind = True
+            UPDATES_DROPPED.inc()
+            return False
+        self.behind = False
+        self.writer.write(data)
+        return True
+
+
+class PriceHub:
+    """
+    Serves quotes for the union of its clients' coins.
+
+    Clients with the same coin list form one group, and each update is
+    serialized once per group (from quotes serialized once per coin), so
+    the cost of an update grows with the number of distinct coin lists,
+    not with the number of clients.
+    """
+
+    def __init__(self, config: Dict, address: str, interval: Optional[float] = None):
+        """
+        Args:
+            config (Dict): The result of load_config().
+            address (str): Socket path, or host:port for TCP.
+            interval (float, optional): Seconds between fetches. None follows the credit budget.
+        """
+        self.config = config
+        self.address = address
+        self.interval = interval
+        root_path = config['root_path']
+        self.budget = CreditBudget(config['daily_credits'], config['monthly_credits'],
+                                   config['min_refresh_seconds'], get_credit_usage_path(root_path))
+        if config['api_key']:
+            get_client(config['api_key']).usage_callback = self.budget.record_response
+        self.router = build_router(config)
+        self.symbol_index = (get_symbol_index(root_path)
+                             if config['api_key'] and 'cmc' in config['price_providers'] else None)
+        self.quote_cache = SharedQuoteCache(get_quote_cache_path(config['quote_cache_dir']),
+                                            ttl=config['quote_cache_ttl'])
+        self.subscribers: Set[_Subscriber] = set()
+        # Last good quote per coin, as the dict and as serialized JSON
+        self.latest: Dict[str, Dict] = {}
+        self.fragments: Dict[str, bytes] = {}
+        self.stale = False
+        self.failures = 0
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._groups: Optional[Dict[FrozenSet[str], List[_Subscriber]]] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._handlers: Set[asyncio.Task] = set()
+
+    def coins(self) -> List[str]:
+        """Returns every coin some client is subscribed to."""
+        return sorted(set().union(*(subscriber.coins for subscriber in self.subscribers)))
+
+    def groups(self) -> Dict[FrozenSet[str], List[_Subscriber]]:
+        """Returns the clients grouped by coin list (rebuilt only after subscriptions change)."""
+        if self._groups is None:
+            groups: Dict[FrozenSet[str], List[_Subscriber]] = {}
+            for subscriber in self.subscribers:
+                if subscriber.coins:
+                    groups.setdefault(subscriber.coins, []).append(subscriber)
+            self._groups = groups
+        return self._groups
+
+    def subscribe(self, subscriber: _Subscriber, coins):
+        """Replaces a client's subscription and sends it what is already known."""
+        if not isinstance(coins, list):
+            return
+        wanted = frozenset(str(coin).upper() for coin in coins if is_valid_code(str(coin).upper()))
+        new_coins = wanted - set(self.coins())
+        self.subscribers.add(subscriber)
+        subscriber.coins = wanted
+        self._groups = None
+        known = [coin for coin in sorted(wanted) if coin in self.fragments]
+        if known:
+            subscriber.send(encode_prices(self.fragments, known, self.stale))
+        if new_coins:
+            self.request_refresh()
+
+    def unsubscribe(self, subscriber: _Subscriber):
+        self.subscribers.discard(subscriber)
+        self._groups = None
+
+    def request_refresh(self):
+        """Wakes the fetch loop early (it still waits for the debounce window and the budget's minimum gap)."""
+        if self._wake is not None:
+            self._wake.set()
+
+    def publish(self, prices: Dict[str, Dict], stale: bool = False):
+        """
+        Stores an update and sends each group its coins from it.
+
+        Args:
+            prices (Dict[str, Dict]): Quotes keyed by coin code.
+            stale (bool): Whether these are the last good quotes re-sent after a failed fetch.
+        """
+        for coin, quote in prices.items():
+            self.latest[coin] = quote
+            self.fragments[coin] = encode(quote)[:-1]
+        self.stale = stale
+        for coins, members in self.groups().items():
+            updated = coins & prices.keys()
+            if not updated:
+                continue
+            message = encode_prices(self.fragments, sorted(updated), stale)
+            MESSAGES_SENT.inc(sum(subscriber.send(message) for subscriber in members))
+
+    def fetch(self, coins: List[str]) -> Optional[Dict]:
+        """Fetches quotes through the shared cache; runs in an executor thread."""
+        return self.quote_cache.get_prices(coins, self.router.get_prices)
+
+    async def refresh(self):
+        """Fetches every subscribed coin once and publishes the result."""
+        coins = self.coins()
+        if not coins:
+            return
+        loop = asyncio.get_running_loop()
+        prices = await loop.run_in_executor(None, self.fetch, coins)
+        if prices is None:
+            self.failures += 1
+            logger.warning("Could not fetch new prices; clients keep the last good quotes.")
+            known = {coin: self.latest[coin] for coin in coins if coin in self.latest}
+            if known:
+                STALE_SERVED.inc()
+                self.publish(known, stale=True)
+            return
+        self.failures = 0
+        self.publish(prices)
+
+    def next_interval(self) -> float:
+        """Seconds until the next scheduled fetch."""
+        interval = self.interval
+        if interval is None:
+            # Credit-free providers only: the budget falls back to its minimum interval
+            interval = self.budget.next_interval(len(self.coins()) if self.router.costs_credits else 0)
+        if self.failures:
+            retry = max(RETRY_MIN_SECONDS, backoff_delay(self.failures - 1, RETRY_MIN_SECONDS, RETRY_MAX_SECONDS),
+                        self.router.retry_in())
+            interval = min(interval, retry)
+        return max(interval, self.budget.backoff_remaining())
+
+    async def start(self):
+        """Starts listening. Raises OSError if the address is taken (e.g. another hub runs)."""
+        self._wake = asyncio.Event()
+        target = parse_address(self.address)
+        if isinstance(target, tuple):
+            self.server = await asyncio.start_server(self._handle, *target, limit=MAX_LINE_BYTES)
+            return
+        if os.path.exists(target):
+            if await _accepts_connections(target):
+                raise OSError(errno.EADDRINUSE, f"A hub is already running at {target}")
+            os.unlink(target)  # Left over from a hub that didn't shut down cleanly
+        self.server = await asyncio.start_unix_server(self._handle, target, limit=MAX_LINE_BYTES)
+
+    async def run(self):
+        """Serves clients and runs the fetch loop until cancelled."""
+        await self.start()
+        logger.info("Price hub listening on %s.", self.address)
+        try:
+            await self._fetch_loop()
+        finally:
+            self.close()
+            # Let the connection handlers see their sockets close and finish
+            if self._handlers:
+                await asyncio.wait(self._handlers, timeout=1)
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+            self.server = None
+            if not isinstance(parse_address(self.address), tuple):
+                try:
+                    os.unlink(self.address)
+                except OSError:
+                    pass
+        for subscriber in list(self.subscribers):
+            subscriber.writer.close()
+        self.subscribers.clear()
+        self._groups = None
+        self.router.close()
+
+    async def _fetch_loop(self):
+        while True:
+            if self.symbol_index is not None:
+                self.symbol_index.refresh_in_background(get_client(self.config['api_key']))
+            # Cleared before fetching: a subscription arriving during the fetch must wake the next one
+            self._wake.clear()
+            await self.refresh()
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.next_interval())
+            except asyncio.TimeoutError:
+                continue
+            # Woken by a new subscription: let others arrive, and respect the budget's minimum gap
+            await asyncio.sleep(max(SUBSCRIBE_DEBOUNCE_SECONDS, self.budget.min_gap_remaining(),
+                                    self.budget.backoff_remaining()))
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        subscriber = _Subscriber(writer)
+        self.subscribers.add(subscriber)
+        self._handlers.add(asyncio.current_task())
+        writer.write(encode({'type': TYPE_HELLO, 'version': PROTOCOL_VERSION}))
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                message = decode(line)
+                if message is None:
+                    logger.warning("Ignoring malformed hub message.")
+                    continue
+                op = message.get('op')
+                if op == OP_SUBSCRIBE:
+                    self.subscribe(subscriber, message.get('coins'))
+                elif op == OP_REFRESH:
+                    self.request_refresh()
+        except ConnectionError:
+            pass  # The client went away mid-message; same as a clean disconnect
+        except ValueError as e:
+            # A line longer than MAX_LINE_BYTES
+            logger.warning("Dropping hub client: %s", e)
+        finally:
+            self.unsubscribe(subscriber)
+            self._handlers.discard(asyncio.current_task())
+            writer.close()
+
+
+async def _serve(hub: PriceHub):
+    # Stop cleanly (removing the socket file) on SIGTERM too, not just Ctrl+C
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except (NotImplementedError, AttributeError):
+        pass  # Windows
+    try:
+        await hub.run()
+    except asyncio.CancelledError:
+        pass
+
+
+async def _accepts_connections(path: str) -> bool:
+    try:
+        _, writer = await asyncio.open_unix_connection(path)
+    except OSError:
+        return False
+    writer.close()
+    return True
+
+
+def main(argv: Optional[List[str]] = None):
+    """
+    Entry point for `qcryptowidget-hub`.
+    """
+    parser = argparse.ArgumentParser(prog="qcryptowidget-hub", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--address', default=None,
+                        help="Socket path, or host:port for TCP (default: HUB_ADDRESS from .env, "
+                             "else a socket in the project root, or 127.0.0.1:47211 on Windows)")
+    parser.add_argument('--interval', default='auto',
+                        help="Minutes between fetches, or 'auto' to follow the credit budget (default)")
+    args = parser.parse_args(argv)
+
+    try:
+        config = load_config("hub")
+    except ValueError as e:
+        logger.error("Configuration error: %s", e)
+        sys.exit(2)
+    setup_logging(config['log_file'], config['log_level'])
+    metrics_server = start_metrics_server(config['metrics_port'])
+
+    interval = None
+    if args.interval != 'auto':
+        try:
+            interval = float(args.interval) * 60
+        except ValueError:
+            parser.error("--interval must be a number of minutes or 'auto'")
+    address = args.address or config['hub_address']
+    if not address:
+        parser.error("HUB_ADDRESS is 'off'; pass --address to run a hub anyway")
+
+    hub = PriceHub(config, address, interval)
+    try:
+        asyncio.run(_serve(hub))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        logger.error("Could not start the price hub: %s", e)
+        sys.exit(1)
+    finally:
+        if metrics_server:
+            metrics_server.close()
+
+
+if __name__ == '__main__':
+    main()
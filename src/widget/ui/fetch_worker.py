@@ -0,0 +1,82 @@
+# QCryptoWidget/src/widget/ui/fetch_worker.py
+
+import logging
+from typing import Callable, Dict, List, Optional
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+logger = logging.getLogger(__name__)
+
+
+class _FetchSignals(QObject):
+    """Carries results from a worker thread back to the GUI thread."""
+    finished = Signal(int, object)
+
+
+class _FetchTask(QRunnable):
+    """Runs a single price fetch on a QThreadPool thread."""
+
+    def __init__(self, generation: int, fetch_fn: Callable, coins: List[str], signals: _FetchSignals):
+        super().__init__()
+        self.generation = generation
+        self.fetch_fn = fetch_fn
+        self.coins = coins
+        self.signals = signals
+
+    def run(self):
+        try:
+            result = self.fetch_fn(self.coins)
+        except Exception as e:
+            logger.exception("Background price fetch failed: %s", e)
+            result = None
+        self.signals.finished.emit(self.generation, result)
+
+
+class PriceFetcher(QObject):
+    """
+    Fetches prices in the background so the GUI thread never blocks on I/O.
+
+    Every call to fetch() starts a new generation. Results from older
+    generations are dropped when they arrive, so a slow response for an
+    outdated coin list can never overwrite newer data.
+    """
+    prices_ready = Signal(dict)
+    fetch_failed = Signal()
+
+    def __init__(self, fetch_fn: Callable[[List[str]], Optional[Dict]], parent=None):
+        """
+        Args:
+            fetch_fn (Callable): Called on a worker thread with the list of coin
+                codes. Returns a price dict, or None on failure.
+            parent (QObject, optional): The Qt parent object.
+        """
+        super().__init__(parent)
+        self.fetch_fn = fetch_fn
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(2)
+        self._generation = 0
+        self._signals = _FetchSignals(self)
+        self._signals.finished.connect(self._on_task_finished)
+
+    def fetch(self, coins: List[str]):
+        """Starts a background fetch, superseding any request still in flight."""
+        self._generation += 1
+        # Pass a copy so edits to the caller's list can't race the worker thread
+        task = _FetchTask(self._generation, self.fetch_fn, list(coins), self._signals)
+        self.pool.start(task)
+
+    def invalidate(self):
+        """Drops the results of every request currently in flight."""
+        self._generation += 1
+
+    def is_busy(self) -> bool:
+        """Returns True while at least one fetch is still running."""
+        return self.pool.activeThreadCount() > 0
+
+    def _on_task_finished(self, generation: int, result: Optional[Dict]):
+        if generation != self._generation:
+            return  # Out-of-date request, a newer one has been issued
+        if result is None:
+            self.fetch_failed.emit()
+        else:
+            self.prices_ready.emit(result)
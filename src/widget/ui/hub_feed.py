@@ -0,0 +1,136 @@
+# QCryptoWidget/src/widget/ui/hub_feed.py
+
+import logging
+from typing import List
+
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtNetwork import QLocalSocket, QTcpSocket
+
+from widget.hub.protocol import OP_REFRESH, TYPE_PRICES, decode, encode, parse_address, subscription
+
+logger = logging.getLogger(__name__)
+
+# Delays between attempts to reach the hub; they grow from the first to the last value, then stay there
+RECONNECT_DELAYS_MS = [2000, 5000, 15000, 30000, 60000]
+
+
+class HubFeed(QObject):
+    """
+    Receives prices from the local price hub (widget.hub.server).
+
+    While connected, the widget stops polling and shows what the hub pushes.
+    If no hub is running the feed keeps trying in the background with
+    growing delays and the widget fetches on its own; hub_connected and
+    hub_lost mark the switches between the two.
+    """
+    prices_updated = Signal(dict, bool)  # quotes, stale
+    hub_connected = Signal()
+    hub_lost = Signal()
+
+    def __init__(self, address: str, parent=None):
+        super().__init__(parent)
+        self.address = address
+        self.connected = False
+        self._coins: List[str] = []
+        self._running = False
+        self._reconnect_attempt = 0
+        self.socket = None
+
+        self._reconnect_timer = QTimer(self)
+        self._reconnect_timer.setSingleShot(True)
+        self._reconnect_timer.timeout.connect(self._open)
+
+    def start(self, coins: List[str]):
+        """Connects to the hub (retrying until it is up) and subscribes to the coins."""
+        self._running = True
+        self._coins = list(coins)
+        self._open()
+
+    def stop(self):
+        """Disconnects without reporting a loss."""
+        self._running = False
+        self._reconnect_timer.stop()
+        self._discard_socket()
+
+    def set_coins(self, coins: List[str]):
+        """Replaces the subscription when the tracked coin list changes."""
+        coins = list(coins)
+        if coins == self._coins:
+            return
+        self._coins = coins
+        if self.connected:
+            self._send(subscription(coins))
+
+    def request_refresh(self):
+        """Asks the hub for a fetch soon."""
+        if self.connected:
+            self._send({'op': OP_REFRESH})
+
+    def _send(self, message):
+        self.socket.write(encode(message))
+
+    def _discard_socket(self):
+        # Disconnect first so closing an outdated socket is never reported as a loss
+        socket, self.socket = self.socket, None
+        self.connected = False
+        if socket is not None:
+            socket.connected.disconnect(self._on_connected)
+            socket.disconnected.disconnect(self._on_disconnected)
+            socket.errorOccurred.disconnect(self._on_error)
+            socket.readyRead.disconnect(self._on_ready_read)
+            socket.abort()
+            socket.deleteLater()
+
+    def _open(self):
+        self._reconnect_timer.stop()
+        self._discard_socket()
+        if not self._running:
+            return
+        target = parse_address(self.address)
+        self.socket = QTcpSocket(self) if isinstance(target, tuple) else QLocalSocket(self)
+        self.socket.connected.connect(self._on_connected)
+        self.socket.disconnected.connect(self._on_disconnected)
+        self.socket.errorOccurred.connect(self._on_error)
+        self.socket.readyRead.connect(self._on_ready_read)
+        if isinstance(target, tuple):
+            self.socket.connectToHost(*target)
+        else:
+            self.socket.connectToServer(target)
+
+    def _on_connected(self):
+        self.connected = True
+        self._reconnect_attempt = 0
+        self._send(subscription(self._coins))
+        logger.info("Receiving prices from the hub at %s.", self.address)
+        self.hub_connected.emit()
+
+    def _on_disconnected(self):
+        self._handle_loss()
+
+    def _on_error(self, _error):
+        # Also raised when no hub is running; the widget is fetching on its own then
+        self._handle_loss()
+
+    def _handle_loss(self):
+        if self.socket is None:
+            return  # Already handled (errorOccurred and disconnected can both fire)
+        was_connected = self.connected
+        self._discard_socket()
+        if not self._running:
+            return
+        if was_connected:
+            logger.warning("Lost the price hub; fetching prices directly.")
+            self.hub_lost.emit()
+        delay = RECONNECT_DELAYS_MS[min(self._reconnect_attempt, len(RECONNECT_DELAYS_MS) - 1)]
+        self._reconnect_attempt += 1
+        self._reconnect_timer.start(delay)
+
+    def _on_ready_read(self):
+        socket = self.socket
+        while socket is self.socket and socket.canReadLine():
+            message = decode(bytes(socket.readLine()))
+            if message is None or message.get('type') != TYPE_PRICES:
+                continue
+            data = message.get('data')
+            if isinstance(data, dict):
+                self.prices_updated.emit(data, bool(message.get('stale')))
@@ -0,0 +1,311 @@
+# QCryptoWidget/src/widget/ui/price_model.py
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+from PySide6.QtCore import (Qt, QAbstractTableModel, QEvent, QModelIndex, QRect, Signal)
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QPainter
+from PySide6.QtWidgets import QStyle, QStyledItemDelegate, QStyleOptionViewItem
+
+from widget.data.price_snapshot import PRICE, PriceSnapshot
+
+COL_COIN, COL_PRICE, COL_SPARK, COL_INFO = range(4)
+COLUMN_COUNT = 4
+
+# Custom roles used by PriceDelegate
+PricePartsRole = Qt.ItemDataRole.UserRole + 1
+SlugRole = Qt.ItemDataRole.UserRole + 2
+ArrowRole = Qt.ItemDataRole.UserRole + 3
+SparklineRole = Qt.ItemDataRole.UserRole + 4
+
+NEUTRAL_COLOR = "#F0F0F0"
+UP_COLOR = "#32CD32"
+DOWN_COLOR = "#FF4500"
+
+
+def format_price_parts(price: float, symbol: str = "$", decimals: int = 4) -> Tuple[str, str]:
+    """
+    Splits a price into the bold integer part and the italic fraction shown in the list.
+
+    Args:
+        price (float): The price to format.
+        symbol (str): Currency prefix, e.g. "$" or "€".
+        decimals (int): Fraction digits to keep (trailing zeros are dropped).
+
+    Returns:
+        Tuple[str, str]: e.g. ("$65,000", ".1234") for 65000.1234.
+    """
+    price_str = f"{price:,.{decimals}f}"
+    parts = price_str.split('.')
+    integer_part = parts[0]
+    fractional_part = ""
+    if len(parts) > 1:
+        fractional_part = f".{parts[1]}".rstrip('0').rstrip('.')
+    return f"{symbol}{integer_part}", fractional_part
+
+
+def change_style(percent_change: float) -> Tuple[str, str]:
+    """Returns the (arrow, color) pair for a percent change."""
+    if percent_change > 0:
+        return "▲", UP_COLOR
+    if percent_change < 0:
+        return "▼", DOWN_COLOR
+    return "●", NEUTRAL_COLOR
+
+
+class _Row:
+    """Display values cached for one coin so data() never reformats on paint."""
+    __slots__ = ("coin", "price", "currency", "change", "slug", "parts", "arrow", "color")
+
+    def __init__(self, coin: str):
+        self.coin = coin
+        self.price = None
+        self.currency = None
+        self.change = None
+        self.slug = ""
+        self.parts = ("", "")
+        self.arrow = "●"
+        self.color = QColor(NEUTRAL_COLOR)
+
+    def set_price(self, price: float, currency: Tuple[str, int]):
+        """`currency` is (symbol, decimals)."""
+        self.price = price
+        self.currency = currency
+        self.parts = format_price_parts(price, *currency)
+
+    def set_change(self, change: float):
+        self.change = change
+        arrow, color = change_style(change)
+        self.arrow = arrow
+        self.color = QColor(color)
+
+
+class PriceTableModel(QAbstractTableModel):
+    """
+    Table model for the price list.
+
+    Rows are only rebuilt when the set of displayed coins changes. A price
+    refresh compares the snapshot's columns with the values on screen in one
+    vectorized pass, reformats only the rows that differ and emits
+    dataChanged for just those.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows: List[_Row] = []
+        self._coins: List[str] = []
+        # What the rows currently show, as columns
+        self._prices = np.empty(0)
+        self._changes = np.empty(0)
+        self._currency: Optional[Tuple[str, int]] = None
+        self._slug_version = -1
+        self._change_interval = '24h'
+        self._bold_font = QFont()
+        self._bold_font.setBold(True)
+        self._coin_color = QColor("white")
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else COLUMN_COUNT
+
+    def coin_at(self, row: int) -> Optional[str]:
+        """Returns the coin code shown in a row."""
+        if 0 <= row < len(self._rows):
+            return self._rows[row].coin
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == COL_COIN:
+                return row.coin
+            if column == COL_PRICE:
+                return row.arrow + " " + "".join(row.parts)
+            if column == COL_INFO:
+                return "Info"
+        elif role == Qt.ItemDataRole.ForegroundRole and column == COL_COIN:
+            return self._coin_color
+        elif role == Qt.ItemDataRole.FontRole and column == COL_COIN:
+            return self._bold_font
+        elif role == Qt.ItemDataRole.TextAlignmentRole:
+            return int(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter)
+        elif role == PricePartsRole and column == COL_PRICE:
+            return row.parts
+        elif role == ArrowRole and column == COL_PRICE:
+            return row.arrow, row.color
+        elif role == SparklineRole and column == COL_SPARK:
+            return row.coin, self._change_interval
+        elif role == SlugRole:
+            return row.slug
+        return None
+
+    def set_prices(self, coins: List[str], price_data: PriceSnapshot, change_interval: str,
+                   currency: Tuple[str, int] = ("$", 4)):
+        """
+        Synchronizes the model with the current coins and prices.
+
+        Args:
+            coins (List[str]): The tracked coins, in display order.
+            price_data (PriceSnapshot): Latest prices, in the display currency
+                (a dictionary of quotes keyed by coin code is converted).
+            change_interval (str): Either '24h' or '7d'.
+            currency (Tuple[str, int]): The display currency's (symbol, fraction digits).
+        """
+        if not isinstance(price_data, PriceSnapshot):
+            price_data = PriceSnapshot.from_quotes(price_data)
+            self._slug_version = -1  # A new snapshot each time: its slug_version means nothing
+        visible = [coin for coin in coins if coin in price_data]
+        rows = price_data.rows(visible)
+        prices = price_data.column(PRICE)[rows]
+        changes = np.nan_to_num(price_data.change(change_interval)[rows])
+        interval_changed = change_interval != self._change_interval
+        self._change_interval = change_interval
+        if visible != self._coins:
+            self.beginResetModel()
+            self._coins = visible
+            self._rows = [_Row(coin) for coin in visible]
+            self._slug_version = -1
+            for row, price, change in zip(self._rows, prices.tolist(), changes.tolist()):
+                row.set_price(price, currency)
+                row.set_change(change)
+            self._store(price_data, prices, changes, currency)
+            self.endResetModel()
+            return
+
+        price_changed = prices != self._prices
+        if currency != self._currency:
+            price_changed[:] = True
+        change_changed = changes != self._changes
+        for i in np.flatnonzero(price_changed).tolist():
+            self._rows[i].set_price(float(prices[i]), currency)
+        for i in np.flatnonzero(change_changed).tolist():
+            self._rows[i].set_change(float(changes[i]))
+        self._store(price_data, prices, changes, currency)
+
+        changed = np.flatnonzero(price_changed | change_changed)
+        if len(changed):
+            # Runs of consecutive rows, one dataChanged each
+            breaks = np.flatnonzero(np.diff(changed) != 1)
+            firsts = [changed[0]] + changed[breaks + 1].tolist()
+            lasts = changed[breaks].tolist() + [changed[-1]]
+            for first, last in zip(firsts, lasts):
+                self._emit_rows_changed(int(first), int(last))
+        if interval_changed and self._rows:
+            # Sparklines follow the change interval's window
+            self.dataChanged.emit(self.index(0, COL_SPARK), self.index(len(self._rows) - 1, COL_SPARK))
+
+    def _store(self, price_data: PriceSnapshot, prices: np.ndarray, changes: np.ndarray,
+               currency: Tuple[str, int]):
+        self._prices = prices
+        self._changes = changes
+        self._currency = currency
+        if price_data.slug_version != self._slug_version:
+            self._slug_version = price_data.slug_version
+            for row in self._rows:
+                row.slug = price_data.slug(row.coin)
+
+    def _emit_rows_changed(self, first: int, last: int):
+        # New prices also extend the row's sparkline
+        self.dataChanged.emit(self.index(first, COL_PRICE), self.index(last, COL_SPARK))
+
+
+class PriceDelegate(QStyledItemDelegate):
+    """
+    Paints the bold/italic price text, the sparkline and the per-row "Info" button.
+
+    The button is drawn rather than instantiated, so the list never owns
+    one widget per row; clicks are routed through info_clicked. Sparklines
+    come pre-rendered from a SparklineCache, if one is given.
+    """
+    info_clicked = Signal(str)
+
+    BUTTON_WIDTH = 60
+    BUTTON_HEIGHT = 28
+    ARROW_MARGIN = 5
+    SPARKLINE_WIDTH = 80
+
+    def __init__(self, parent=None, sparklines=None):
+        super().__init__(parent)
+        self.sparklines = sparklines
+
+    def paint(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
+        column = index.column()
+        if column == COL_PRICE:
+            self._paint_price(painter, option, index)
+        elif column == COL_SPARK:
+            self._paint_sparkline(painter, option, index)
+        elif column == COL_INFO:
+            self._paint_button(painter, option)
+        else:
+            super().paint(painter, option, index)
+
+    def _paint_price(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
+        # Arrow and price are centered together, like the old stretch-arrow-price-stretch row
+        integer_part, fractional_part = index.data(PricePartsRole)
+        arrow, arrow_color = index.data(ArrowRole)
+        bold = QFont(option.font)
+        bold.setBold(True)
+        italic = QFont(option.font)
+        italic.setItalic(True)
+        arrow_font = QFont(option.font)
+        arrow_font.setPixelSize(12)
+        arrow_width = QFontMetrics(arrow_font).horizontalAdvance(arrow) + self.ARROW_MARGIN
+        bold_width = QFontMetrics(bold).horizontalAdvance(integer_part)
+        italic_width = QFontMetrics(italic).horizontalAdvance(fractional_part)
+        rect = option.rect
+        x = rect.left() + (rect.width() - arrow_width - bold_width - italic_width) // 2
+        painter.save()
+        painter.setFont(arrow_font)
+        painter.setPen(arrow_color)
+        painter.drawText(QRect(x, rect.top(), arrow_width, rect.height()),
+                         Qt.AlignmentFlag.AlignVCenter, arrow)
+        x += arrow_width
+        painter.setPen(option.palette.text().color())
+        painter.setFont(bold)
+        painter.drawText(QRect(x, rect.top(), bold_width, rect.height()),
+                         Qt.AlignmentFlag.AlignVCenter, integer_part)
+        painter.setFont(italic)
+        painter.drawText(QRect(x + bold_width, rect.top(), italic_width, rect.height()),
+                         Qt.AlignmentFlag.AlignVCenter, fractional_part)
+        painter.restore()
+
+    def _paint_sparkline(self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex):
+        if self.sparklines is None:
+            return
+        coin, window = index.data(SparklineRole)
+        rect = option.rect
+        pixmap = self.sparklines.pixmap(coin, window, rect.width(), rect.height(),
+                                        painter.device().devicePixelRatioF())
+        if pixmap is not None:
+            painter.drawPixmap(rect.topLeft(), pixmap)
+
+    def _button_rect(self, cell: QRect) -> QRect:
+        width = min(self.BUTTON_WIDTH, cell.width())
+        height = min(self.BUTTON_HEIGHT, cell.height())
+        return QRect(cell.right() - width + 1, cell.top() + (cell.height() - height) // 2, width, height)
+
+    def _paint_button(self, painter: QPainter, option: QStyleOptionViewItem):
+        # Colors follow the QPushButton rules in DARK_STYLESHEET
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        rect = self._button_rect(option.rect).adjusted(0, 0, -1, -1)
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(QColor("#777777"))
+        painter.setBrush(QColor("#666666" if hovered else "#555555"))
+        painter.drawRoundedRect(rect, 3, 3)
+        painter.setPen(option.palette.text().color())
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, "Info")
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if (index.column() == COL_INFO and event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton
+                and self._button_rect(option.rect).contains(event.position().toPoint())):
+            self.info_clicked.emit(index.data(SlugRole) or "")
+            return True
+        return super().editorEvent(event, model, option, index)
@@ -0,0 +1,169 @@
+# QCryptoWidget/src/widget/ui/price_stream.py
+
+import json
+import logging
+from typing import Dict, List
+
+from PySide6.QtCore import QObject, QTimer, QUrl, Signal
+from PySide6.QtWebSockets import QWebSocket
+
+logger = logging.getLogger(__name__)
+
+BINANCE_STREAM_URL = "wss://stream.binance.com:9443/stream"
+
+# Reconnect delays grow from the first to the last value, then stay there
+RECONNECT_DELAYS_MS = [2000, 5000, 15000, 30000, 60000]
+# The ticker stream pushes every second; this much silence means the stream is dead
+WATCHDOG_MS = 30000
+
+
+class PriceStream(QObject):
+    """
+    Streams live prices from a Binance-style combined 24h ticker WebSocket.
+
+    Incoming ticks are coalesced so prices_updated fires at most
+    max_updates_per_second times per second, carrying every coin that changed
+    since the previous emission. stream_lost is emitted when the connection
+    drops (the caller should fall back to REST polling); reconnection is then
+    attempted with backoff and stream_restored is emitted once it succeeds.
+    """
+    prices_updated = Signal(dict)
+    stream_lost = Signal()
+    stream_restored = Signal()
+
+    def __init__(self, base_url: str = BINANCE_STREAM_URL, max_updates_per_second: float = 2,
+                 quote_asset: str = "USDT", parent=None):
+        super().__init__(parent)
+        self.base_url = base_url
+        self.quote_asset = quote_asset.upper()
+        self.connected = False
+        self._coins: List[str] = []
+        self._symbol_map: Dict[str, str] = {}
+        self._pending: Dict[str, Dict] = {}
+        self._running = False
+        self._lost_reported = False
+        self._reconnect_attempt = 0
+
+        self.socket = None
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(max(1, int(1000 / max(max_updates_per_second, 0.001))))
+        self._flush_timer.timeout.connect(self._flush)
+
+        self._reconnect_timer = QTimer(self)
+        self._reconnect_timer.setSingleShot(True)
+        self._reconnect_timer.timeout.connect(self._open)
+
+        self._watchdog = QTimer(self)
+        self._watchdog.setSingleShot(True)
+        self._watchdog.setInterval(WATCHDOG_MS)
+        self._watchdog.timeout.connect(self._on_watchdog)
+
+    def start(self, coins: List[str]):
+        """Connects and subscribes to the tickers of the given coins."""
+        self._running = True
+        self.set_coins(coins)
+
+    def stop(self):
+        """Closes the stream without triggering a fallback."""
+        self._running = False
+        self._reconnect_timer.stop()
+        self._watchdog.stop()
+        self._flush_timer.stop()
+        self._pending.clear()
+        self._discard_socket()
+
+    def set_coins(self, coins: List[str]):
+        """Re-subscribes when the tracked coin list changes."""
+        coins = list(coins)
+        if coins == self._coins and self.socket is not None:
+            return
+        self._coins = coins
+        self._symbol_map = {f"{coin}{self.quote_asset}": coin for coin in coins}
+        if self._running:
+            self._open()
+
+    def stream_url(self) -> str:
+        """Returns the combined-stream URL for the current coins."""
+        streams = "/".join(f"{symbol.lower()}@ticker" for symbol in self._symbol_map)
+        return f"{self.base_url}?streams={streams}"
+
+    def _discard_socket(self):
+        # Disconnect first so closing an outdated socket is never reported as a loss
+        socket, self.socket = self.socket, None
+        self.connected = False
+        if socket is not None:
+            socket.connected.disconnect(self._on_connected)
+            socket.disconnected.disconnect(self._on_disconnected)
+            socket.textMessageReceived.disconnect(self._on_message)
+            socket.abort()
+            socket.deleteLater()
+
+    def _open(self):
+        self._reconnect_timer.stop()
+        self._discard_socket()
+        if not self._running or not self._coins:
+            return
+        self.socket = QWebSocket()
+        self.socket.setParent(self)
+        self.socket.connected.connect(self._on_connected)
+        self.socket.disconnected.connect(self._on_disconnected)
+        self.socket.textMessageReceived.connect(self._on_message)
+        self.socket.open(QUrl(self.stream_url()))
+        self._watchdog.start()
+
+    def _on_connected(self):
+        self.connected = True
+        self._reconnect_attempt = 0
+        self._watchdog.start()
+        if self._lost_reported:
+            self._lost_reported = False
+            self.stream_restored.emit()
+        logger.info("Price stream connected (%d coins).", len(self._coins))
+
+    def _on_disconnected(self):
+        error = self.socket.errorString() if self.socket is not None else ""
+        self._handle_loss(error)
+
+    def _on_watchdog(self):
+        # No ticks (or no handshake) for too long
+        self._handle_loss("no data received")
+
+    def _handle_loss(self, reason: str):
+        was_connected = self.connected
+        self._watchdog.stop()
+        self._discard_socket()
+        if not self._running:
+            return
+        if was_connected or not self._lost_reported:
+            logger.warning("Price stream lost: %s", reason)
+        if not self._lost_reported:
+            self._lost_reported = True
+            self.stream_lost.emit()
+        delay = RECONNECT_DELAYS_MS[min(self._reconnect_attempt, len(RECONNECT_DELAYS_MS) - 1)]
+        self._reconnect_attempt += 1
+        self._reconnect_timer.start(delay)
+
+    def _on_message(self, message: str):
+        self._watchdog.start()
+        try:
+            payload = json.loads(message)
+            ticker = payload.get('data', payload)
+            coin = self._symbol_map.get(ticker['s'])
+            if coin is None:
+                return
+            self._pending[coin] = {
+                'price': float(ticker['c']),
+                'percent_change_24h': float(ticker['P']),
+            }
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning("Ignoring malformed stream message: %s", e)
+            return
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _flush(self):
+        if self._pending:
+            updates, self._pending = self._pending, {}
+            self.prices_updated.emit(updates)
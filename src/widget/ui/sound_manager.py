@@ -0,0 +1,105 @@
+# QCryptoWidget/src/widget/ui/sound_manager.py
+
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+from PySide6.QtCore import QObject, QUrl
+
+logger = logging.getLogger(__name__)
+
+# Effects preloaded per sound file; this many alarms with the same sound can play at once
+DEFAULT_POOL_SIZE = 3
+
+
+class SoundManager(QObject):
+    """
+    Keeps alarm sounds decoded in memory so they play without disk I/O.
+
+    sync() loads a small pool of QSoundEffect objects for every sound file in
+    use and drops pools for files no longer referenced. play() starts an idle
+    effect from the file's pool (or restarts the one started longest ago), so
+    alarms firing in the same tick overlap instead of cutting each other off.
+    QtMultimedia is only imported once there is a sound to load.
+    """
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE, parent=None):
+        super().__init__(parent)
+        self.pool_size = max(1, pool_size)
+        self._pools: Dict[str, List] = {}
+        # Index of the next effect to use per file when every effect is playing
+        self._next: Dict[str, int] = {}
+        self._available = True
+
+    def sync(self, paths: Iterable[str]):
+        """
+        Preloads the given sound files and evicts all others.
+
+        Args:
+            paths (Iterable[str]): Sound file paths, e.g. the 'sound' field of every alarm.
+                Empty and missing paths are ignored.
+        """
+        wanted = {path for path in paths if path and Path(path).is_file()}
+        for path in set(self._pools) - wanted:
+            self._evict(path)
+        for path in wanted - set(self._pools):
+            self._load(path)
+
+    def play(self, path: str) -> bool:
+        """
+        Plays a sound file, loading it first if sync() hasn't.
+
+        Returns:
+            bool: True if playback was started.
+        """
+        if not path:
+            return False
+        if path not in self._pools:
+            if not Path(path).is_file():
+                return False
+            self._load(path)
+        pool = self._pools.get(path)
+        if not pool:
+            return False
+        effect = next((effect for effect in pool if not effect.isPlaying()), None)
+        if effect is None:
+            index = self._next[path]
+            self._next[path] = (index + 1) % len(pool)
+            effect = pool[index]
+            effect.stop()
+        effect.play()
+        return True
+
+    def loaded(self) -> List[str]:
+        """Returns the paths of the sound files currently held in memory."""
+        return list(self._pools)
+
+    def clear(self):
+        """Releases every preloaded sound."""
+        for path in list(self._pools):
+            self._evict(path)
+
+    def _load(self, path: str):
+        if not self._available:
+            return
+        try:
+            # QtMultimedia is heavy to load; import it only when a sound is actually used
+            from PySide6.QtMultimedia import QSoundEffect
+        except ImportError as e:
+            logger.warning("Alarm sounds are disabled: QtMultimedia is unavailable (%s).", e)
+            self._available = False
+            return
+        url = QUrl.fromLocalFile(path)
+        pool = []
+        for _ in range(self.pool_size):
+            effect = QSoundEffect(self)
+            effect.setSource(url)  # Decoding starts here, asynchronously
+            pool.append(effect)
+        self._pools[path] = pool
+        self._next[path] = 0
+
+    def _evict(self, path: str):
+        for effect in self._pools.pop(path, []):
+            effect.stop()
+            effect.deleteLater()
+        self._next.pop(path, None)
@@ -0,0 +1,233 @@
+# QCryptoWidget/src/widget/ui/sparkline.py
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import shiboken6
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Qt, Signal
+from PySide6.QtGui import QColor, QPainter, QPen, QPixmap, QPolygonF
+
+from widget.analytics.downsample import lttb, minmax_decimate
+from widget.ui.price_model import UP_COLOR, DOWN_COLOR
+
+# Change interval (as used by PriceTableModel) -> seconds of history shown
+SPARKLINE_WINDOWS = {'24h': 24 * 3600, '7d': 7 * 24 * 3600}
+
+# Points kept in memory per (coin, window); rendering reduces them to the pixel width
+MAX_SERIES_POINTS = 1024
+
+SPARKLINE_MARGIN = 3
+
+logger = logging.getLogger(__name__)
+
+
+class _Series:
+    """A coin's recent prices for one window, bucketed and kept in time order."""
+    __slots__ = ("span", "max_points", "ts", "prices", "version")
+
+    def __init__(self, span: float, max_points: int, ts: np.ndarray, prices: np.ndarray):
+        self.span = span
+        self.max_points = max_points
+        self.ts = ts
+        self.prices = prices
+        self.version = 0
+
+    def append(self, ts: float, price: float):
+        if len(self.ts) and ts <= self.ts[-1]:
+            return
+        start = np.searchsorted(self.ts, ts - self.span)
+        self.ts = np.append(self.ts[start:], ts)
+        self.prices = np.append(self.prices[start:], price)
+        if len(self.ts) > 2 * self.max_points:
+            self.ts, self.prices = minmax_decimate(self.ts, self.prices, self.max_points // 2)
+        self.version += 1
+
+
+class _LoadSignals(QObject):
+    """Carries loaded series from the worker thread back to the GUI thread."""
+    loaded = Signal(object, object)
+
+
+class _LoadTask(QRunnable):
+    """Reads one (coin, window) series from the history on a QThreadPool thread."""
+
+    def __init__(self, key: Tuple[str, str], load_fn: Callable, signals: _LoadSignals):
+        super().__init__()
+        self.key = key
+        self.load_fn = load_fn
+        self.signals = signals
+
+    def run(self):
+        try:
+            series = self.load_fn(*self.key)
+        except Exception as e:
+            logger.exception("Loading the %s sparkline of %s failed: %s", self.key[1], self.key[0], e)
+            series = None
+        self.signals.loaded.emit(self.key, series)
+
+
+class SparklineCache(QObject):
+    """
+    Sparkline data and rendered pixmaps for the price list.
+
+    Each (coin, window) series is read from PriceHistory once, already
+    bucketed by SQLite, and then kept current by append() as prices arrive.
+    The read runs on a worker thread, never in a paint: until it is done
+    pixmap() returns None, and series_ready is emitted when it is. Pixmaps
+    are cached per (coin, window, size) and only re-rendered when their
+    series has changed, so repaints and scrolling cost a blit.
+    """
+    series_ready = Signal()
+
+    def __init__(self, history, max_pixmaps: int = 512, max_points: int = MAX_SERIES_POINTS, parent=None):
+        """
+        Args:
+            history (PriceHistory): Source of the initial series.
+            max_pixmaps (int): Rendered pixmaps kept (least recently used are dropped).
+            max_points (int): Points kept per series before it is thinned.
+            parent (QObject, optional): The Qt parent object.
+        """
+        super().__init__(parent)
+        self.history = history
+        self.max_pixmaps = max_pixmaps
+        self.max_points = max_points
+        self._series: Dict[Tuple[str, str], _Series] = {}
+        self._pixmaps: "OrderedDict[Tuple, Tuple[int, QPixmap]]" = OrderedDict()
+        # Series being read -> observations appended meanwhile, replayed once it arrives
+        self._loading: Dict[Tuple[str, str], List[Tuple[float, float]]] = {}
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self._signals = _LoadSignals(self)
+        self._signals.loaded.connect(self._on_loaded)
+
+    @property
+    def loading(self) -> bool:
+        """Whether some series are still being read."""
+        return bool(self._loading)
+
+    def append(self, price_data: Dict[str, Dict], ts: float):
+        """Adds one observation per coin to the series loaded or being loaded."""
+        for coin, data in price_data.items():
+            for window in SPARKLINE_WINDOWS:
+                key = (coin, window)
+                series = self._series.get(key)
+                if series is not None:
+                    series.append(ts, data['price'])
+                elif key in self._loading:
+                    self._loading[key].append((ts, data['price']))
+
+    def forget(self, coin: str):
+        """Drops everything cached for a coin (e.g. after it is removed)."""
+        for window in SPARKLINE_WINDOWS:
+            self._series.pop((coin, window), None)
+            self._loading.pop((coin, window), None)
+        for key in [key for key in self._pixmaps if key[0] == coin]:
+            del self._pixmaps[key]
+
+    def series(self, coin: str, window: str) -> Optional[_Series]:
+        """Returns the series for a coin and window, or None while it is loaded in the background."""
+        key = (coin, window)
+        series = self._series.get(key)
+        if series is None and key not in self._loading:
+            self._loading[key] = []
+            self.pool.start(_LoadTask(key, self._load, self._signals))
+        return series
+
+    def _load(self, coin: str, window: str) -> _Series:
+        # Runs on the worker thread
+        span = SPARKLINE_WINDOWS[window]
+        now = time.time()
+        rows = self.history.query_downsampled(coin, now - span, now, self.max_points)
+        data = np.asarray(rows, dtype=np.float64).reshape(-1, 4)
+        return _Series(span, self.max_points, data[:, 0], data[:, 3])
+
+    def _on_loaded(self, key: Tuple[str, str], series: Optional[_Series]):
+        appended = self._loading.pop(key, None)
+        if appended is None or series is None:
+            return  # Forgotten meanwhile, or failed (the next paint tries again)
+        for ts, price in appended:
+            series.append(ts, price)
+        self._series[key] = series
+        self.series_ready.emit()
+
+    def pixmap(self, coin: str, window: str, width: int, height: int,
+               device_pixel_ratio: float = 1.0) -> Optional[QPixmap]:
+        """
+        Returns the sparkline for a coin, rendering it only if its data changed.
+
+        Returns:
+            Optional[QPixmap]: The pixmap, or None if there are fewer than two points
+                or the series is still being loaded.
+        """
+        if window not in SPARKLINE_WINDOWS or width <= 0 or height <= 0:
+            return None
+        series = self.series(coin, window)
+        if series is None or len(series.ts) < 2:
+            return None
+        key = (coin, window, width, height, device_pixel_ratio)
+        cached = self._pixmaps.get(key)
+        if cached is not None and cached[0] == series.version:
+            self._pixmaps.move_to_end(key)
+            return cached[1]
+        pixmap = render_sparkline(series.ts, series.prices, width, height, device_pixel_ratio)
+        self._pixmaps[key] = (series.version, pixmap)
+        self._pixmaps.move_to_end(key)
+        while len(self._pixmaps) > self.max_pixmaps:
+            self._pixmaps.popitem(last=False)
+        return pixmap
+
+
+def render_sparkline(ts: np.ndarray, prices: np.ndarray, width: int, height: int,
+                     device_pixel_ratio: float = 1.0) -> QPixmap:
+    """
+    Draws a price series as an antialiased line, green if it ended higher than it began.
+
+    The series is reduced to one point per device pixel first (min/max
+    decimation, then LTTB), so drawing cost doesn't depend on how much
+    history there is.
+    """
+    device_width = max(1, int(width * device_pixel_ratio))
+    device_height = max(1, int(height * device_pixel_ratio))
+    target = max(3, device_width)
+    if len(ts) > 4 * target:
+        # Cheap vectorized pre-pass; keeps spikes for LTTB to choose from
+        ts, prices = minmax_decimate(ts, prices, 2 * target)
+    x, y = lttb(ts, prices, target)
+
+    pixmap = QPixmap(device_width, device_height)
+    pixmap.setDevicePixelRatio(device_pixel_ratio)
+    pixmap.fill(Qt.GlobalColor.transparent)
+
+    inner_width = max(width - 2 * SPARKLINE_MARGIN, 1)
+    inner_height = max(height - 2 * SPARKLINE_MARGIN, 1)
+    x_span = (x[-1] - x[0]) or 1.0
+    y_low, y_high = np.nanmin(y), np.nanmax(y)
+    y_span = (y_high - y_low) or 1.0
+    px = SPARKLINE_MARGIN + (x - x[0]) / x_span * inner_width
+    py = SPARKLINE_MARGIN + (y_high - y) / y_span * inner_height
+    if y_high == y_low:
+        py[:] = height / 2
+    polygon = _polygon(px, py)
+
+    painter = QPainter(pixmap)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    pen = QPen(QColor(UP_COLOR if y[-1] >= y[0] else DOWN_COLOR))
+    pen.setWidthF(1.25)
+    painter.setPen(pen)
+    painter.drawPolyline(polygon)
+    painter.end()
+    return pixmap
+
+
+def _polygon(px: np.ndarray, py: np.ndarray) -> QPolygonF:
+    # Fills the polygon's QPointF buffer in place instead of building one QPointF per point
+    polygon = QPolygonF()
+    polygon.resize(len(px))
+    buffer = shiboken6.VoidPtr(polygon.data(), len(px) * 16, True)
+    points = np.frombuffer(buffer, dtype=np.float64).reshape(-1, 2)
+    points[:, 0] = px
+    points[:, 1] = py
+    return polygon
@@ -1,26 +1,47 @@
 # QCryptoWidget/src/widget/ui/widget.py
 
+import logging
 import sys
 import time
+from contextlib import nullcontext
 from pathlib import Path
-from typing import Dict, List
-import webbrowser  # **CHANGE**: To open web links
+from typing import Dict, List, Optional, Set
 
-from PySide6.QtCore import (Qt, QTimer, QUrl, QPoint)
+from PySide6.QtCore import (Qt, QTimer, QPoint, QStringListModel)
 from PySide6.QtGui import (QAction, QIcon)
-from PySide6.QtMultimedia import QSoundEffect
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QComboBox, QFrame, QSystemTrayIcon, QMenu, QInputDialog, QMessageBox,
-    QDialog, QListWidget, QLineEdit, QFileDialog, QListWidgetItem, QStyle
+    QDialog, QListWidget, QLineEdit, QFileDialog, QListWidgetItem, QStyle,
+    QTableView, QHeaderView, QAbstractItemView, QCompleter, QDialogButtonBox
 )
 # **CHANGE**: pyqtgraph is no longer needed for the UI
 
 # Import project modules
 from widget.config.config import load_config
 from widget.data.coin_db import load_coins, save_coins, get_coin_db_path
-from widget.data.alarm_db import load_alarms, save_alarms, get_alarm_db_path
-from widget.api.coin_api import get_current_prices
+from widget.data.alarm_db import (load_alarms, save_alarms, get_alarm_db_path,
+                                  load_alarm_state, save_alarm_state, get_alarm_state_path)
+from widget.data.history_db import PriceHistory, get_history_db_path
+from widget.data.persistence import WriteBehind
+from widget.data.price_snapshot import PriceSnapshot
+from widget.diagnostics.logs import setup_logging
+from widget.diagnostics.metrics import ALARM_SECONDS, RENDER_SECONDS, start_metrics_server
+from widget.alarms.engine import AlarmEngine, migrate_alarms
+from widget.alarms.rules import ALARM_TYPES, RuleError, alarm_coins, compile_rule, legacy_form, legacy_rule, rule_text
+from widget.api.coin_api import get_client
+from widget.api.providers import build_router
+from widget.api.fx_rates import FxRates, currency_decimals, currency_symbol, get_fx_rates_path
+from widget.api.resilience import STALE_SERVED, backoff_delay, format_age, oldest_quote_time, stamp_quotes
+from widget.api.symbol_index import SymbolIndex, get_symbol_index, is_valid_code, parse_label
+from widget.api.credit_budget import CreditBudget, get_credit_usage_path
+from widget.api.response_cache import SharedQuoteCache, get_quote_cache_path
+from widget.ui.fetch_worker import PriceFetcher
+from widget.ui.price_model import PriceTableModel, PriceDelegate, COL_COIN, COL_PRICE, COL_SPARK, COL_INFO
+from widget.ui.sparkline import SparklineCache
+from widget.ui.sound_manager import SoundManager
+
+logger = logging.getLogger(__name__)
 
 # --- Constants ---
 DARK_STYLESHEET = """
@@ -67,9 +88,99 @@ QLabel#coinCodeLabel {
     font-weight: bold;
     color: white;
 }
+QTableView#priceView {
+    border: none;
+    background-color: transparent;
+}
+QLabel#staleLabel {
+    color: #E0A030;
+    font-size: 11px;
+}
 """
 
-# --- Alarm Dialog (Unchanged) ---
+AUTO_REFRESH_TEXT = "Auto"
+# Refresh requests within this window are served by a single fetch
+REFRESH_DEBOUNCE_MS = 2000
+
+PRICE_ROW_HEIGHT = 34
+# Rows beyond this scroll inside the list instead of growing the window
+MAX_VISIBLE_PRICE_ROWS = 20
+
+# The cached CoinMarketCap map (several MB of JSON) is parsed on a worker this long after startup
+SYMBOL_INDEX_PRELOAD_MS = 3_000
+# The CoinMarketCap map is checked for staleness this long after startup, then periodically
+SYMBOL_INDEX_FIRST_CHECK_MS = 30_000
+SYMBOL_INDEX_CHECK_MS = 6 * 3600 * 1000
+# Exchange rates are checked for staleness on their own timer, never on the quote fetch path
+FX_RATES_FIRST_CHECK_MS = 5_000
+FX_RATES_CHECK_MS = 10 * 60 * 1000
+
+# After a failed fetch, retry with jittered backoff between these bounds (never later than the refresh interval)
+FETCH_RETRY_MIN_SECONDS = 10
+FETCH_RETRY_MAX_SECONDS = 600
+# The "prices are N min old" notice is re-rendered this often while shown
+STALE_LABEL_UPDATE_MS = 30_000
+# Recent prices kept in memory per coin (PriceSnapshot.recent / tick_matrix)
+RECENT_TICKS = 64
+
+# --- Add Coin Dialog ---
+class AddCoinDialog(QDialog):
+    """
+    Asks for a coin code, autocompleting from the local CoinMarketCap map.
+
+    Completions read "UNI — Uniswap [7083]", so picking one also tells which
+    asset is meant when several share a symbol.
+    """
+
+    def __init__(self, index: SymbolIndex, parent=None):
+        super().__init__(parent)
+        self.index = index
+        self.setWindowTitle("Add Coin")
+        self.setMinimumWidth(360)
+        self.setStyleSheet(DARK_STYLESHEET)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(QLabel("Coin code or name (e.g., SOL):"))
+        self.code_edit = QLineEdit()
+        if index.available:
+            completer = QCompleter(QStringListModel(index.completions(), self), self)
+            completer.setCaseSensitivity(Qt.CaseInsensitive)
+            completer.setFilterMode(Qt.MatchContains)
+            completer.setMaxVisibleItems(12)
+            self.code_edit.setCompleter(completer)
+        self.code_edit.textChanged.connect(self.update_hint)
+        layout.addWidget(self.code_edit)
+        self.hint_label = QLabel("")
+        layout.addWidget(self.hint_label)
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel)
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def update_hint(self, text: str):
+        code, coin_id = parse_label(text)
+        if code is None or not self.index.available:
+            self.hint_label.setText("")
+            return
+        matches = self.index.candidates(code)
+        if coin_id is not None:
+            matches = [info for info in matches if info.id == coin_id]
+        if not matches:
+            self.hint_label.setText("Not listed on CoinMarketCap")
+        elif len(matches) == 1:
+            self.hint_label.setText(matches[0].name)
+        else:
+            self.hint_label.setText(f"{matches[0].name}; {len(matches) - 1} other coin(s) also use "
+                                    f"{code}, pick one from the list to choose")
+
+    def selection(self):
+        """Returns (code, CMC id or None) for the entered text; code is None if it isn't a code."""
+        return parse_label(self.code_edit.text())
+
+# Alarm type entry for free-form rules (see widget.alarms.rules)
+CUSTOM_RULE_TYPE = "Custom rule"
+
+# --- Alarm Dialog ---
 class AlarmDialog(QDialog):
     def __init__(self, alarms: List[Dict], coins: List[str], parent=None):
         super().__init__(parent)
@@ -92,11 +203,20 @@ class AlarmDialog(QDialog):
         self.coin_combo.addItems(self.coins)
         form_layout.addWidget(self.coin_combo)
         self.type_combo = QComboBox()
-        self.type_combo.addItems(["Price above", "Price below", "% increase (24h)", "% decrease (24h)"])
+        self.type_combo.addItems(list(ALARM_TYPES) + [CUSTOM_RULE_TYPE])
+        self.type_combo.currentTextChanged.connect(self.update_form_for_type)
         form_layout.addWidget(self.type_combo)
         self.threshold_input = QLineEdit()
-        self.threshold_input.setPlaceholderText("Enter numeric threshold (e.g., 65000 or 5 for %)")
         form_layout.addWidget(self.threshold_input)
+        self.update_form_for_type(self.type_combo.currentText())
+        retrigger_layout = QHBoxLayout()
+        self.hysteresis_input = QLineEdit()
+        self.hysteresis_input.setPlaceholderText("Optional: Hysteresis (re-arm distance)")
+        retrigger_layout.addWidget(self.hysteresis_input)
+        self.cooldown_input = QLineEdit()
+        self.cooldown_input.setPlaceholderText("Optional: Cooldown (minutes)")
+        retrigger_layout.addWidget(self.cooldown_input)
+        form_layout.addLayout(retrigger_layout)
         sound_layout = QHBoxLayout()
         self.sound_path_label = QLineEdit()
         self.sound_path_label.setPlaceholderText("Optional: Path to sound file (.wav)")
@@ -126,17 +246,38 @@ class AlarmDialog(QDialog):
     def load_alarms_to_list(self):
         self.list_widget.clear()
         for i, alarm in enumerate(self.alarms):
-            text = f"{alarm['coin']} - {alarm['type']} {alarm['threshold']}"
+            try:
+                text = rule_text(alarm)
+            except RuleError:
+                text = f"{alarm.get('coin')} - {alarm.get('type')} {alarm.get('threshold')}"
             item = QListWidgetItem(text)
             item.setData(Qt.UserRole, i)
             self.list_widget.addItem(item)
     def populate_form_from_selection(self, item):
         index = item.data(Qt.UserRole)
         alarm = self.alarms[index]
-        self.coin_combo.setCurrentText(alarm['coin'])
-        self.type_combo.setCurrentText(alarm['type'])
-        self.threshold_input.setText(str(alarm['threshold']))
+        try:
+            rule = rule_text(alarm)
+        except RuleError:
+            rule = ""
+        form = legacy_form(rule)
+        if form is not None:
+            coin, alarm_type, threshold = form
+            self.coin_combo.setCurrentText(coin)
+            self.type_combo.setCurrentText(alarm_type)
+            self.threshold_input.setText(str(threshold))
+        else:
+            self.type_combo.setCurrentText(CUSTOM_RULE_TYPE)
+            self.threshold_input.setText(rule)
+        self.hysteresis_input.setText(str(alarm['hysteresis']) if alarm.get('hysteresis') else "")
+        self.cooldown_input.setText(str(alarm['cooldown'] / 60) if alarm.get('cooldown') else "")
         self.sound_path_label.setText(alarm.get('sound', ''))
+    def update_form_for_type(self, alarm_type: str):
+        custom = alarm_type == CUSTOM_RULE_TYPE
+        self.coin_combo.setEnabled(not custom)
+        self.threshold_input.setPlaceholderText(
+            "Rule, e.g. ETH/BTC < 0.03 or BTC > 120000 and pct(BTC, 24h) > 3" if custom
+            else "Enter numeric threshold (e.g., 65000 or 5 for %)")
     def browse_sound_file(self):
         filepath, _ = QFileDialog.getOpenFileName(self, "Select Sound File", "", "Sound Files (*.wav)")
         if filepath:
@@ -150,11 +291,34 @@ class AlarmDialog(QDialog):
             QMessageBox.warning(self, "Input Error", "Threshold cannot be empty.")
             return
         try:
-            threshold = float(threshold_str)
+            if alarm_type == CUSTOM_RULE_TYPE:
+                rule = compile_rule(threshold_str)
+            else:
+                try:
+                    threshold = float(threshold_str)
+                except ValueError:
+                    QMessageBox.warning(self, "Input Error", "Threshold must be a valid number.")
+                    return
+                rule = compile_rule(legacy_rule({"coin": coin, "type": alarm_type, "threshold": threshold}))
+        except RuleError as e:
+            QMessageBox.warning(self, "Rule Error", str(e))
+            return
+        unknown = [code for code in rule.coins if code not in self.coins]
+        if unknown:
+            QMessageBox.warning(self, "Input Error",
+                                f"Not in your coin list: {', '.join(unknown)}. Add the coin first.")
+            return
+        try:
+            hysteresis = abs(float(self.hysteresis_input.text() or 0))
+            cooldown_minutes = abs(float(self.cooldown_input.text() or 0))
         except ValueError:
-            QMessageBox.warning(self, "Input Error", "Threshold must be a valid number.")
+            QMessageBox.warning(self, "Input Error", "Hysteresis and cooldown must be valid numbers.")
             return
-        new_alarm = {"coin": coin, "type": alarm_type, "threshold": threshold, "sound": sound}
+        new_alarm = {"coin": rule.coins[0], "rule": rule.source, "sound": sound}
+        if hysteresis:
+            new_alarm["hysteresis"] = hysteresis
+        if cooldown_minutes:
+            new_alarm["cooldown"] = cooldown_minutes * 60
         selected_items = self.list_widget.selectedItems()
         if selected_items:
             index = selected_items[0].data(Qt.UserRole)
@@ -176,37 +340,132 @@ class AlarmDialog(QDialog):
     def clear_form(self):
         self.list_widget.clearSelection()
         self.threshold_input.clear()
+        self.hysteresis_input.clear()
+        self.cooldown_input.clear()
         self.sound_path_label.clear()
         if self.coin_combo.count() > 0: self.coin_combo.setCurrentIndex(0)
         self.type_combo.setCurrentIndex(0)
 
 # --- Main Widget ---
 class QCryptoWidget(QWidget):
-    def __init__(self):
+    def __init__(self, profiler=None):
         super().__init__()
         self.drag_pos = None
-        try:
-            self.config = load_config()
-        except ValueError as e:
-            QMessageBox.critical(self, "Configuration Error", str(e))
-            sys.exit(1)
+        self.profiler = profiler
+        phase = profiler.phase if profiler else nullcontext
+        with phase("config"):
+            try:
+                self.config = load_config()
+            except ValueError as e:
+                QMessageBox.critical(self, "Configuration Error", str(e))
+                sys.exit(1)
+            setup_logging(self.config['log_file'], self.config['log_level'])
+            self.metrics_server = start_metrics_server(self.config['metrics_port'])
 
         self.root_path = self.config['root_path']
         self.coin_db_path = get_coin_db_path(self.root_path)
         self.alarm_db_path = get_alarm_db_path(self.root_path)
+        self.alarm_state_path = get_alarm_state_path(self.root_path)
         
-        self.coins = load_coins(self.coin_db_path)
-        self.alarms = load_alarms(self.alarm_db_path)
-        self.price_data: Dict[str, Dict] = {}
+        with phase("db load"):
+            self.coins = load_coins(self.coin_db_path)
+            self.alarms = load_alarms(self.alarm_db_path)
+            alarm_state = load_alarm_state(self.alarm_state_path)
+            converted = migrate_alarms(self.alarms, alarm_state)
+            if converted:
+                # One-time upgrade of alarms.json from fixed alarm types to rules
+                save_alarms(self.alarm_db_path, self.alarms)
+                save_alarm_state(self.alarm_state_path, alarm_state)
+                logger.info("Converted %d alarms to rules.", converted)
+            self.alarm_engine = AlarmEngine(self.alarms, alarm_state)
+            self.history = PriceHistory(get_history_db_path(self.root_path),
+                                        retention_days=self.config['history_retention_days'])
+            self.sparklines = SparklineCache(self.history, parent=self)
+        # Saves are coalesced and written off the GUI thread
+        self.writer = WriteBehind()
+        # Updated in place on every refresh rather than rebuilt
+        self.price_data = PriceSnapshot(ticks=RECENT_TICKS)
+        # Consecutive failed fetches; while non-zero, the last good prices are shown as stale
+        self.fetch_failures = 0
+        # Watched coins the last successful fetch had no quote for (a failed chunk or provider)
+        self.stale_coins: Set[str] = set()
         self.change_interval = '24h'
+        # Prices are always fetched in USD and converted locally for display
+        self.display_currency = self.config['display_currency']
+        self.fx_rates = FxRates(get_fx_rates_path(self.root_path), self.config['display_currencies'],
+                                self.config['fx_rates_url'])
         
-        self.init_ui()
-        self.init_tray_icon()
+        with phase("ui build"):
+            self.init_ui()
+            self.init_tray_icon()
+        self.sounds = SoundManager(parent=self)
+
+        self.credit_budget = CreditBudget(self.config['daily_credits'], self.config['monthly_credits'],
+                                          self.config['min_refresh_seconds'],
+                                          get_credit_usage_path(self.root_path))
+        if self.config['api_key']:
+            get_client(self.config['api_key']).usage_callback = self.credit_budget.record_response
+
+        self.router = build_router(self.config)
+        self.symbol_index = get_symbol_index(self.root_path)
+        self.quote_cache = SharedQuoteCache(get_quote_cache_path(self.config['quote_cache_dir']),
+                                            ttl=self.config['quote_cache_ttl'])
+        self.fetcher = PriceFetcher(self.fetch_quotes, self)
+        self.fetcher.prices_ready.connect(self.on_prices_fetched)
+        self.fetcher.fetch_failed.connect(self.on_fetch_failed)
+
+        self.price_stream = None
+        if self.config['stream_enabled']:
+            from widget.ui.price_stream import PriceStream  # QtWebSockets is only loaded when streaming
+            self.price_stream = PriceStream(self.config['stream_url'],
+                                            self.config['stream_max_updates'], parent=self)
+            self.price_stream.prices_updated.connect(self.on_stream_prices)
+            self.price_stream.stream_lost.connect(self.on_stream_lost)
+            self.price_stream.stream_restored.connect(self.on_stream_restored)
+            self.price_stream.start(self.coins)
         
+        # Single-shot: every fetch schedules the next one, so the interval can follow the credit budget
         self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
         self.timer.timeout.connect(self.update_prices)
-        self.set_update_interval()
-        self.update_prices()
+        # With a price hub running, prices are pushed by it and this widget stops polling
+        self.hub_feed = None
+        if self.config['hub_address']:
+            from widget.ui.hub_feed import HubFeed  # QtNetwork is only loaded when a hub may be used
+            self.hub_feed = HubFeed(self.config['hub_address'], parent=self)
+            self.hub_feed.prices_updated.connect(self.on_hub_prices)
+            self.hub_feed.hub_connected.connect(self.on_hub_connected)
+            self.hub_feed.hub_lost.connect(self.on_hub_lost)
+            self.hub_feed.start(self.coins)
+        # Render whatever another instance (or the last run) cached while the first fetch is in flight
+        with phase("cache render"):
+            self.price_data.update(self.quote_cache.peek(self.coins))
+            if self.price_data:
+                self.update_price_display()
+        # The first fetch starts once the event loop is running, after the window is shown
+        QTimer.singleShot(0, self.update_prices)
+        # Alarm sounds are decoded after startup too, keeping QtMultimedia off the critical path
+        QTimer.singleShot(0, self.preload_sounds)
+        # The CoinMarketCap map (for validation and id-based quotes) is loaded off the GUI thread
+        # before the Add Coin dialog needs it; it is only downloaded for a configured CMC source
+        QTimer.singleShot(SYMBOL_INDEX_PRELOAD_MS, self.symbol_index.load_in_background)
+        if self.config['api_key'] and 'cmc' in self.config['price_providers']:
+            self.symbol_index_timer = QTimer(self)
+            self.symbol_index_timer.timeout.connect(self.refresh_symbol_index)
+            self.symbol_index_timer.start(SYMBOL_INDEX_CHECK_MS)
+            QTimer.singleShot(SYMBOL_INDEX_FIRST_CHECK_MS, self.refresh_symbol_index)
+        # Exchange rates are kept ready for a currency switch; only needed beyond USD
+        if self.fx_rates.needed:
+            self.fx_rates_timer = QTimer(self)
+            self.fx_rates_timer.timeout.connect(self.fx_rates.refresh_in_background)
+            self.fx_rates_timer.start(FX_RATES_CHECK_MS)
+            QTimer.singleShot(FX_RATES_FIRST_CHECK_MS, self.fx_rates.refresh_in_background)
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if self.profiler and not self.profiler.reported:
+            self.profiler.mark("first paint")
+            self.profiler.write_report(self.root_path)
 
     def init_ui(self):
         self.setWindowTitle("QCryptoWidget")
@@ -233,10 +492,46 @@ class QCryptoWidget(QWidget):
         title_bar_layout.addWidget(close_btn)
         self.main_layout.addLayout(title_bar_layout)
         
-        self.price_layout = QVBoxLayout()
-        self.price_layout.setContentsMargins(10, 5, 10, 5)
-        self.main_layout.addLayout(self.price_layout)
+        self.price_model = PriceTableModel(self)
+        self.price_delegate = PriceDelegate(self, self.sparklines)
+        self.price_delegate.info_clicked.connect(self.open_coin_url)
+        self.price_view = QTableView()
+        self.price_view.setObjectName("priceView")
+        self.price_view.setModel(self.price_model)
+        self.price_view.setItemDelegate(self.price_delegate)
+        # Sparkline series are read in the background; repaint once each arrives
+        self.sparklines.series_ready.connect(self.price_view.viewport().update)
+        self.price_view.horizontalHeader().hide()
+        self.price_view.verticalHeader().hide()
+        self.price_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.price_view.verticalHeader().setDefaultSectionSize(PRICE_ROW_HEIGHT)
+        self.price_view.setShowGrid(False)
+        self.price_view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.price_view.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.price_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.price_view.setMouseTracking(True)
+        header = self.price_view.horizontalHeader()
+        # Fixed/stretch sections only: ResizeToContents would measure every row on each refresh
+        header.setSectionResizeMode(COL_COIN, QHeaderView.ResizeMode.Fixed)
+        header.setSectionResizeMode(COL_PRICE, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(COL_SPARK, QHeaderView.ResizeMode.Fixed)
+        header.setSectionResizeMode(COL_INFO, QHeaderView.ResizeMode.Fixed)
+        header.resizeSection(COL_COIN, 70)
+        header.resizeSection(COL_SPARK, PriceDelegate.SPARKLINE_WIDTH)
+        header.resizeSection(COL_INFO, PriceDelegate.BUTTON_WIDTH)
+        price_container = QVBoxLayout()
+        price_container.setContentsMargins(10, 5, 10, 5)
+        price_container.addWidget(self.price_view)
+        self.main_layout.addLayout(price_container)
+        self.stale_label = QLabel()
+        self.stale_label.setObjectName("staleLabel")
+        self.stale_label.setContentsMargins(10, 0, 10, 0)
+        self.stale_label.hide()
+        self.main_layout.addWidget(self.stale_label)
+        self.stale_timer = QTimer(self)
+        self.stale_timer.timeout.connect(self.update_stale_indicator)
         self.main_layout.addStretch()
+        self._fit_price_view()
 
         line = QFrame()
         line.setFrameShape(QFrame.Shape.HLine)
@@ -248,7 +543,7 @@ class QCryptoWidget(QWidget):
         
         config_row_layout = QHBoxLayout()
         self.interval_combo = QComboBox()
-        self.interval_combo.addItems(["5 min", "15 min", "1 hour"])
+        self.interval_combo.addItems(["5 min", "15 min", "1 hour", AUTO_REFRESH_TEXT])
         self.interval_combo.currentTextChanged.connect(self.set_update_interval)
         config_row_layout.addWidget(QLabel("Refresh:"))
         config_row_layout.addWidget(self.interval_combo)
@@ -257,6 +552,12 @@ class QCryptoWidget(QWidget):
         self.change_combo.addItems(["Change (24h)", "Change (7d)"])
         self.change_combo.currentTextChanged.connect(self.on_change_interval_selected)
         config_row_layout.addStretch()
+        if len(self.config['display_currencies']) > 1:
+            self.currency_combo = QComboBox()
+            self.currency_combo.addItems(self.config['display_currencies'])
+            self.currency_combo.setCurrentText(self.display_currency)
+            self.currency_combo.currentTextChanged.connect(self.on_currency_selected)
+            config_row_layout.addWidget(self.currency_combo)
         config_row_layout.addWidget(self.change_combo)
         controls_layout.addLayout(config_row_layout)
         
@@ -308,7 +609,7 @@ class QCryptoWidget(QWidget):
         if icon_path.exists():
             icon = QIcon(str(icon_path))
         else:
-            print(f"Warning: Custom icon not found at '{icon_path}'. Using default system icon.")
+            logger.warning("Custom icon not found at '%s'. Using default system icon.", icon_path)
             icon = self.style().standardIcon(QStyle.StandardPixmap.SP_ComputerIcon)
         
         self.tray_icon.setIcon(icon)
@@ -328,79 +629,215 @@ class QCryptoWidget(QWidget):
         self.setVisible(not self.isVisible())
         
     def quit_application(self):
-        save_coins(self.coin_db_path, self.coins)
-        save_alarms(self.alarm_db_path, self.alarms)
+        self.fetcher.invalidate()
+        self.fetcher.pool.clear()
+        if self.price_stream:
+            self.price_stream.stop()
+        if self.hub_feed:
+            self.hub_feed.stop()
+        self.save_coins()
+        self.save_alarms()
+        self.save_alarm_state()
+        self.writer.close()
+        self.router.close()
+        self.sounds.clear()
+        if self.metrics_server:
+            self.metrics_server.close()
+        self.history.close()
         QApplication.quit()
 
     def update_price_display(self):
-        while self.price_layout.count():
-            item = self.price_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
-            elif item.layout():
-                layout = item.layout()
-                while layout.count():
-                    sub_item = layout.takeAt(0)
-                    if sub_item.widget(): sub_item.widget().deleteLater()
-        
-        for coin in self.coins:
-            if coin not in self.price_data: continue
-            data = self.price_data[coin]
-            price = data['price']
-            
-            percent_change = data.get(f'percent_change_{self.change_interval}', 0)
-            
-            arrow = "●"
-            price_color = "#F0F0F0"
-            if percent_change > 0:
-                arrow = "▲"
-                price_color = "#32CD32"
-            elif percent_change < 0:
-                arrow = "▼"
-                price_color = "#FF4500"
-
-            row_layout = QHBoxLayout()
-            code_label = QLabel(coin)
-            code_label.setObjectName("coinCodeLabel")
-            
-            price_str = f"{price:,.4f}"
-            parts = price_str.split('.')
-            integer_part = parts[0]
-            fractional_part = ""
-            if len(parts) > 1:
-                fractional_part = f".{parts[1]}".rstrip('0').rstrip('.')
-
-            arrow_label = QLabel(arrow)
-            arrow_label.setStyleSheet(f"color: {price_color}; font-size: 12px; margin-right: 5px;")
-
-            price_text_label = QLabel(f"<b>${integer_part}</b><i>{fractional_part}</i>")
-            price_text_label.setTextFormat(Qt.TextFormat.RichText)
-            
-            chart_btn = QPushButton("Info")
-            chart_btn.setFixedSize(60, 28)
-            chart_btn.clicked.connect(lambda checked, slug=data['slug']: self.open_coin_url(slug))
-            
-            row_layout.addWidget(code_label)
-            row_layout.addStretch()
-            row_layout.addWidget(arrow_label)
-            row_layout.addWidget(price_text_label)
-            row_layout.addStretch()
-            row_layout.addWidget(chart_btn)
-            
-            self.price_layout.addLayout(row_layout)
-        
+        with RENDER_SECONDS.time(view="price_table"):
+            prices, currency = self.price_data, self.display_currency
+            converted = self.fx_rates.convert(prices, currency) if prices else None
+            if converted is None:
+                currency = "USD"  # Rate not known yet; shown in USD until it arrives
+            else:
+                prices = converted
+            self.price_model.set_prices(self.coins, prices, self.change_interval,
+                                        (currency_symbol(currency), currency_decimals(currency)))
+            if self.price_model.rowCount() != self._displayed_rows:
+                self._fit_price_view()
+
+    def _fit_price_view(self):
+        # Only resize the window when the number of rows changes, not on every refresh
+        rows = self.price_model.rowCount()
+        self._displayed_rows = rows
+        visible_rows = min(rows, MAX_VISIBLE_PRICE_ROWS)
+        self.price_view.setFixedHeight(visible_rows * PRICE_ROW_HEIGHT + 2)
         self.adjustSize()
 
     def update_prices(self):
-        print(f"[{time.ctime()}] Fetching prices...")
-        new_data = get_current_prices(self.coins, self.config['api_key'])
-        if new_data is not None:
-            self.price_data = new_data
-            self.update_price_display()
-            self.check_alarms()
+        if self.hub_active():
+            return  # The hub pushes prices; polling resumes if it goes away
+        logger.info("Fetching prices...", extra={'coins': len(self.coins)})
+        self.fetcher.fetch(self.coins)
+        self.schedule_next_fetch()
+
+    def fetch_quotes(self, coins: List[str]) -> Optional[Dict]:
+        # Runs on a worker thread; only coins not fresh in the shared cache hit the API
+        return self.quote_cache.get_prices(coins, self.router.get_prices)
+
+    def hub_active(self) -> bool:
+        """Whether prices currently come from the price hub rather than this widget's own fetches."""
+        return self.hub_feed is not None and self.hub_feed.connected
+
+    def schedule_next_fetch(self):
+        if self.hub_active():
+            return  # The hub decides when to fetch
+        self.timer.start(int(self.refresh_interval_seconds() * 1000))
+
+    def refresh_interval_seconds(self) -> float:
+        interval_text = self.interval_combo.currentText()
+        if interval_text == AUTO_REFRESH_TEXT:
+            # Credit-free providers only: the budget falls back to its minimum interval
+            return self.credit_budget.next_interval(len(self.coins) if self.router.costs_credits else 0)
+        seconds = 5 * 60
+        if "min" in interval_text:
+            seconds = int(interval_text.split()[0]) * 60
+        elif "hour" in interval_text:
+            seconds = int(interval_text.split()[0]) * 60 * 60
+        return max(seconds, self.credit_budget.backoff_remaining())
+
+    def request_refresh(self):
+        """
+        Asks for a fetch soon without paying for one per request: calls within the
+        debounce window, or before the budget's minimum gap, share the next fetch.
+        """
+        if self.hub_active():
+            self.hub_feed.request_refresh()  # The hub debounces and budgets for all its clients
+            return
+        earliest_ms = max(REFRESH_DEBOUNCE_MS, int(self.credit_budget.min_gap_remaining() * 1000))
+        if not self.timer.isActive() or self.timer.remainingTime() > earliest_ms:
+            self.timer.start(earliest_ms)
+
+    def on_prices_fetched(self, new_data: Dict):
+        self.schedule_next_fetch()  # Usage changed; re-derive the interval from the budget
+        # A fetch started before a coin was removed still holds its quote
+        watched = set(self.coins)
+        self.apply_prices({coin: quote for coin, quote in new_data.items() if coin in watched})
+
+    def apply_prices(self, new_data: Dict, replace: bool = True):
+        """
+        Shows fresh quotes: records history, redraws, clears the stale notice and checks alarms.
+
+        Args:
+            new_data (Dict): Quotes keyed by coin code.
+            replace (bool): Whether they replace all prices (a full fetch) or update some coins (the hub).
+        """
+        self.fetch_failures = 0
+        if replace:
+            # Coins missing from a fetch keep their last good quote, marked stale; only
+            # coins no longer watched are dropped
+            self.price_data.retain(self.coins)
+            self.stale_coins = {coin for coin in self.coins if coin not in new_data and coin in self.price_data}
         else:
+            self.stale_coins.difference_update(new_data)
+        # Providers without slugs (e.g. Binance) keep the one CMC supplied earlier
+        self.price_data.update(new_data)
+        self.record_history(new_data)
+        self.update_price_display()
+        self.update_stale_indicator()
+        self.check_alarms()
+
+    def on_hub_prices(self, data: Dict, stale: bool):
+        # A message sent before a subscription change may still hold a removed coin
+        data = {coin: quote for coin, quote in data.items() if coin in self.coins}
+        if not stale:
+            self.apply_prices(data, replace=False)
+            return
+        # The hub's fetch failed and it re-sent its last good quotes: keep them, marked stale
+        self.fetch_failures += 1
+        self.price_data.update({coin: quote for coin, quote in data.items() if coin not in self.price_data})
+        self.update_price_display()
+        self.update_stale_indicator()
+
+    def on_hub_connected(self):
+        self.timer.stop()
+        self.fetch_failures = 0
+        self.update_stale_indicator()
+
+    def on_hub_lost(self):
+        # Fetch directly until the hub is back
+        self.request_refresh()
+
+    def on_stream_prices(self, updates: Dict):
+        stamp_quotes(updates, time.time())
+        # Ticks only carry price and 24h change; a coin streamed before the first
+        # REST response gets its 7d change and slug from REST later
+        self.price_data.update({coin: update for coin, update in updates.items()
+                                if coin in self.coins or coin in self.price_data})
+        self.record_history(updates)
+        self.update_price_display()
+        if self.stale_coins & updates.keys():
+            self.stale_coins.difference_update(updates)
+            self.update_stale_indicator()
+        self.check_alarms()
+
+    def record_history(self, price_data: Dict):
+        now = time.time()
+        self.history.record(price_data, now)
+        self.sparklines.append(price_data, now)
+
+    def on_stream_lost(self):
+        # Fall back to REST polling until the stream reconnects
+        self.request_refresh()
+
+    def on_stream_restored(self):
+        logger.info("Price stream restored.")
+
+    def on_fetch_failed(self):
+        # Keep showing the last good prices, marked stale, and retry well before the next regular tick
+        self.fetch_failures += 1
+        if self.price_data:
+            STALE_SERVED.inc()
+        retry = max(FETCH_RETRY_MIN_SECONDS,
+                    backoff_delay(self.fetch_failures - 1, FETCH_RETRY_MIN_SECONDS, FETCH_RETRY_MAX_SECONDS),
+                    self.router.retry_in())
+        self.timer.start(int(min(retry, self.refresh_interval_seconds()) * 1000))
+        self.update_stale_indicator()
+        if self.fetch_failures == 1:
             self.tray_icon.showMessage("API Error", "Could not fetch new prices.", QSystemTrayIcon.Warning)
 
+    def update_stale_indicator(self):
+        """
+        Shows how old the prices are while fetching fails, or which coins the last
+        fetch left out; hides the notice once every coin is fresh again.
+        """
+        stale_coins = [coin for coin in self.coins if coin in self.stale_coins]
+        fetched_at = oldest_quote_time(self.price_data, self.coins if self.fetch_failures else stale_coins)
+        if not (self.fetch_failures or stale_coins) or fetched_at is None:
+            self.stale_timer.stop()
+            if not self.stale_label.isHidden():
+                self.stale_label.hide()
+                self.adjustSize()
+            return
+        age = format_age(time.time() - fetched_at)
+        if self.fetch_failures:
+            text = f"⚠ Prices are {age} old (source unreachable)"
+            if self.timer.isActive():
+                text += f", retrying in {format_age(self.timer.remainingTime() / 1000)}"
+        else:
+            shown = ", ".join(stale_coins[:3]) + (" and more" if len(stale_coins) > 3 else "")
+            text = f"⚠ {shown} not updated (up to {age} old)"
+        self.stale_label.setText(text)
+        tooltip = time.strftime("Last update: %Y-%m-%d %H:%M:%S", time.localtime(fetched_at))
+        if stale_coins:
+            tooltip += "\nNot in the last update: " + ", ".join(stale_coins)
+        self.stale_label.setToolTip(tooltip)
+        if self.stale_label.isHidden():
+            self.stale_label.show()
+            self.adjustSize()
+        if not self.stale_timer.isActive():
+            self.stale_timer.start(STALE_LABEL_UPDATE_MS)
+
+    def on_currency_selected(self, currency: str):
+        # Conversion is local, so switching needs no request unless the rate was never downloaded
+        self.display_currency = currency
+        if self.fx_rates.rate(currency, self.price_data) is None:
+            self.fx_rates.refresh_in_background()
+        self.update_price_display()
+
     def on_change_interval_selected(self, text: str):
         if "24h" in text:
             self.change_interval = '24h'
@@ -409,27 +846,32 @@ class QCryptoWidget(QWidget):
         self.update_price_display()
 
     def set_update_interval(self):
-        interval_text = self.interval_combo.currentText()
-        if "min" in interval_text:
-            minutes = int(interval_text.split()[0])
-            self.timer.start(minutes * 60 * 1000)
-        elif "hour" in interval_text:
-            hours = int(interval_text.split()[0])
-            self.timer.start(hours * 60 * 60 * 1000)
+        self.schedule_next_fetch()
 
     def add_coin(self):
-        text, ok = QInputDialog.getText(self, "Add Coin", "Enter 3-5 letter coin code (e.g., SOL):")
-        if ok and text:
-            code = text.upper()
-            if not (3 <= len(code) <= 5):
-                QMessageBox.warning(self, "Invalid Code", "Coin code must be 3-5 letters long.")
+        dialog = AddCoinDialog(self.symbol_index, self)
+        if dialog.exec():
+            code, coin_id = dialog.selection()
+            if code is None or not is_valid_code(code):
+                QMessageBox.warning(self, "Invalid Code", "Coin codes are 1-15 letters or digits.")
                 return
             if code in self.coins:
                 QMessageBox.warning(self, "Duplicate Coin", f"{code} is already in your list.")
                 return
+            if self.symbol_index.available and not self.symbol_index.candidates(code):
+                answer = QMessageBox.question(self, "Unknown Coin",
+                                              f"{code} is not listed on CoinMarketCap. Add it anyway?")
+                if answer != QMessageBox.Yes:
+                    return
+            if coin_id is not None:
+                self.symbol_index.pin(code, coin_id)
             self.coins.append(code)
-            save_coins(self.coin_db_path, self.coins)
-            self.update_prices()
+            self.save_coins()
+            if self.price_stream:
+                self.price_stream.set_coins(self.coins)
+            if self.hub_feed:
+                self.hub_feed.set_coins(self.coins)
+            self.request_refresh()
     
     def remove_coin(self):
         text, ok = QInputDialog.getText(self, "Remove Coin", "Enter coin code to remove:")
@@ -439,16 +881,27 @@ class QCryptoWidget(QWidget):
                 QMessageBox.warning(self, "Not Found", f"{code} is not in your list.")
                 return
             self.coins.remove(code)
-            self.price_data.pop(code, None)
-            save_coins(self.coin_db_path, self.coins)
+            self.symbol_index.pin(code, None)
+            # A fetch in flight keeps its other coins' quotes; on_prices_fetched drops the removed one
+            if self.price_stream:
+                self.price_stream.set_coins(self.coins)
+            if self.hub_feed:
+                self.hub_feed.set_coins(self.coins)
+            self.price_data.remove(code)
+            self.sparklines.forget(code)
+            self.save_coins()
             self.update_price_display()
-            self.alarms = [alarm for alarm in self.alarms if alarm['coin'] != code]
-            save_alarms(self.alarm_db_path, self.alarms)
+            self.alarms = [alarm for alarm in self.alarms if code not in alarm_coins(alarm)]
+            self.alarm_engine.compile(self.alarms)
+            self.save_alarms()
+            self.preload_sounds()
 
     def open_coin_url(self, slug: str):
         if not slug:
             QMessageBox.warning(self, "Error", "Could not determine the URL for this coin.")
             return
+        import webbrowser  # Deferred: only needed when a link is opened
+
         url = f"https://coinmarketcap.com/currencies/{slug}/"
         webbrowser.open_new_tab(url)
 
@@ -473,38 +926,43 @@ class QCryptoWidget(QWidget):
         dialog = AlarmDialog(self.alarms.copy(), self.coins, self)
         if dialog.exec():
             self.alarms = dialog.alarms
-            save_alarms(self.alarm_db_path, self.alarms)
+            self.alarm_engine.compile(self.alarms)
+            self.save_alarms()
+            self.preload_sounds()
             QMessageBox.information(self, "Success", "Alarms have been saved.")
 
     def check_alarms(self):
-        for alarm in self.alarms:
-            if alarm['coin'] not in self.price_data:
-                continue
-            price = self.price_data[alarm['coin']]['price']
-            percent_change = self.price_data[alarm['coin']]['percent_change_24h']
-            threshold = alarm['threshold']
-            triggered = False
-            if alarm['type'] == "Price above" and price > threshold:
-                triggered = True
-            elif alarm['type'] == "Price below" and price < threshold:
-                triggered = True
-            elif alarm['type'] == "% increase (24h)" and percent_change > threshold:
-                triggered = True
-            elif alarm['type'] == "% decrease (24h)" and percent_change < -abs(threshold):
-                triggered = True
-            if triggered:
-                self.trigger_alarm_alert(alarm)
+        with ALARM_SECONDS.time():
+            fired = self.alarm_engine.evaluate(self.price_data)
+        for alarm in fired:
+            self.trigger_alarm_alert(alarm)
+        if self.alarm_engine.dirty:
+            self.save_alarm_state()
+
+    def refresh_symbol_index(self):
+        """Re-downloads the CoinMarketCap map in the background if it is out of date."""
+        self.symbol_index.refresh_in_background(get_client(self.config['api_key']))
+
+    def preload_sounds(self):
+        """Decodes the sounds the current alarms use and frees those no alarm uses anymore."""
+        self.sounds.sync(alarm.get('sound', '') for alarm in self.alarms)
+
+    def save_coins(self):
+        self.writer.schedule(self.coin_db_path, list(self.coins), save_coins)
+
+    def save_alarms(self):
+        self.writer.schedule(self.alarm_db_path, list(self.alarms), save_alarms)
+
+    def save_alarm_state(self):
+        self.writer.schedule(self.alarm_state_path, self.alarm_engine.export_state(), save_alarm_state)
+        self.alarm_engine.dirty = False
     
     def trigger_alarm_alert(self, alarm: Dict):
-        message = f"Alarm for {alarm['coin']}: {alarm['type']} {alarm['threshold']}"
-        print(f"ALARM TRIGGERED: {message}")
+        rule = rule_text(alarm)
+        message = f"Alarm for {alarm['coin']}: {rule}"
+        logger.info("ALARM TRIGGERED: %s", message, extra={'coin': alarm['coin'], 'rule': rule})
         self.tray_icon.showMessage("QCryptoWidget Alarm!", message, QSystemTrayIcon.Information, 5000)
-        sound_path = alarm.get('sound')
-        if sound_path and Path(sound_path).exists():
-            effect = QSoundEffect()
-            effect.setSource(QUrl.fromLocalFile(sound_path))
-            effect.play()
-            self.sound_effect = effect
+        self.sounds.play(alarm.get('sound', ''))
 
     def closeEvent(self, event):
         event.ignore()
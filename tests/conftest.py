@@ -0,0 +1,18 @@
+# QCryptoWidget/tests/conftest.py
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+# The local CoinMarketCap/Binance stand-in the benchmarks use
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+
+@pytest.fixture
+def stub():
+    from stub_server import StubServer
+    with StubServer() as server:
+        yield server
@@ -0,0 +1,43 @@
+# QCryptoWidget/tests/test_binance.py
+
+from stub_server import StubServer
+
+from widget.api.providers import BinanceTickerProvider
+
+COINS = [f"C{i:04d}" for i in range(20)]
+
+
+def make_provider(server: StubServer, chunk_size: int = 200) -> BinanceTickerProvider:
+    return BinanceTickerProvider(api_root=server.binance_root, chunk_size=chunk_size, timeout=2)
+
+
+def test_prices_direct_and_bridged_pairs():
+    with StubServer(exchange_coins=20) as server:
+        provider = make_provider(server)
+        quotes = provider.get_prices(COINS)
+        provider.close()
+    assert sorted(quotes) == COINS
+    assert server.requests['ticker'] == 1
+
+
+def test_delisted_symbol_is_left_out():
+    with StubServer(exchange_coins=20, delisted={"C0003USDT"}) as server:
+        provider = make_provider(server)
+        quotes = provider.get_prices(COINS)
+        assert sorted(quotes) == [coin for coin in COINS if coin != "C0003"]
+
+        # The rejected symbol stays out, so the next refresh is one request again
+        requests = server.requests['ticker']
+        quotes = provider.get_prices(COINS)
+        provider.close()
+    assert server.requests['ticker'] == requests + 1
+    assert "C0003" not in quotes and len(quotes) == len(COINS) - 1
+
+
+def test_delisted_bridge_drops_only_bridged_coins():
+    with StubServer(exchange_coins=20, delisted={"BTCUSDT"}) as server:
+        provider = make_provider(server, chunk_size=8)
+        quotes = provider.get_prices(COINS)
+        provider.close()
+    # Every tenth coin only trades against BTC
+    assert sorted(quotes) == [coin for i, coin in enumerate(COINS) if i % 10 != 9]
@@ -0,0 +1,27 @@
+# QCryptoWidget/tests/test_history_db.py
+
+from widget.data.history_db import PriceHistory
+
+
+def test_downsampled_last_is_newest_price_in_bucket(tmp_path):
+    history = PriceHistory(tmp_path / "history.db")
+    try:
+        for ts, price in [(1.0, 5.0), (2.0, 1.0), (3.0, 9.0), (4.0, 3.0)]:
+            history.record({'BTC': {'price': price}}, ts=ts)
+        rows = history.query_downsampled('BTC', 0.0, 10.0, 1)
+    finally:
+        history.close()
+    assert rows == [(4.0, 1.0, 9.0, 3.0)]
+
+
+def test_queries_from_another_thread(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    history = PriceHistory(tmp_path / "history.db")
+    try:
+        history.record({'BTC': {'price': 5.0}}, ts=1.0)
+        with ThreadPoolExecutor(1) as pool:
+            latest = pool.submit(history.latest, 'BTC').result()
+    finally:
+        history.close()
+    assert latest == (1.0, 5.0)
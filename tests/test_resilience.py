@@ -0,0 +1,162 @@
+# QCryptoWidget/tests/test_resilience.py
+
+import asyncio
+import json
+
+from widget.alarms.engine import AlarmEngine
+from widget.api.coin_api import CoinApiClient
+from widget.api.providers import CmcProvider, ProviderRouter
+from widget.api.resilience import CLOSED, FETCHED_AT, HALF_OPEN, OPEN, CircuitBreaker
+from widget.api.response_cache import SharedQuoteCache
+from widget.daemon.daemon import PriceDaemon
+from widget.data.alarm_db import load_alarms
+
+COINS = ['C0000', 'C0001', 'C0002']
+
+
+def make_router(stub, open_seconds=3600.0):
+    provider = CmcProvider('test')
+    provider.client = CoinApiClient('test', base_url=stub.url, timeout=2)
+    sleeps = []
+    router = ProviderRouter([provider], sleep=sleeps.append)
+    router.breakers[provider.name] = CircuitBreaker(provider.name, open_seconds=open_seconds)
+    return router, sleeps
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker("src", failure_threshold=3, open_seconds=30)
+    for _ in range(2):
+        breaker.record_failure(now=100)
+    assert breaker.state(now=100) == CLOSED
+    breaker.record_failure(now=100)
+    assert breaker.state(now=100) == OPEN
+    assert not breaker.allow(now=110)
+    assert breaker.retry_in(now=110) == 20
+
+
+def test_breaker_half_open_lets_one_probe_through():
+    breaker = CircuitBreaker("src", failure_threshold=1, open_seconds=30)
+    breaker.record_failure(now=100)
+    assert breaker.state(now=130) == HALF_OPEN
+    assert breaker.allow(now=130)
+    assert not breaker.allow(now=130)
+    breaker.record_success()
+    assert breaker.state(now=130) == CLOSED
+    assert breaker.allow(now=130)
+
+
+def test_breaker_failed_probe_doubles_pause_up_to_maximum():
+    breaker = CircuitBreaker("src", failure_threshold=1, open_seconds=30, max_open_seconds=100)
+    breaker.record_failure(now=0)
+    now = 0
+    for pause in (60, 100, 100):
+        now += breaker.retry_in(now=now)
+        assert breaker.allow(now=now)
+        breaker.record_failure(now=now)
+        assert breaker.retry_in(now=now) == pause
+
+
+def test_router_retries_until_breaker_opens(stub):
+    router, sleeps = make_router(stub)
+    stub.set_faults(error_rate=1.0)
+    try:
+        assert router.get_prices(COINS) is None
+        # Three attempts, with a backoff before each retry, open the breaker
+        assert stub.requests['quotes'] == 3
+        assert len(sleeps) == 2
+        assert router.retry_in() > 0
+
+        # While it is open, no request is made and nothing is retried
+        assert router.get_prices(COINS) is None
+        assert stub.requests['quotes'] == 3
+        assert len(sleeps) == 2
+    finally:
+        router.close()
+
+
+def test_router_recovers_after_pause(stub):
+    router, _ = make_router(stub, open_seconds=0.0)
+    stub.set_faults(error_rate=1.0)
+    try:
+        assert router.get_prices(COINS) is None
+        stub.set_faults()
+        quotes = router.get_prices(COINS)
+        assert sorted(quotes) == COINS
+        assert router.breakers['cmc'].state() == CLOSED
+    finally:
+        router.close()
+
+
+def test_quote_cache_serves_last_good_quotes(stub, tmp_path):
+    router, _ = make_router(stub)
+    cache = SharedQuoteCache(tmp_path / "quote_cache.json", ttl=0)
+    try:
+        fresh = cache.get_prices(COINS, router.get_prices)
+        assert sorted(fresh) == COINS
+
+        stub.set_faults(error_rate=1.0)
+        assert cache.get_prices(COINS, router.get_prices) is None
+        stale = cache.peek(COINS)
+        assert {coin: quote['price'] for coin, quote in stale.items()} == \
+               {coin: quote['price'] for coin, quote in fresh.items()}
+        assert all(quote[FETCHED_AT] == fresh[coin][FETCHED_AT] for coin, quote in stale.items())
+    finally:
+        router.close()
+
+
+def test_quote_cache_remembers_coins_the_fetch_missed(tmp_path):
+    cache = SharedQuoteCache(tmp_path / "quote_cache.json", ttl=3600)
+    requested = []
+
+    def fetch(coins):
+        requested.append(list(coins))
+        return {coin: {'price': 1.0} for coin in coins if coin != 'GONE'}
+
+    assert sorted(cache.get_prices(['BTC', 'GONE'], fetch)) == ['BTC']
+    assert sorted(cache.get_prices(['BTC', 'GONE'], fetch)) == ['BTC']
+    assert requested == [['BTC', 'GONE']]
+    assert cache.peek(['GONE']) == {}
+
+    # A coin with a cached quote keeps it while the provider leaves it out
+    cache.ttl = 0
+    assert cache.get_prices(['BTC'], lambda coins: {})['BTC']['price'] == 1.0
+
+
+class _Collect:
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event)
+
+
+def make_daemon(stub, tmp_path):
+    (tmp_path / "coins.json").write_text(json.dumps(COINS))
+    (tmp_path / "alarms.json").write_text(json.dumps([{'coin': 'C0000', 'rule': "C0000 > 0"}]))
+    config = {
+        'root_path': tmp_path, 'api_key': None, 'price_providers': ['replay'], 'replay_file': None,
+        'daily_credits': 333, 'monthly_credits': 10000, 'min_refresh_seconds': 60,
+        'quote_cache_dir': tmp_path, 'quote_cache_ttl': 0,
+    }
+    sink = _Collect()
+    daemon = PriceDaemon(config, [sink], interval=60)
+    daemon.router.close()
+    daemon.router, _ = make_router(stub)
+    return daemon, sink
+
+
+def test_daemon_evaluates_alarms_on_stale_quotes(stub, tmp_path):
+    daemon, sink = make_daemon(stub, tmp_path)
+    try:
+        asyncio.run(daemon.run_once())
+        assert daemon.failures == 0
+        assert [event['stale'] for event in sink.events] == [False]
+
+        stub.set_faults(error_rate=1.0)
+        daemon.engine = AlarmEngine(load_alarms(tmp_path / "alarms.json"))  # Re-arm the alarm
+        asyncio.run(daemon.run_once())
+        assert daemon.failures == 1
+        assert [event['stale'] for event in sink.events] == [False, True]
+        assert sink.events[1]['age'] is not None
+    finally:
+        daemon.router.close()
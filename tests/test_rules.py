@@ -0,0 +1,119 @@
+# QCryptoWidget/tests/test_rules.py
+
+import pytest
+
+from widget.alarms.engine import AlarmEngine, alarm_key, migrate_alarms
+from widget.alarms.rules import RuleError, Threshold, compile_rule, legacy_form
+
+
+@pytest.mark.parametrize("text, position", [
+    ("BTC >", 5),
+    ("BTC > 1 )", 8),
+    ("BTC # 1", 4),
+    ("pct(BTC, 1y) > 1", 9),
+    ("pct(BTC 24h) > 1", 8),
+    ("(BTC > 1", 8),
+])
+def test_parse_errors_report_column(text, position):
+    with pytest.raises(RuleError) as error:
+        compile_rule(text)
+    assert error.value.position == position
+    assert f"(at column {position + 1})" in str(error.value)
+
+
+@pytest.mark.parametrize("text", ["BTC + 1", "1 > 0", "2 - (3 - 4) > 0"])
+def test_rules_must_be_conditions_on_a_coin(text):
+    with pytest.raises(RuleError):
+        compile_rule(text)
+
+
+def test_canonical_source_and_coins():
+    rule = compile_rule("eth / btc<0.03  and pct( sol ,7d ) > 20")
+    assert rule.source == "ETH / BTC < 0.03 and pct(SOL, 7d) > 20"
+    assert rule.coins == ('ETH', 'BTC', 'SOL')
+
+
+def test_missing_data_is_unknown():
+    rule = compile_rule("ETH / BTC < 0.03")
+    assert rule.evaluate({'ETH': {'price': 2000.0}}) is None
+    assert rule.evaluate({'ETH': {'price': 2000.0}, 'BTC': {'price': 100000.0}}) is True
+    assert compile_rule("pct(BTC, 7d) > 1").evaluate({'BTC': {'price': 1.0}}) is None
+    # Division by zero has no value either
+    assert rule.evaluate({'ETH': {'price': 2000.0}, 'BTC': {'price': 0.0}}) is None
+
+
+def test_unknown_operands_in_logic():
+    rule = compile_rule("BTC > 1 and ETH > 1")
+    assert rule.evaluate({'BTC': {'price': 0.0}}) is False  # False whatever ETH is
+    assert rule.evaluate({'BTC': {'price': 2.0}}) is None
+    rule = compile_rule("BTC > 1 or ETH > 1")
+    assert rule.evaluate({'BTC': {'price': 2.0}}) is True
+    assert rule.evaluate({'BTC': {'price': 0.0}}) is None
+
+
+@pytest.mark.parametrize("text, threshold", [
+    ("BTC > 65000", Threshold('BTC', 'price', ">", 65000.0)),
+    ("65000 < BTC", Threshold('BTC', 'price', ">", 65000.0)),
+    ("-5 > pct(X, 24h)", Threshold('X', 'percent_change_24h', "<", -5.0)),
+    ("pct(SOL, 7d) < -10", Threshold('SOL', 'percent_change_7d', "<", -10.0)),
+])
+def test_single_thresholds_are_extracted(text, threshold):
+    assert compile_rule(text).threshold == threshold
+
+
+@pytest.mark.parametrize("text", ["BTC >= 65000", "ETH / BTC < 0.03", "BTC > 1 and ETH > 1"])
+def test_other_rules_have_no_threshold(text):
+    assert compile_rule(text).threshold is None
+
+
+def test_legacy_form():
+    assert legacy_form("BTC > 65000") == ('BTC', "Price above", 65000.0)
+    assert legacy_form("pct(BTC, 24h) < -5") == ('BTC', "% decrease (24h)", 5.0)
+    assert legacy_form("pct(BTC, 24h) < 5") is None
+    assert legacy_form("ETH / BTC < 0.03") is None
+
+
+def quotes(btc, eth):
+    return {'BTC': {'price': btc}, 'ETH': {'price': eth}}
+
+
+def test_rule_alarm_is_edge_triggered():
+    alarm = {'coin': 'ETH', 'rule': "ETH / BTC < 0.03"}
+    engine = AlarmEngine([alarm])
+    assert engine.evaluate(quotes(100000, 2000), now=0) == [alarm]
+    assert engine.evaluate(quotes(100000, 2100), now=1) == []  # Still true: no repeat
+    assert engine.evaluate(quotes(100000, 4000), now=2) == []  # False: re-arms
+    assert engine.evaluate(quotes(100000, 2000), now=3) == [alarm]
+
+
+def test_rule_alarm_waits_for_missing_coin():
+    alarm = {'coin': 'ETH', 'rule': "ETH / BTC < 0.03"}
+    engine = AlarmEngine([alarm])
+    assert engine.evaluate({'ETH': {'price': 2000}}, now=0) == []
+    assert engine.evaluate(quotes(100000, 2000), now=1) == [alarm]
+
+
+def test_rule_alarm_cooldown():
+    alarm = {'coin': 'ETH', 'rule': "ETH / BTC < 0.03", 'cooldown': 60}
+    engine = AlarmEngine([alarm])
+    assert engine.evaluate(quotes(100000, 2000), now=1000) == [alarm]
+    assert engine.evaluate(quotes(100000, 4000), now=1010) == []
+    # True again within the cooldown: held back, but stays armed
+    assert engine.evaluate(quotes(100000, 2000), now=1020) == []
+    assert engine.evaluate(quotes(100000, 2001), now=1070) == [alarm]
+
+
+def test_migrates_percent_decrease_with_state():
+    alarm = {'coin': 'btc', 'type': "% decrease (24h)", 'threshold': 5.0, 'sound': "beep.wav"}
+    old_key = alarm_key(alarm)
+    state = {old_key: {'armed': False, 'last_fired': 123.0}}
+    alarms = [alarm, {'coin': 'ETH', 'rule': "ETH > 1"}]
+
+    assert migrate_alarms(alarms, state) == 1
+    assert alarms[0] == {'coin': 'BTC', 'rule': "pct(BTC, 24h) < -5", 'sound': "beep.wav"}
+    assert state == {"pct(BTC, 24h) < -5": {'armed': False, 'last_fired': 123.0}}
+    assert migrate_alarms(alarms, state) == 0
+
+    # The carried-over state keeps the converted alarm from firing again
+    engine = AlarmEngine(alarms, state)
+    assert engine.evaluate({'BTC': {'price': 1.0, 'percent_change_24h': -8.0}}, now=200) == []